@@ -0,0 +1,192 @@
+"""
+Precomputed answer bank for high-frequency question templates.
+
+A few question shapes dominate traffic - duration, certifications,
+prerequisites/computer specs, "does X cover Y" and syllabus breakdowns - and
+each ran the full ~8 LLM-step pipeline for every asker. The offline job
+tools/precompute_answer_bank.py runs each (program x template) question through
+the workflow once, keeps only answers that passed verification, and stores them
+here keyed by the knowledge base version (src/kb_manifest.py).
+
+At request time triage sets answer_template when the question is exactly one
+of these shapes for exactly one program (match_template); if the bank holds an
+answer for that key built from the current KB, answer_bank_response serves it
+without retrieval or generation. Entries built from an older KB are ignored
+until the job re-runs, so a KB edit can never serve a stale answer.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.kb_manifest import kb_version
+
+logger = logging.getLogger(__name__)
+
+# Canonical question per template; the precompute job asks exactly these
+TEMPLATES = {
+    "duration": "How long is the {program} program?",
+    "certification": "What certifications does the {program} program include?",
+    "requirements": "What are the prerequisites and computer requirements for the {program} program?",
+    "breakdown": "Give me a detailed breakdown of the {program} curriculum.",
+    "coverage": "Does the {program} program cover {topic}?",
+}
+
+# rule_based_triage rule name -> template (a question must match exactly one rule)
+_RULE_TEMPLATES = {
+    "duration": "duration",
+    "certification": "certification",
+    "requirements": "requirements",
+    "breakdown": "breakdown",
+    "coverage": "coverage",
+}
+
+# Words a question may use and still be exactly the template's question. After
+# removing the program alias and stopwords nothing else may be left: "how long
+# is week 3", "how long ... on Kubernetes" or "... and how much do they cost"
+# ask something the banked answer does not answer.
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "does", "do", "will", "what", "whats", "which", "s", "of", "for", "in", "on",
+    "at", "to", "with", "this", "that", "it", "its", "they", "there", "me", "i", "we", "you", "your", "our",
+    "can", "could", "would", "please", "tell", "know", "want", "like", "hi", "hello", "hey",
+    "program", "programme", "bootcamp", "course", "ironhack",
+}
+_TEMPLATE_VOCABULARY = {
+    "duration": {"how", "long", "duration", "hours", "weeks", "months", "many", "length", "total", "take", "last",
+                 "takes", "lasts"},
+    "certification": {"certification", "certifications", "certificate", "certificates", "certified", "credential",
+                      "credentials", "diploma", "include", "includes", "included", "offer", "offers", "get",
+                      "earn", "provide", "provides", "come", "comes", "any"},
+    "requirements": {"prerequisite", "prerequisites", "requirement", "requirements", "required", "computer",
+                     "laptop", "specs", "eligibility", "eligible", "admission", "admissions", "and", "need",
+                     "needed", "technical", "hardware", "minimum"},
+    "breakdown": {"give", "breakdown", "overview", "outline", "structure", "curriculum", "syllabus", "detailed",
+                  "full", "complete", "comprehensive", "unit", "units", "module", "modules", "week", "weeks",
+                  "weekly", "day", "by", "topics", "be", "covered", "going", "show", "share", "get", "schedule",
+                  "detail", "an"},
+    "coverage": {"cover", "covers", "covered", "teach", "teaches", "taught", "include", "includes", "included",
+                 "go", "goes", "over", "any", "some", "about", "anything", "how"},
+}
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+
+def _is_canonical_wording(text: str, template: str, topic: Optional[str]) -> bool:
+    """True if text (program alias removed) uses only stopwords, template words and the coverage topic."""
+    allowed = _STOPWORDS | _TEMPLATE_VOCABULARY[template] | set(_WORD.findall((topic or "").lower()))
+    return all(word in allowed for word in _WORD.findall(text.lower().replace("'", "")))
+
+
+def template_key(template: str, topic: Optional[str] = None) -> str:
+    """'duration', or 'coverage:<normalized topic>' for coverage questions."""
+    if template != "coverage":
+        return template
+    return "coverage:" + " ".join((topic or "").lower().split())
+
+
+def template_question(program_name: str, key: str) -> str:
+    """The canonical question for a template key."""
+    template, _, topic = key.partition(":")
+    return TEMPLATES[template].format(program=program_name, topic=topic)
+
+
+def match_template(query: str, state: Dict[str, Any]) -> Optional[str]:
+    """
+    Template key for a triaged question, or None. Only first questions (no
+    thread history) about exactly one active program whose wording matches
+    exactly one template rule, and stays within that template's vocabulary,
+    qualify - anything more specific gets the full pipeline.
+    """
+    from src.triage_rules import match_programs, rule_based_triage
+
+    if state.get("conversation_history") or state.get("conversation_stage") == "follow_up":
+        return None
+    if state.get("is_cohort_calendar_question") or state.get("is_portfolio_wide") or state.get("discontinued_program"):
+        return None
+    programs = state.get("detected_programs") or []
+    if len(programs) != 1:
+        return None
+    rules = rule_based_triage(query)
+    if rules["detected_programs"] != programs or len(rules["rules_matched"]) != 1:
+        return None
+    template = _RULE_TEMPLATES.get(rules["rules_matched"][0])
+    if template is None:
+        return None
+    if template == "coverage" and not rules.get("coverage_topic"):
+        return None
+    text = query
+    for _, _, (start, end) in sorted(match_programs(query), key=lambda m: m[2][0], reverse=True):
+        text = text[:start] + " " + text[end:]
+    if not _is_canonical_wording(text, template, rules.get("coverage_topic")):
+        return None
+    return template_key(template, rules.get("coverage_topic"))
+
+
+class AnswerBank:
+    """JSON file of {"<program>|<template key>": entry}; entries carry the kb_version they were built from."""
+
+    def __init__(self, path: str, version: Optional[str] = None):
+        self.path = path
+        self._version = version
+        self._answers: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        return self._version or kb_version()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._answers is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as handle:
+                    self._answers = json.load(handle).get("answers", {})
+            except FileNotFoundError:
+                self._answers = {}
+            except (OSError, ValueError) as e:
+                logger.error(f"Answer bank {self.path} unreadable ({e}); serving no precomputed answers")
+                self._answers = {}
+        return self._answers
+
+    def get(self, program: str, key: str) -> Optional[Dict[str, Any]]:
+        """The stored answer, only if it was built from the current KB."""
+        with self._lock:
+            entry = self._load().get(f"{program}|{key}")
+        if entry and entry.get("kb_version") == self.version:
+            return entry
+        return None
+
+    def put(self, program: str, key: str, response: str, citations: List[str], **extra: Any) -> None:
+        with self._lock:
+            self._load()[f"{program}|{key}"] = {
+                "response": response,
+                "citations": list(citations),
+                "kb_version": self.version,
+                "generated_at": datetime.utcnow().isoformat() + "Z",
+                **extra,
+            }
+
+    def save(self) -> None:
+        with self._lock:
+            answers = dict(self._load())
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as handle:
+            json.dump({"answers": answers}, handle, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = list(self._load().values())
+        fresh = sum(1 for e in entries if e.get("kb_version") == self.version)
+        return {"fresh": fresh, "stale": len(entries) - fresh}
+
+
+def _build_answer_bank() -> Optional[AnswerBank]:
+    from src.config import ANSWER_BANK_ENABLED, ANSWER_BANK_PATH
+    return AnswerBank(ANSWER_BANK_PATH) if ANSWER_BANK_ENABLED else None
+
+
+ANSWER_BANK = _build_answer_bank()
@@ -8,17 +8,23 @@ import logging
 from flask import Flask, request as flask_request
 from slack_bolt import App
 from slack_bolt.adapter.flask import SlackRequestHandler
+from slack_sdk import WebClient
 
 # ---------------- Configuration ----------------
 from src.config import (
     SLACK_BOT_TOKEN,
     SLACK_SIGNING_SECRET,
+    SLACK_API_BASE_URL,
+    SLACK_DROP_RETRIES,
     VECTOR_STORE_ID,
 )
 
 # ---------------- Slack Integration ----------------
 from src.slack_integration import handle_mention, handle_message
 
+# ---------------- Instrumentation ----------------
+from src.instrumentation import render_metrics, METRICS_CONTENT_TYPE
+
 # ---------------- Logging ----------------
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,7 +38,8 @@ flask_app = Flask(__name__)
 try:
     slack_app = App(
         token=SLACK_BOT_TOKEN,
-        signing_secret=SLACK_SIGNING_SECRET
+        signing_secret=SLACK_SIGNING_SECRET,
+        client=WebClient(token=SLACK_BOT_TOKEN, base_url=SLACK_API_BASE_URL),
     )
 
     # Register Slack event handlers
@@ -51,6 +58,15 @@ except Exception as e:
 @flask_app.route("/slack/events", methods=["POST"])
 def slack_events():
     """Handle Slack events."""
+    # Slack redelivers when our ack was slow; the first delivery is already being
+    # handled, so acknowledge the retry before any work (and ask for no more)
+    retry_num = flask_request.headers.get("X-Slack-Retry-Num")
+    if retry_num and SLACK_DROP_RETRIES:
+        logger.info(
+            f"Dropping Slack retry #{retry_num} "
+            f"(reason: {flask_request.headers.get('X-Slack-Retry-Reason', 'unknown')})"
+        )
+        return "", 200, {"X-Slack-No-Retry": "1"}
     if slack_handler:
         return slack_handler.handle(flask_request)
     else:
@@ -65,6 +81,11 @@ def health():
         "vector_store_id": VECTOR_STORE_ID
     }
 
+@flask_app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus metrics: per-node latency, LLM calls and token usage."""
+    return render_metrics(), 200, {"Content-Type": METRICS_CONTENT_TYPE}
+
 # ---------------- Main ----------------
 
 if __name__ == "__main__":
@@ -0,0 +1,305 @@
+"""
+Bounded LangGraph checkpointers.
+
+MemorySaver keeps every checkpoint of every Slack thread for the life of the
+process, including up to 50 retrieved chunks and whole syllabus texts per turn,
+so memory only grows until the dyno restarts. The savers here keep what the
+workflow actually reuses:
+
+- only the latest checkpoint per thread (the graph never resumes from history),
+- doc channels (retrieved_docs, filtered_docs) without chunk text - every turn
+  retrieves again, and carrying the previous turn's text forward is only weight,
+- threads idle longer than ttl_seconds are dropped, and beyond max_threads the
+  least recently used thread goes first.
+
+SQLiteCheckpointSaver adds write-through persistence to a SQLite file (one row
+per thread), so thread state survives restarts and is shared by several worker
+processes: a worker reloads a thread whenever another worker wrote it since.
+Pending task writes are only persisted with the next checkpoint; an interrupted
+run is re-run from its last checkpoint rather than resumed mid-step.
+
+Both savers subclass InMemorySaver and work on its storage / writes / blobs
+dicts directly, which are not public API: requirements.txt pins
+langgraph-checkpoint to the major version these were written against.
+"""
+
+import base64
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+logger = logging.getLogger(__name__)
+
+LARGE_DOC_CHANNELS = ("retrieved_docs", "filtered_docs")
+
+# Global SQLite cleanup (TTL + row cap) runs every this many checkpoint writes
+_SQLITE_SWEEP_EVERY = 50
+
+
+def slim_docs(docs: Any) -> Any:
+    """Doc dicts without their text ('content'); anything else is returned as is."""
+    if not isinstance(docs, list):
+        return docs
+    return [
+        {k: v for k, v in doc.items() if k != "content"} if isinstance(doc, dict) else doc
+        for doc in docs
+    ]
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """In-memory checkpointer with latest-only history, payload stripping, TTL and LRU caps."""
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = 500,
+        ttl_seconds: float = 6 * 3600,
+        strip_channels: Iterable[str] = LARGE_DOC_CHANNELS,
+        clock=time.time,
+    ):
+        super().__init__()
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.strip_channels = tuple(strip_channels)
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        # Per-thread key index, so pruning never scans other threads' entries
+        self._blob_keys: Dict[str, Set[Tuple]] = {}
+        self._write_keys: Dict[str, Set[Tuple]] = {}
+
+    # ---------------- BaseCheckpointSaver ----------------
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            last = self._last_used.get(thread_id)
+            if last is not None and self.ttl_seconds and self._clock() - last > self.ttl_seconds:
+                logger.info(f"Checkpoint for thread {thread_id} expired")
+                self._drop_local(thread_id)
+            return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        values = checkpoint.get("channel_values") or {}
+        if any(ch in values for ch in self.strip_channels):
+            checkpoint = {
+                **checkpoint,
+                "channel_values": {
+                    k: slim_docs(v) if k in self.strip_channels else v for k, v in values.items()
+                },
+            }
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            saved = super().put(config, checkpoint, metadata, new_versions)
+            self._blob_keys.setdefault(thread_id, set()).update(
+                (thread_id, checkpoint_ns, k, v) for k, v in new_versions.items()
+            )
+            self._prune_thread(thread_id, checkpoint_ns, checkpoint["id"], checkpoint["channel_versions"])
+            self._touch(thread_id)
+            self._evict_lru()
+        return saved
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self._write_keys.setdefault(thread_id, set()).add(key)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop_local(thread_id)
+
+    # ---------------- Bookkeeping ----------------
+
+    @property
+    def thread_count(self) -> int:
+        return len(self._last_used)
+
+    def _touch(self, thread_id: str) -> None:
+        self._last_used[thread_id] = self._clock()
+        self._last_used.move_to_end(thread_id)
+
+    def _evict_lru(self) -> None:
+        while self.max_threads and len(self._last_used) > self.max_threads:
+            oldest = next(iter(self._last_used))
+            logger.debug(f"Evicting checkpoint for thread {oldest} (max {self.max_threads} threads)")
+            self._drop_local(oldest)
+
+    def _prune_thread(self, thread_id: str, checkpoint_ns: str, keep_id: str, versions: Dict[str, Any]) -> None:
+        """Drop everything of the thread's namespace except the latest checkpoint and its blobs."""
+        ns_storage = self.storage[thread_id][checkpoint_ns]
+        for checkpoint_id in [c for c in ns_storage if c != keep_id]:
+            del ns_storage[checkpoint_id]
+        write_keys = self._write_keys.get(thread_id, set())
+        for key in [k for k in write_keys if k[1] == checkpoint_ns and k[2] != keep_id]:
+            self.writes.pop(key, None)
+            write_keys.discard(key)
+        blob_keys = self._blob_keys.get(thread_id, set())
+        for key in [k for k in blob_keys if k[1] == checkpoint_ns and versions.get(k[2]) != k[3]]:
+            self.blobs.pop(key, None)
+            blob_keys.discard(key)
+
+    def _drop_local(self, thread_id: str) -> None:
+        self.storage.pop(thread_id, None)
+        for key in self._write_keys.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._blob_keys.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        self._last_used.pop(thread_id, None)
+
+
+def _b64(typed: Tuple[str, bytes]) -> list:
+    return [typed[0], base64.b64encode(typed[1]).decode("ascii")]
+
+
+def _unb64(pair: list) -> Tuple[str, bytes]:
+    return pair[0], base64.b64decode(pair[1])
+
+
+class SQLiteCheckpointSaver(BoundedMemorySaver):
+    """BoundedMemorySaver with write-through to SQLite (one row per thread)."""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS thread_checkpoints ("
+            "thread_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS thread_checkpoints_updated ON thread_checkpoints (updated_at)"
+        )
+        self._loaded_at: Dict[str, float] = {}  # updated_at of the row this process holds
+        self._writes_since_sweep = 0
+
+    def get_tuple(self, config):
+        configurable = config["configurable"]
+        if not configurable.get("checkpoint_id"):
+            # Start of a run: pick up the thread if another worker wrote it since
+            self._refresh_thread(configurable["thread_id"])
+        return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            if thread_id in self._last_used:  # not evicted by the cap right away
+                self._persist(thread_id)
+        return saved
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._loaded_at.pop(thread_id, None)
+            self._conn.execute("DELETE FROM thread_checkpoints WHERE thread_id = ?", (thread_id,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ---------------- Persistence ----------------
+
+    def _refresh_thread(self, thread_id: str) -> None:
+        row = self._conn.execute(
+            "SELECT payload, updated_at FROM thread_checkpoints WHERE thread_id = ?", (thread_id,)
+        ).fetchone()
+        if row is None:
+            return
+        payload, updated_at = row
+        with self._lock:
+            if self.ttl_seconds and self._clock() - updated_at > self.ttl_seconds:
+                self._drop_local(thread_id)
+                self._loaded_at.pop(thread_id, None)
+                self._conn.execute("DELETE FROM thread_checkpoints WHERE thread_id = ?", (thread_id,))
+                return
+            if updated_at <= self._loaded_at.get(thread_id, 0.0) and thread_id in self._last_used:
+                return
+            self._drop_local(thread_id)
+            self._load(thread_id, json.loads(payload))
+            self._loaded_at[thread_id] = updated_at
+            self._last_used[thread_id] = updated_at
+            self._last_used.move_to_end(thread_id)
+            self._evict_lru()
+
+    def _load(self, thread_id: str, snapshot: Dict[str, Any]) -> None:
+        for ns, checkpoints in snapshot.get("storage", {}).items():
+            for checkpoint_id, (checkpoint, metadata, parent) in checkpoints.items():
+                self.storage[thread_id][ns][checkpoint_id] = (_unb64(checkpoint), _unb64(metadata), parent)
+        blob_keys = self._blob_keys.setdefault(thread_id, set())
+        for ns, channel, version, value in snapshot.get("blobs", []):
+            key = (thread_id, ns, channel, version)
+            self.blobs[key] = _unb64(value)
+            blob_keys.add(key)
+        write_keys = self._write_keys.setdefault(thread_id, set())
+        for ns, checkpoint_id, task_id, idx, channel, value, task_path in snapshot.get("writes", []):
+            key = (thread_id, ns, checkpoint_id)
+            self.writes[key][(task_id, idx)] = (task_id, channel, _unb64(value), task_path)
+            write_keys.add(key)
+
+    def _snapshot(self, thread_id: str) -> Dict[str, Any]:
+        return {
+            "storage": {
+                ns: {cid: [_b64(c), _b64(m), parent] for cid, (c, m, parent) in checkpoints.items()}
+                for ns, checkpoints in self.storage.get(thread_id, {}).items()
+            },
+            "blobs": [
+                [ns, channel, version, _b64(self.blobs[(tid, ns, channel, version)])]
+                for (tid, ns, channel, version) in self._blob_keys.get(thread_id, ())
+                if (tid, ns, channel, version) in self.blobs
+            ],
+            "writes": [
+                [key[1], key[2], task_id, idx, channel, _b64(value), task_path]
+                for key in self._write_keys.get(thread_id, ())
+                for (task_id, idx), (_, channel, value, task_path) in self.writes.get(key, {}).items()
+            ],
+        }
+
+    def _persist(self, thread_id: str) -> None:
+        updated_at = self._clock()
+        payload = json.dumps(self._snapshot(thread_id))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO thread_checkpoints (thread_id, payload, updated_at) VALUES (?, ?, ?)",
+            (thread_id, payload, updated_at),
+        )
+        self._loaded_at[thread_id] = updated_at
+        self._writes_since_sweep += 1
+        if self._writes_since_sweep >= _SQLITE_SWEEP_EVERY:
+            self._writes_since_sweep = 0
+            self._sweep()
+
+    def _sweep(self) -> None:
+        """Expire idle threads and cap the table at max_threads rows (all workers share it)."""
+        if self.ttl_seconds:
+            self._conn.execute(
+                "DELETE FROM thread_checkpoints WHERE updated_at < ?", (self._clock() - self.ttl_seconds,)
+            )
+        if self.max_threads:
+            self._conn.execute(
+                "DELETE FROM thread_checkpoints WHERE thread_id NOT IN "
+                "(SELECT thread_id FROM thread_checkpoints ORDER BY updated_at DESC LIMIT ?)",
+                (self.max_threads,),
+            )
+
+
+def build_checkpointer(
+    backend: str = "memory",
+    sqlite_path: Optional[str] = None,
+    ttl_seconds: float = 6 * 3600,
+    max_threads: int = 500,
+) -> BoundedMemorySaver:
+    """Checkpointer for build_workflow; falls back to memory if the SQLite file can't be opened."""
+    if backend == "sqlite" and sqlite_path:
+        try:
+            return SQLiteCheckpointSaver(sqlite_path, ttl_seconds=ttl_seconds, max_threads=max_threads)
+        except sqlite3.Error as e:
+            logger.error(f"SQLite checkpointer unavailable ({e}), using in-memory checkpoints")
+    return BoundedMemorySaver(ttl_seconds=ttl_seconds, max_threads=max_threads)
@@ -8,7 +8,7 @@ import logging
 import os
 from typing import Any, List, Optional
 
-from src.config import COHORT_CALENDAR_SHEET_ID, COHORT_CALENDAR_SHEET_GID
+from src.config import COHORT_CALENDAR_SHEET_ID, COHORT_CALENDAR_SHEET_GID, COHORT_CALENDAR_VALUES_URL
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +18,9 @@ def fetch_cohort_calendar_data() -> List[List[Any]]:
     Fetch all values from the first tab of the cohort calendar sheet.
     Returns list of rows (each row is a list of cell values), or empty list on failure.
     """
+    if COHORT_CALENDAR_VALUES_URL:
+        return _fetch_from_values_url(COHORT_CALENDAR_VALUES_URL)
+
     credentials = _get_credentials()
     if not credentials:
         logger.warning("No Google Sheets credentials; cohort calendar path will return fallback message.")
@@ -38,6 +41,17 @@ def fetch_cohort_calendar_data() -> List[List[Any]]:
         return []
 
 
+def _fetch_from_values_url(url: str) -> List[List[Any]]:
+    """Rows from a JSON values endpoint ({"values": [...]}, same shape as the Sheets API)."""
+    try:
+        import urllib.request
+        with urllib.request.urlopen(url, timeout=15) as response:
+            return json.loads(response.read().decode("utf-8")).get("values", [])
+    except Exception as e:
+        logger.exception("Failed to fetch cohort calendar values from %s: %s", url, e)
+        return []
+
+
 def _get_credentials() -> Optional[dict]:
     """Load service account credentials from env (JSON string or path to JSON file)."""
     raw = os.environ.get("GOOGLE_SHEETS_CREDENTIALS_JSON", "").strip()
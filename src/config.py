@@ -29,8 +29,95 @@ openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
 MODEL_FAST = os.environ.get("OPENAI_MODEL_FAST", "gpt-4o-mini")
 MODEL_QUALITY = os.environ.get("OPENAI_MODEL_QUALITY", "gpt-4o")
 
+# ---------------- Instrumentation ----------------
+# Requests slower than this log their full per-node trace breakdown
+SLOW_REQUEST_THRESHOLD_SECONDS = float(os.environ.get("SLOW_REQUEST_THRESHOLD_SECONDS", "30"))
+
+# ---------------- Time Budget ----------------
+# Total time a request may take (gunicorn kills requests at 120s; see Procfile).
+# Handlers turn it into a request deadline that caps every LLM/retrieval timeout.
+REQUEST_TIME_BUDGET_SECONDS = float(os.environ.get("REQUEST_TIME_BUDGET_SECONDS", "90"))
+# With less than this left, routes skip refetch/refinement rounds and finish
+REQUEST_DEADLINE_RESERVE_SECONDS = float(os.environ.get("REQUEST_DEADLINE_RESERVE_SECONDS", "30"))
+
+# ---------------- OpenAI Resilience ----------------
+# Circuit breaker per endpoint + model (src/resilience.py): opens when at least
+# CIRCUIT_FAILURE_RATIO of the last CIRCUIT_WINDOW calls (min CIRCUIT_MIN_CALLS)
+# failed or took over CIRCUIT_SLOW_CALL_SECONDS; calls then fail fast for
+# CIRCUIT_OPEN_SECONDS before a single probe is let through.
+CIRCUIT_WINDOW = int(os.environ.get("CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_CALLS = int(os.environ.get("CIRCUIT_MIN_CALLS", "5"))
+CIRCUIT_FAILURE_RATIO = float(os.environ.get("CIRCUIT_FAILURE_RATIO", "0.5"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.environ.get("CIRCUIT_SLOW_CALL_SECONDS", "30"))
+CIRCUIT_OPEN_SECONDS = float(os.environ.get("CIRCUIT_OPEN_SECONDS", "30"))
+# Upper bound for the adaptive (AIMD) concurrency of relevance-assessment batches
+RELEVANCE_MAX_CONCURRENCY = int(os.environ.get("RELEVANCE_MAX_CONCURRENCY", "8"))
+
+# ---------------- Triage ----------------
+# Rule-based triage answers without the LLM call at or above this confidence
+# (see src/triage_rules.py); set above 1.0 to always use the LLM
+TRIAGE_RULES_MIN_CONFIDENCE = float(os.environ.get("TRIAGE_RULES_MIN_CONFIDENCE", "0.85"))
+
+# ---------------- Knowledge Base ----------------
+# The KB manifest (per-file hashes + version id) is saved here at startup so the
+# next start can log exactly which files changed
+KB_MANIFEST_PATH = os.environ.get("KB_MANIFEST_PATH", "kb_manifest.json")
+
+# ---------------- Answer Bank ----------------
+# Precomputed answers for template questions (src/answer_bank.py), built by
+# tools/precompute_answer_bank.py; only entries matching the current KB are served
+ANSWER_BANK_ENABLED = os.environ.get("ANSWER_BANK_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+ANSWER_BANK_PATH = os.environ.get("ANSWER_BANK_PATH", "knowledge_base/answer_bank.json")
+
+# ---------------- Request Coalescing ----------------
+# Identical questions (same normalized query + history) arriving while one is
+# being answered wait for that run instead of starting their own (src/single_flight.py)
+REQUEST_COALESCING = os.environ.get("REQUEST_COALESCING", "true").strip().lower() in ("1", "true", "yes")
+
+# ---------------- Context Budgets ----------------
+# Per-call token budgets for the document context packed into prompts
+# (see src/context_budget.py). Full syllabi are condensed, never dropped.
+GENERATION_CONTEXT_TOKEN_BUDGET = int(os.environ.get("GENERATION_CONTEXT_TOKEN_BUDGET", "16000"))
+VERIFICATION_CONTEXT_TOKEN_BUDGET = int(os.environ.get("VERIFICATION_CONTEXT_TOKEN_BUDGET", "10000"))
+# Breakdown requests get each syllabus as a compact outline (units, hours, topics;
+# src/kb_chunking.py) instead of the full document, in generation and verification
+SYLLABUS_OUTLINE_ENABLED = os.environ.get("SYLLABUS_OUTLINE_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+SYLLABUS_OUTLINE_MAX_CHARS = int(os.environ.get("SYLLABUS_OUTLINE_MAX_CHARS", "3000"))
+
+# ---------------- Checkpointing ----------------
+# Per-thread workflow state (see src/checkpointer.py). "memory" keeps it in the
+# process; "sqlite" also writes it to CHECKPOINT_SQLITE_PATH so it survives
+# restarts and is shared by all gunicorn workers on the dyno.
+CHECKPOINT_BACKEND = os.environ.get("CHECKPOINT_BACKEND", "memory").strip().lower()
+CHECKPOINT_SQLITE_PATH = os.environ.get("CHECKPOINT_SQLITE_PATH", "checkpoints.sqlite3")
+# Threads idle longer than this are dropped; beyond the cap, least recently used go first
+CHECKPOINT_TTL_SECONDS = int(os.environ.get("CHECKPOINT_TTL_SECONDS", "21600"))
+CHECKPOINT_MAX_THREADS = int(os.environ.get("CHECKPOINT_MAX_THREADS", "500"))
+
+# ---------------- Slack ----------------
+# Thread history cache (src/slack_helpers.py): a cached thread is re-read from
+# Slack at most this often; the cap bounds memory (least recently used dropped)
+SLACK_HISTORY_CACHE_TTL_SECONDS = int(os.environ.get("SLACK_HISTORY_CACHE_TTL_SECONDS", "600"))
+SLACK_HISTORY_CACHE_MAX_THREADS = int(os.environ.get("SLACK_HISTORY_CACHE_MAX_THREADS", "1000"))
+# Progress messages: at most one Slack call per channel this often (Slack allows ~1/s)
+SLACK_PROGRESS_MIN_INTERVAL_SECONDS = float(os.environ.get("SLACK_PROGRESS_MIN_INTERVAL_SECONDS", "1.0"))
+
+# Event de-duplication (src/event_dedupe.py): "memory" (per process), "sqlite"
+# (shared by the workers on a dyno, survives restarts) or "redis" (shared across
+# dynos; any Redis-compatible server, needs the redis package)
+EVENT_DEDUPE_BACKEND = os.environ.get("EVENT_DEDUPE_BACKEND", "memory").strip().lower()
+EVENT_DEDUPE_SQLITE_PATH = os.environ.get("EVENT_DEDUPE_SQLITE_PATH", "event_dedupe.sqlite3")
+EVENT_DEDUPE_REDIS_URL = os.environ.get("EVENT_DEDUPE_REDIS_URL", os.environ.get("REDIS_URL", ""))
+# Slack retries within minutes; keys are kept well beyond that
+EVENT_DEDUPE_TTL_SECONDS = int(os.environ.get("EVENT_DEDUPE_TTL_SECONDS", "3600"))
+# Acknowledge Slack redeliveries (X-Slack-Retry-Num) without processing them
+SLACK_DROP_RETRIES = os.environ.get("SLACK_DROP_RETRIES", "true").strip().lower() in ("1", "true", "yes")
+
+# Overridable so benchmarks can point Slack calls at a local stand-in (tools/fake_api_server.py)
+SLACK_API_BASE_URL = os.environ.get("SLACK_API_BASE_URL", slack_sdk.WebClient.BASE_URL)
+
 # Initialize Slack WebClient singleton for thread-safe reuse
-slack_web_client = slack_sdk.WebClient(token=SLACK_BOT_TOKEN) if SLACK_BOT_TOKEN else None
+slack_web_client = slack_sdk.WebClient(token=SLACK_BOT_TOKEN, base_url=SLACK_API_BASE_URL) if SLACK_BOT_TOKEN else None
 
 # ---------------- Config Loaders ----------------
 def load_config_file(filename):
@@ -67,6 +154,9 @@ UNIFIED_TRIAGE_PROMPT = load_config_file('UNIFIED_TRIAGE.md')
 COHORT_CALENDAR_SHEET_ID = os.environ.get("COHORT_CALENDAR_SHEET_ID", "1QEDMqp71oRPJ3CRr7f_DP7l6_uNE_lSjV5OJ3BlHRcA")
 # Tab gid from URL (Bootcamps Tracker); we use this tab so layout matches the CSV export
 COHORT_CALENDAR_SHEET_GID = int(os.environ["COHORT_CALENDAR_SHEET_GID"]) if os.environ.get("COHORT_CALENDAR_SHEET_GID", "").strip().isdigit() else 1379215013
+# Optional JSON values endpoint ({"values": [[...], ...]}) used instead of the Sheets API,
+# e.g. the local replay server in tools/fake_api_server.py
+COHORT_CALENDAR_VALUES_URL = os.environ.get("COHORT_CALENDAR_VALUES_URL", "").strip()
 
 
 def cohort_calendar_sheet_edit_url() -> str:
@@ -83,3 +173,11 @@ try:
     PROGRAM_SYNONYMS = json.loads(PROGRAM_SYNONYMS_TEXT)
 except Exception:
     PROGRAM_SYNONYMS = {}
+
+# Universal (cross-program) KB documents by versionless filename base, with
+# display names and roles (see src/kb_manifest.py)
+KB_DOCUMENTS_TEXT = load_config_file('KB_DOCUMENTS.json') or '{}'
+try:
+    KB_DOCUMENTS = json.loads(KB_DOCUMENTS_TEXT)
+except Exception:
+    KB_DOCUMENTS = {}
@@ -0,0 +1,237 @@
+"""
+Token budget manager for prompt assembly.
+
+Generation and faithfulness verification used to concatenate the full content of
+every selected chunk (plus whole syllabus files for breakdown requests), so prompt
+size - and latency - depended on whatever retrieval returned. pack_context() fills
+a per-call token budget instead: pinned docs first (full syllabi, the portfolio
+term index), then chunks by relevance score, dropping chunks that overlap content
+already packed. Full syllabi that don't fit are condensed by condense_syllabus(),
+which trims prose but never drops a unit/module/week heading, so breakdown answers
+still see the entire program structure.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tokens reserved per packed doc for the "[Chunk N - Source: ...]" header and separators
+_DOC_OVERHEAD_TOKENS = 20
+
+# A chunk whose word shingles are mostly already packed is an overlap duplicate
+# (static chunking repeats 75 tokens between neighbours; re-fetches repeat whole chunks)
+_SHINGLE_SIZE = 8
+_DUPLICATE_CONTAINMENT = 0.8
+
+
+# ---------------- Token counting ----------------
+
+@lru_cache(maxsize=1)
+def token_encoder():
+    """tiktoken encoder, or None when tiktoken/its encoding file is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.info(f"tiktoken unavailable, using character-based token estimate: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count for text (tiktoken o200k_base; ~4 chars/token estimate as fallback)."""
+    if not text:
+        return 0
+    enc = token_encoder()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+# ---------------- Overlap detection ----------------
+
+def _shingles(text: str) -> set:
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) < _SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + _SHINGLE_SIZE]) for i in range(len(words) - _SHINGLE_SIZE + 1)}
+
+
+def _is_overlap_duplicate(shingles: set, packed_shingles: set) -> bool:
+    if not shingles:
+        return True
+    contained = len(shingles & packed_shingles) / len(shingles)
+    return contained >= _DUPLICATE_CONTAINMENT
+
+
+# ---------------- Syllabus condensing ----------------
+
+_HEADING_LINE = re.compile(
+    r"^\s*(#{1,6}\s|\*\*\s*(unit|module|week|project|day|prework|final|capstone)\b"
+    r"|(unit|module|week|project|day)\s*\d+\b)",
+    re.IGNORECASE,
+)
+_HOURS_LINE = re.compile(r"\(\s*\d+\s*(hours?|h)\s*\)|\b\d+\s*hours?\b", re.IGNORECASE)
+_BULLET_LINE = re.compile(r"^\s*([-*•]|\d+[.)])\s+")
+_SECTION_BULLETS_KEPT = 4
+
+
+def _classify_line(line: str) -> str:
+    stripped = line.strip()
+    if not stripped:
+        return "blank"
+    if _HEADING_LINE.match(stripped):
+        return "heading"
+    if _BULLET_LINE.match(line):
+        return "bullet"
+    if len(stripped) <= 80 and (_HOURS_LINE.search(stripped) or stripped.endswith(":")):
+        return "label"  # short structural lines: "Key Topics:", "Duration: 400 hours"
+    return "prose"
+
+
+def _first_sentence(text: str, max_chars: int) -> str:
+    m = re.match(r"(.+?[.!?])(\s|$)", text.strip())
+    sentence = m.group(1) if m else text.strip()
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars].rstrip() + "..."
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    text = text.rstrip()
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "..."
+
+
+def _render_level(lines: List[Tuple[str, str]], level: int) -> str:
+    """
+    Condensing levels (structure kept at every level):
+    1 prose -> first sentence; 2 prose dropped, bullets trimmed;
+    3 first bullets of each section, trimmed hard; 4 headings and labels only.
+    """
+    out = []
+    section_bullets = 0
+    for kind, line in lines:
+        if kind == "heading":
+            section_bullets = 0
+        if kind == "blank":
+            if out and out[-1] != "":
+                out.append("")
+            continue
+        if kind in ("heading", "label"):
+            out.append(line.rstrip())
+        elif kind == "bullet":
+            if level <= 1:
+                out.append(line.rstrip())
+            elif level == 2:
+                out.append(_truncate(line, 140))
+            elif level == 3 and section_bullets < _SECTION_BULLETS_KEPT:
+                out.append(_truncate(line, 70))
+            section_bullets += 1
+        elif kind == "prose":
+            if level == 1:
+                out.append(_first_sentence(line, 220))
+    return "\n".join(out).strip()
+
+
+def condense_syllabus(content: str, max_tokens: int) -> str:
+    """
+    Shrink a full syllabus to max_tokens while keeping every heading (units,
+    modules, weeks, projects) and hour figure. Returns the least-condensed
+    version that fits; headings-only if nothing fits (structure beats budget).
+    """
+    if count_tokens(content) <= max_tokens:
+        return content
+    lines = [(_classify_line(line), line) for line in content.splitlines()]
+    condensed = content
+    for level in (1, 2, 3, 4):
+        condensed = _render_level(lines, level)
+        if count_tokens(condensed) <= max_tokens:
+            return condensed
+    return condensed
+
+
+# ---------------- Packing ----------------
+
+def _doc_priority(doc: Dict[str, Any]) -> float:
+    score = doc.get("relevance_score")
+    if score is None:
+        score = doc.get("score", 0.0)
+    try:
+        return float(score or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def pack_context(
+    docs: List[Dict[str, Any]],
+    budget_tokens: int,
+    max_docs: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Select and shape docs to fit budget_tokens.
+
+    Pinned docs (full_syllabus / pinned flags) are packed first, in their given
+    order; full syllabi that don't fit are condensed (a condensed copy is
+    returned, the input docs are never mutated). Remaining chunks are packed by
+    relevance_score (falling back to the retrieval score), skipping overlap
+    duplicates and any chunk that no longer fits.
+
+    Returns (packed_docs, stats).
+    """
+    stats = {
+        "budget_tokens": budget_tokens,
+        "input_docs": len(docs),
+        "packed_docs": 0,
+        "packed_tokens": 0,
+        "duplicates_dropped": 0,
+        "over_budget_dropped": 0,
+        "condensed_syllabi": 0,
+    }
+    pinned = [d for d in docs if d.get("full_syllabus") or d.get("pinned")]
+    # sorted() is stable: equal scores keep retrieval order
+    ranked = sorted(
+        (d for d in docs if not (d.get("full_syllabus") or d.get("pinned"))),
+        key=_doc_priority,
+        reverse=True,
+    )
+
+    packed: List[Dict[str, Any]] = []
+    packed_shingles: set = set()
+    remaining = budget_tokens
+
+    full_syllabi = [d for d in pinned if d.get("full_syllabus")]
+    # Leave room for supporting chunks next to whole syllabi
+    syllabus_share = int(budget_tokens * 0.8 / len(full_syllabi)) if full_syllabi else 0
+
+    for doc in pinned:
+        content = doc.get("content", "")
+        tokens = count_tokens(content)
+        if doc.get("full_syllabus") and tokens > syllabus_share:
+            content = condense_syllabus(content, max(syllabus_share - _DOC_OVERHEAD_TOKENS, 0))
+            tokens = count_tokens(content)
+            doc = {**doc, "content": content, "condensed": True}
+            stats["condensed_syllabi"] += 1
+        packed.append(doc)
+        packed_shingles |= _shingles(content)
+        remaining -= tokens + _DOC_OVERHEAD_TOKENS
+
+    for doc in ranked:
+        if max_docs is not None and len(packed) >= max_docs:
+            stats["over_budget_dropped"] += 1
+            continue
+        content = doc.get("content", "")
+        shingles = _shingles(content)
+        if _is_overlap_duplicate(shingles, packed_shingles):
+            stats["duplicates_dropped"] += 1
+            continue
+        cost = count_tokens(content) + _DOC_OVERHEAD_TOKENS
+        if cost > remaining:
+            stats["over_budget_dropped"] += 1
+            continue
+        packed.append(doc)
+        packed_shingles |= shingles
+        remaining -= cost
+
+    stats["packed_docs"] = len(packed)
+    stats["packed_tokens"] = budget_tokens - remaining
+    return packed, stats
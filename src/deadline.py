@@ -0,0 +1,70 @@
+"""
+Per-request deadline.
+
+Each call site used to pick its own timeout (8-60s), so refetch and refinement
+loops could push one question past gunicorn's 120s --timeout and get it killed
+with no reply. Now handle_mention/handle_message put an absolute
+request_deadline (epoch seconds) in the initial state, and:
+
+- instrument_node makes it the current deadline while a node runs (a context
+  variable, so relevance-assessment worker threads see it too);
+- call_openai_* and the retrieval call cap their timeout at the time remaining
+  (remaining_timeout) and skip the call outright once too little is left - the
+  callers already degrade gracefully on {} / "" / no docs;
+- routes check is_nearly_expired() and take the cheapest finishing path
+  instead of another retrieval or refinement round.
+
+Without a deadline (tools, tests invoking nodes directly) timeouts are unchanged.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# A call with less time than this left would only time out; it is skipped
+MIN_CALL_SECONDS = 2.0
+
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+
+def new_deadline(budget_seconds: float) -> float:
+    """Absolute deadline for a request starting now."""
+    return time.time() + budget_seconds
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """Make `deadline` the current request deadline for the enclosed code."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_seconds(state: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """Seconds left before the state's (or else the current) deadline; None if there is none."""
+    deadline = (state or {}).get("request_deadline") or _current_deadline.get()
+    if not deadline:
+        return None
+    return deadline - time.time()
+
+
+def remaining_timeout(default: float) -> Optional[float]:
+    """
+    Timeout for an outbound call: `default`, capped at the time remaining.
+    None when less than MIN_CALL_SECONDS is left (skip the call).
+    """
+    remaining = remaining_seconds()
+    if remaining is None:
+        return default
+    if remaining < MIN_CALL_SECONDS:
+        return None
+    return min(default, remaining)
+
+
+def is_nearly_expired(state: Dict[str, Any], reserve_seconds: float) -> bool:
+    """True when the request has a deadline and less than reserve_seconds remain."""
+    remaining = remaining_seconds(state)
+    return remaining is not None and remaining < reserve_seconds
@@ -0,0 +1,103 @@
+"""
+Per-request document store.
+
+Retrieved chunks (up to 50) and full syllabus texts used to ride inside RAGState,
+so every node transition and every checkpoint carried - and serialized - tens of
+KB of text. Now the text lives here, keyed by request, and the state carries
+references: the doc dict without 'content', plus a 'chunk_id'.
+
+- store_docs(state, docs) at the producers (retrieval, generation's term index)
+  moves the text into the request's store and returns the references.
+- hydrate_docs(state, docs) / doc_text(state, doc) where a prompt needs the text.
+- release_doc_store(store_id) once the request is answered.
+
+Docs that still carry 'content' pass through hydrate unchanged, so callers
+building states by hand (tests, tools) keep working. The store is bounded
+(least recently used requests are dropped first); a reference whose text is
+gone reads as empty content rather than failing the request.
+"""
+
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Concurrent requests per process stay far below this; it only bounds leaks
+# from callers that never release (tests, benchmarks)
+MAX_STORES = 256
+
+_STORES: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def chunk_id_for(doc: Dict[str, Any]) -> str:
+    """Stable id from source + text, so a chunk retrieved twice in a request is stored once."""
+    digest = hashlib.sha1(f"{doc.get('source', '')}\0{doc.get('content', '')}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _live_store(store_id: Optional[str]) -> Optional[Dict[str, str]]:
+    store = _STORES.get(store_id) if store_id else None
+    if store is not None:
+        _STORES.move_to_end(store_id)
+    return store
+
+
+def store_docs(state: Dict[str, Any], docs: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Move doc text into the request's store (created on first use).
+    Returns (doc_store_id, references) - put both in the node's returned state.
+    """
+    with _LOCK:
+        store_id = state.get("doc_store_id")
+        store = _live_store(store_id)
+        if store is None:
+            store_id = uuid.uuid4().hex
+            store = _STORES[store_id] = {}
+            while len(_STORES) > MAX_STORES:
+                _STORES.popitem(last=False)
+        refs = []
+        for doc in docs:
+            if "content" not in doc:
+                refs.append(doc)
+                continue
+            chunk_id = doc.get("chunk_id") or chunk_id_for(doc)
+            store[chunk_id] = doc["content"]
+            refs.append({**{k: v for k, v in doc.items() if k != "content"}, "chunk_id": chunk_id})
+    return store_id, refs
+
+
+def doc_text(state: Dict[str, Any], doc: Dict[str, Any]) -> str:
+    """The doc's text: inline 'content' if present, else looked up by chunk_id ('' if gone)."""
+    if "content" in doc:
+        return doc.get("content") or ""
+    with _LOCK:
+        store = _live_store(state.get("doc_store_id"))
+        return (store or {}).get(doc.get("chunk_id", ""), "")
+
+
+def hydrate_docs(state: Dict[str, Any], docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copies of the docs with 'content' filled in, for building prompts. State keeps the references."""
+    with _LOCK:
+        store = _live_store(state.get("doc_store_id")) or {}
+        return [
+            doc if "content" in doc else {**doc, "content": store.get(doc.get("chunk_id", ""), "")}
+            for doc in docs
+        ]
+
+
+def release_doc_store(store_id: Optional[str]) -> None:
+    if not store_id:
+        return
+    with _LOCK:
+        _STORES.pop(store_id, None)
+
+
+def doc_store_stats() -> Dict[str, int]:
+    with _LOCK:
+        return {
+            "stores": len(_STORES),
+            "chunks": sum(len(s) for s in _STORES.values()),
+            "chars": sum(len(text) for s in _STORES.values() for text in s.values()),
+        }
@@ -0,0 +1,133 @@
+"""
+Slack event de-duplication stores.
+
+Slack redelivers an event it thinks we missed, and a question handled twice
+costs a second full pipeline run. The old guard was a per-process
+deque(maxlen=512): O(n) membership checks, lost on restart, and invisible to
+other gunicorn workers and dynos. The stores here answer one atomic question,
+"have we seen this key in the last ttl_seconds?" (seen_or_add), in O(1):
+
+- MemoryDedupeStore: per process, bounded (oldest keys dropped first).
+- SQLiteDedupeStore: one file shared by all workers on a dyno, survives restarts.
+- RedisDedupeStore: SET NX EX against any Redis-compatible server (Redis,
+  Valkey, KeyDB, ...), shared across dynos.
+
+build_dedupe_store() picks one from config and falls back to memory when the
+chosen backend is unavailable; a backend error at lookup time also reads as
+"not seen" (a rare double answer beats dropping a question).
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Global SQLite cleanup of expired keys runs every this many inserts
+_SQLITE_SWEEP_EVERY = 200
+
+
+class MemoryDedupeStore:
+    """In-process store: dict lookups, keys expire after ttl_seconds, at most max_keys kept."""
+
+    def __init__(self, ttl_seconds: float = 3600, max_keys: int = 10000, clock=time.time):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._clock = clock
+        # key -> expiry; one TTL for all keys, so insertion order is expiry order
+        self._expires: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen_or_add(self, key: str) -> bool:
+        """True if key was already recorded and is unexpired; otherwise record it and return False."""
+        now = self._clock()
+        with self._lock:
+            while self._expires:
+                if next(iter(self._expires.values())) > now and len(self._expires) < self.max_keys:
+                    break
+                self._expires.popitem(last=False)
+            expires_at = self._expires.get(key)
+            if expires_at is not None and expires_at > now:
+                return True
+            self._expires.pop(key, None)
+            self._expires[key] = now + self.ttl_seconds
+            return False
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+class SQLiteDedupeStore:
+    """Keys in a SQLite table (primary-key lookups), shared by every process that opens the file."""
+
+    def __init__(self, path: str, ttl_seconds: float = 3600, clock=time.time):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_events (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+        self._inserts_since_sweep = 0
+
+    def seen_or_add(self, key: str) -> bool:
+        now = self._clock()
+        with self._lock:
+            # Inserts a new key, or revives an expired one; an unexpired key is left alone (0 rows changed)
+            cursor = self._conn.execute(
+                "INSERT INTO seen_events (key, expires_at) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at "
+                "WHERE seen_events.expires_at <= ?",
+                (key, now + self.ttl_seconds, now),
+            )
+            if cursor.rowcount == 0:
+                return True
+            self._inserts_since_sweep += 1
+            if self._inserts_since_sweep >= _SQLITE_SWEEP_EVERY:
+                self._inserts_since_sweep = 0
+                self._conn.execute("DELETE FROM seen_events WHERE expires_at <= ?", (now,))
+            return False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen_events").fetchone()[0]
+
+
+class RedisDedupeStore:
+    """SET key NX EX ttl on a Redis-compatible client (anything with redis-py's set() signature)."""
+
+    def __init__(self, client: Any, ttl_seconds: float = 3600, prefix: str = "slack-dedupe:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def seen_or_add(self, key: str) -> bool:
+        # SET NX returns None when the key already exists
+        created = self.client.set(f"{self.prefix}{key}", 1, nx=True, ex=max(1, int(self.ttl_seconds)))
+        return not created
+
+
+def build_dedupe_store(
+    backend: str = "memory",
+    sqlite_path: Optional[str] = None,
+    redis_url: Optional[str] = None,
+    ttl_seconds: float = 3600,
+):
+    """Dedupe store for Slack events; falls back to memory if the chosen backend is unavailable."""
+    if backend == "sqlite" and sqlite_path:
+        try:
+            return SQLiteDedupeStore(sqlite_path, ttl_seconds=ttl_seconds)
+        except sqlite3.Error as e:
+            logger.error(f"SQLite event dedupe store unavailable ({e}), using in-memory dedupe")
+    elif backend == "redis" and redis_url:
+        try:
+            import redis  # optional dependency, only needed for this backend
+            return RedisDedupeStore(redis.Redis.from_url(redis_url), ttl_seconds=ttl_seconds)
+        except Exception as e:
+            logger.error(f"Redis event dedupe store unavailable ({e}), using in-memory dedupe")
+    return MemoryDedupeStore(ttl_seconds=ttl_seconds)
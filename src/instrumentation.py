@@ -0,0 +1,308 @@
+"""
+Per-node instrumentation for the RAG workflow.
+
+Every node registered in build_workflow is wrapped with instrument_node(), which
+records wall time, LLM call count, prompt/completion tokens and prompt-cache hits
+for that node. The per-node entries are appended to state["metadata"]["trace"],
+aggregated into an in-process Prometheus registry (served on /metrics), and the
+full breakdown is logged for slow requests.
+"""
+
+import contextvars
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.deadline import deadline_scope
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------- Per-node LLM usage ----------------
+
+class _NodeUsage:
+    """LLM usage counters for one node execution (shared with worker threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cache_hits = 0
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.cached_tokens += cached_tokens
+            if cached_tokens > 0:
+                self.cache_hits += 1
+
+
+_current_usage: contextvars.ContextVar = contextvars.ContextVar("node_llm_usage", default=None)
+
+
+def _usage_field(obj: Any, name: str) -> int:
+    value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def record_llm_usage(usage: Any) -> None:
+    """
+    Attribute one LLM call to the node currently executing.
+    Accepts both Chat Completions (prompt_tokens/completion_tokens) and
+    Responses API (input_tokens/output_tokens) usage objects; no-op outside a node.
+    """
+    node_usage = _current_usage.get()
+    if node_usage is None:
+        return
+    prompt_tokens = completion_tokens = cached_tokens = 0
+    if usage is not None:
+        prompt_tokens = _usage_field(usage, "prompt_tokens") or _usage_field(usage, "input_tokens")
+        completion_tokens = _usage_field(usage, "completion_tokens") or _usage_field(usage, "output_tokens")
+        details = (
+            (usage.get("prompt_tokens_details") or usage.get("input_tokens_details"))
+            if isinstance(usage, dict)
+            else (getattr(usage, "prompt_tokens_details", None) or getattr(usage, "input_tokens_details", None))
+        )
+        if details is not None:
+            cached_tokens = _usage_field(details, "cached_tokens")
+    node_usage.add(prompt_tokens, completion_tokens, cached_tokens)
+
+
+def propagate_context(fn: Callable) -> Callable:
+    """
+    Bind fn to the caller's context so LLM calls made from ThreadPoolExecutor
+    workers are still attributed to the calling node.
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+# ---------------- Prometheus registry ----------------
+
+_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+class _MetricsRegistry:
+    """Minimal thread-safe counter/histogram store rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, List[float]]] = {}
+        self._help: Dict[str, tuple] = {}
+
+    def inc(self, name: str, help_text: str, labels: Dict[str, str], value: float = 1.0) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._help.setdefault(name, ("counter", help_text))
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, help_text: str, labels: Dict[str, str], value: float) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._help.setdefault(name, ("histogram", help_text))
+            series = self._histograms.setdefault(name, {})
+            # [bucket counts..., +Inf count, sum]
+            data = series.setdefault(key, [0.0] * (len(_DURATION_BUCKETS) + 2))
+            for i, bound in enumerate(_DURATION_BUCKETS):
+                if value <= bound:
+                    data[i] += 1
+            data[len(_DURATION_BUCKETS)] += 1
+            data[-1] += value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._help.clear()
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name in sorted(self._help):
+                metric_type, help_text = self._help[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                if metric_type == "counter":
+                    for key, value in sorted(self._counters.get(name, {}).items()):
+                        lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+                else:
+                    for key, data in sorted(self._histograms.get(name, {}).items()):
+                        for i, bound in enumerate(_DURATION_BUCKETS):
+                            lines.append(
+                                f"{name}_bucket{_format_labels(key + (('le', str(bound)),))} {_format_value(data[i])}"
+                            )
+                        count = data[len(_DURATION_BUCKETS)]
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {_format_value(count)}")
+                        lines.append(f"{name}_sum{_format_labels(key)} {data[-1]:.6f}")
+                        lines.append(f"{name}_count{_format_labels(key)} {_format_value(count)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(key: tuple) -> str:
+    if not key:
+        return ""
+    parts = []
+    for label, value in key:
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{label}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.6f}"
+
+
+METRICS = _MetricsRegistry()
+
+# Prometheus text exposition content type (served by the /metrics route)
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_metrics() -> str:
+    """Current metrics in Prometheus text exposition format."""
+    return METRICS.render()
+
+
+# ---------------- Node wrapper ----------------
+
+def instrument_node(name: str, node_fn: Callable) -> Callable:
+    """
+    Wrap a LangGraph node: time it, attribute its LLM calls, append the entry to
+    state["metadata"]["trace"] and update the node metrics. Exceptions are
+    recorded (as an error trace entry in the log) and re-raised unchanged.
+    The state's request_deadline is the current deadline while the node runs.
+    """
+
+    @functools.wraps(node_fn)
+    def wrapper(state):
+        usage = _NodeUsage()
+        token = _current_usage.set(usage)
+        start = time.perf_counter()
+        error = None
+        try:
+            with deadline_scope((state or {}).get("request_deadline")):
+                result = node_fn(state)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            _current_usage.reset(token)
+            _record_node_metrics(name, duration, usage, failed=error is not None)
+            if error is not None:
+                logger.warning(f"Node {name} failed after {duration:.2f}s: {error}")
+
+        entry = {
+            "node": name,
+            "duration_ms": round(duration * 1000, 1),
+            "llm_calls": usage.llm_calls,
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "cached_tokens": usage.cached_tokens,
+            "cache_hits": usage.cache_hits,
+            "cache_ratio": cache_ratio(usage.cached_tokens, usage.prompt_tokens),
+        }
+        if not isinstance(result, dict):
+            return result
+        metadata = dict(result.get("metadata") or {})
+        metadata["trace"] = list(metadata.get("trace") or []) + [entry]
+        return {**result, "metadata": metadata}
+
+    return wrapper
+
+
+def _record_node_metrics(name: str, duration: float, usage: _NodeUsage, failed: bool) -> None:
+    labels = {"node": name}
+    METRICS.inc("product_wizard_node_executions_total", "Workflow node executions.", labels)
+    if failed:
+        METRICS.inc("product_wizard_node_errors_total", "Workflow node executions that raised.", labels)
+    METRICS.observe("product_wizard_node_duration_seconds", "Workflow node wall time.", labels, duration)
+    METRICS.inc("product_wizard_llm_calls_total", "LLM API calls per node.", labels, usage.llm_calls)
+    METRICS.inc("product_wizard_llm_cache_hits_total", "LLM calls that reused cached prompt tokens.", labels, usage.cache_hits)
+    for kind, value in (
+        ("prompt", usage.prompt_tokens),
+        ("completion", usage.completion_tokens),
+        ("cached", usage.cached_tokens),
+    ):
+        METRICS.inc("product_wizard_llm_tokens_total", "LLM tokens per node.", {**labels, "kind": kind}, value)
+
+
+# ---------------- Request summary ----------------
+
+def cache_ratio(cached_tokens: int, prompt_tokens: int) -> float:
+    """Share of prompt tokens served from the provider's prompt cache (0.0-1.0)."""
+    return round(cached_tokens / prompt_tokens, 3) if prompt_tokens else 0.0
+
+
+def summarize_trace(trace: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totals across a request's node trace entries."""
+    prompt_tokens = sum(e.get("prompt_tokens", 0) for e in trace)
+    cached_tokens = sum(e.get("cached_tokens", 0) for e in trace)
+    return {
+        "nodes": len(trace),
+        "node_ms": round(sum(e.get("duration_ms", 0) for e in trace), 1),
+        "llm_calls": sum(e.get("llm_calls", 0) for e in trace),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": sum(e.get("completion_tokens", 0) for e in trace),
+        "cached_tokens": cached_tokens,
+        "cache_ratio": cache_ratio(cached_tokens, prompt_tokens),
+    }
+
+
+def format_trace(trace: List[Dict[str, Any]]) -> str:
+    """One line per node, slowest stage easy to spot in logs."""
+    return "\n".join(
+        f"  {e.get('node', '?'):<28} {e.get('duration_ms', 0):>9.1f}ms | llm={e.get('llm_calls', 0)} "
+        f"| prompt={e.get('prompt_tokens', 0)} completion={e.get('completion_tokens', 0)} "
+        f"cached={e.get('cached_tokens', 0)} ({cache_ratio(e.get('cached_tokens', 0), e.get('prompt_tokens', 0)):.0%})"
+        for e in trace
+    )
+
+
+def finish_request_trace(result: Optional[Dict[str, Any]], elapsed: float, threshold: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Record request-level metrics for one workflow invocation and log the full
+    per-node breakdown when it took longer than the slow-request threshold.
+    Returns the trace summary.
+    """
+    if threshold is None:
+        from src.config import SLOW_REQUEST_THRESHOLD_SECONDS
+        threshold = SLOW_REQUEST_THRESHOLD_SECONDS
+
+    trace = ((result or {}).get("metadata") or {}).get("trace") or []
+    summary = summarize_trace(trace)
+    METRICS.inc("product_wizard_requests_total", "Workflow invocations.", {})
+    METRICS.observe("product_wizard_request_duration_seconds", "End-to-end workflow wall time.", {}, elapsed)
+
+    if elapsed >= threshold:
+        METRICS.inc("product_wizard_slow_requests_total", "Workflow invocations over the slow-request threshold.", {})
+        logger.warning(
+            f"Slow request: {elapsed:.2f}s (threshold {threshold:.0f}s) | nodes={summary['nodes']} "
+            f"| llm_calls={summary['llm_calls']} | prompt_tokens={summary['prompt_tokens']} "
+            f"| completion_tokens={summary['completion_tokens']} | cached_tokens={summary['cached_tokens']} "
+            f"({summary['cache_ratio']:.0%})\n"
+            f"{format_trace(trace)}"
+        )
+    else:
+        logger.info(
+            f"Request completed in {elapsed:.2f}s | nodes={summary['nodes']} | llm_calls={summary['llm_calls']} "
+            f"| prompt_tokens={summary['prompt_tokens']} | completion_tokens={summary['completion_tokens']} "
+            f"| prompt_cache={summary['cache_ratio']:.0%}"
+        )
+    return summary
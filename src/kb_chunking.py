@@ -0,0 +1,362 @@
+"""
+Knowledge base build: Markdown -> TXT conversion and local chunk preview.
+
+knowledge_base/database (Markdown, the source of truth) and database_txt (what
+is uploaded to the vector store) used to be kept in sync by hand, and the
+static chunking (500 tokens, 75 overlap - tools/configure_vector_store_chunking.py,
+rebuild_vector_store.py, sync_vector_store.py) only ever happened remotely,
+where chunk boundaries cannot be inspected.
+
+md_to_txt() is the one conversion from a Markdown source to its uploaded text.
+chunk_text() reproduces the static chunking locally: fixed windows of
+max_tokens with overlap tokens shared between neighbours (tiktoken o200k_base,
+as src/context_budget.py counts; ~4 chars/token when tiktoken is unavailable),
+and chunk_stats() summarizes a chunk set - counts, token distribution and
+per-program coverage - so chunk size and overlap can be tuned offline before
+anything is uploaded (tools/build_kb_txt.py).
+
+Fixed windows cut units in half, which is why breakdown questions had to pull
+in whole syllabi. chunk_syllabus() is the structure-aware alternative: one
+chunk per Unit/Week/Module/Project heading with its hours attached, windows
+(restating the unit title) only for units longer than max_tokens, and one
+compact outline chunk per program (syllabus_outline()). With a character
+budget the outline also lists each unit's topics; breakdown answers are
+generated and verified against it instead of the full 30-60 KB syllabus
+(src/utils.load_syllabus_outline_docs).
+"""
+
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.context_budget import token_encoder
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_OVERLAP = 75
+
+# Chunks under this share of max_tokens are tails that carry little context
+_SHORT_CHUNK_RATIO = 0.25
+
+_EMPTY_HEADING = re.compile(r"^#{1,6}\s*$")
+_HTML_TAG_LINE = re.compile(r"^\s*</?[a-zA-Z][\w-]*(\s[^>]*)?>\s*$")
+
+
+# ---------------- Conversion ----------------
+
+def md_to_txt(markdown: str) -> str:
+    """
+    Uploaded text for a Markdown source. Markdown structure (headings, bullets,
+    bold labels) is kept - chunks and citations rely on it; editor residue is
+    dropped: HTML wrapper lines (<aside>), empty headings, trailing whitespace
+    and runs of blank lines.
+    """
+    out: List[str] = []
+    for line in markdown.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line = line.rstrip()
+        if _EMPTY_HEADING.match(line) or _HTML_TAG_LINE.match(line):
+            continue
+        if not line and (not out or not out[-1]):
+            continue
+        out.append(line)
+    return "\n".join(out).strip("\n") + "\n"
+
+
+# ---------------- Chunking ----------------
+
+def _count_tokens(text: str) -> int:
+    """Token count on the same scale as chunk_text's windows."""
+    enc = token_encoder()
+    return len(enc.encode(text, disallowed_special=())) if enc is not None else (len(text) + 3) // 4
+
+
+def chunk_text(
+    text: str,
+    source: str = "",
+    max_tokens: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+) -> List[Dict[str, Any]]:
+    """
+    Static chunking: consecutive windows of max_tokens, each starting
+    max_tokens - overlap after the previous one. Returns
+    [{"source", "index", "text", "tokens"}].
+    """
+    if overlap < 0 or overlap >= max_tokens:
+        raise ValueError(f"overlap must be in [0, {max_tokens}), got {overlap}")
+    if not text.strip():
+        return []
+    stride = max_tokens - overlap
+    enc = token_encoder()
+    if enc is not None:
+        tokens = enc.encode(text, disallowed_special=())
+        total, window, step = len(tokens), max_tokens, stride
+    else:
+        total, window, step = len(text), 4 * max_tokens, 4 * stride
+    chunks = []
+    start = 0
+    while True:
+        if enc is not None:
+            piece_tokens = tokens[start:start + window]
+            piece, count = enc.decode(piece_tokens), len(piece_tokens)
+        else:
+            piece = text[start:start + window]
+            count = (len(piece) + 3) // 4
+        chunks.append({"source": source, "index": len(chunks), "text": piece, "tokens": count})
+        # A window that reaches the end is the last one; a further window would be all overlap
+        if start + window >= total:
+            break
+        start += step
+    return chunks
+
+
+# ---------------- Structure-aware syllabus chunking ----------------
+
+_MD_HEADING = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+# Headings that open a unit of the curriculum; everything else is overview or a sub-heading
+_SECTION_TITLE = re.compile(
+    r"^((unit|week|module|m[oó]dulo|project)\s*\d+|(pre-?work|final|capstone)\b)", re.IGNORECASE,
+)
+_HEADING_ANCHOR = re.compile(r"\s*\{#[^}]*\}\s*$")
+_SECTION_HOURS = re.compile(r"\b(\d+)\s*(?:-\s*)?(?:hours?|hrs?|h)\b", re.IGNORECASE)
+_SECTION_WEEKS = re.compile(r"\b(\d+)\s*weeks?\b", re.IGNORECASE)
+_DURATION_LINE = re.compile(r"^\W*(duration|hours|length)\b", re.IGNORECASE)
+_HOURS_MENTION = re.compile(r"\b\d+[- ]?hours?\b", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def _heading_title(raw: str) -> str:
+    """'**Unit 0: Prework \\- Foundations (1 week)** {#anchor}' -> 'Unit 0: Prework - Foundations (1 week)'."""
+    title = _HEADING_ANCHOR.sub("", raw).replace("**", "")
+    title = re.sub(r"\\([-+.&#*_()])", r"\1", title)
+    return " ".join(title.split())
+
+
+def parse_syllabus(text: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Split a syllabus on its Unit/Week/Module/Project headings.
+
+    Returns (overview lines, sections); each section is {"title", "hours",
+    "weeks", "text"} and runs until the next heading at the same or a higher
+    level. Hours and weeks come from the heading ('Unit 1: SQL (40 hours)') or
+    a Duration line right under it; None when the syllabus does not say.
+    """
+    overview: List[str] = []
+    sections: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    for line in text.splitlines():
+        heading = _MD_HEADING.match(line)
+        title = _heading_title(heading.group(2)) if heading else ""
+        if heading and title:
+            level = len(heading.group(1))
+            if _SECTION_TITLE.match(title):
+                current = {"title": title, "level": level, "lines": [line]}
+                sections.append(current)
+                continue
+            if current is not None and level <= current["level"]:
+                current = None
+        (current["lines"] if current is not None else overview).append(line)
+
+    parsed = []
+    for section in sections:
+        body = [line for line in section["lines"][1:] if line.strip()][:3]
+        duration = next((line for line in body if _DURATION_LINE.match(line)), "")
+        hours = _SECTION_HOURS.search(section["title"]) or _SECTION_HOURS.search(duration)
+        weeks = _SECTION_WEEKS.search(section["title"]) or _SECTION_WEEKS.search(duration)
+        parsed.append({
+            "title": section["title"],
+            "hours": int(hours.group(1)) if hours else None,
+            "weeks": int(weeks.group(1)) if weeks else None,
+            "text": "\n".join(section["lines"]).strip(),
+        })
+    return overview, parsed
+
+
+def _program_duration(overview: List[str]) -> str:
+    """The first hours figure under a 'Duration' heading, else the first one in the overview prose."""
+    under_duration, anywhere = "", ""
+    in_duration = False
+    for line in overview:
+        heading = _MD_HEADING.match(line)
+        if heading:
+            in_duration = "duration" in heading.group(2).lower()
+            continue
+        # Table-of-contents links repeat unit hours, not the program's
+        if "](#" in line or not _HOURS_MENTION.search(line):
+            continue
+        text = _heading_title(line).strip(" *-\t")
+        text = re.sub(r"^duration:\s*", "", text, flags=re.IGNORECASE)
+        text = _SENTENCE_END.split(text, maxsplit=1)[0]
+        if in_duration and not under_duration:
+            under_duration = text
+        if not anywhere:
+            anywhere = text
+    duration = under_duration or anywhere
+    return duration if len(duration) <= 200 else duration[:200].rstrip() + "..."
+
+
+_TOPIC_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.*\S)")
+# Per-unit topic caps tried in turn until the outline fits its budget
+_TOPIC_CAPS = (None, 12, 8, 5, 3, 2, 1, 0)
+_TOPIC_MAX_CHARS = 90
+
+
+def outline_index(text: str, source: str = "") -> Dict[str, Any]:
+    """
+    Structured outline of a syllabus: {"name", "duration", "units": [{"title",
+    "hours", "weeks", "topics"}]}. Topics are the unit's bullet points, in order.
+    """
+    overview, sections = parse_syllabus(text)
+    units = []
+    for section in sections:
+        topics: List[str] = []
+        for line in section["text"].splitlines()[1:]:
+            bullet = _TOPIC_BULLET.match(line)
+            topic = _heading_title(bullet.group(1)) if bullet else ""
+            if topic and "](#" not in topic and topic not in topics:
+                topics.append(topic if len(topic) <= _TOPIC_MAX_CHARS else topic[:_TOPIC_MAX_CHARS].rstrip() + "...")
+        units.append({
+            "title": section["title"], "hours": section["hours"], "weeks": section["weeks"], "topics": topics,
+        })
+    return {
+        "name": re.sub(r"(_20\d{2}_\d{2})?\.(txt|md)$", "", source).replace("_", " ").strip(),
+        "duration": _program_duration(overview),
+        "units": units,
+    }
+
+
+def _render_outline(index: Dict[str, Any], topics_per_unit: Optional[int]) -> str:
+    lines = [f"Syllabus outline: {index['name']}" if index["name"] else "Syllabus outline"]
+    if index["duration"]:
+        lines.append(f"Duration: {index['duration']}")
+    for unit in index["units"]:
+        facts = []
+        if unit["hours"] is not None and not _SECTION_HOURS.search(unit["title"]):
+            facts.append(f"{unit['hours']} hours")
+        if unit["weeks"] is not None and not _SECTION_WEEKS.search(unit["title"]):
+            facts.append(f"{unit['weeks']} weeks" if unit["weeks"] != 1 else "1 week")
+        lines.append(f"- {unit['title']}" + (f" ({', '.join(facts)})" if facts else ""))
+        topics = unit["topics"] if topics_per_unit is None else unit["topics"][:topics_per_unit]
+        if topics:
+            more = len(unit["topics"]) - len(topics)
+            lines.append("  Topics: " + "; ".join(topics) + (f"; +{more} more" if more else ""))
+    return "\n".join(lines)
+
+
+def syllabus_outline(text: str, source: str = "", max_chars: Optional[int] = None) -> str:
+    """
+    Compact outline of a syllabus: its duration line and one line per
+    unit/module/project with hours. With max_chars each unit also lists its
+    topics - as many per unit as fit; every unit is kept even if the bare
+    list exceeds max_chars. Empty when the syllabus has no sections.
+    """
+    index = outline_index(text, source)
+    if not index["units"]:
+        return ""
+    if max_chars is None:
+        return _render_outline(index, 0)
+    for cap in _TOPIC_CAPS:
+        rendered = _render_outline(index, cap)
+        if len(rendered) <= max_chars:
+            return rendered
+    return rendered
+
+
+def chunk_syllabus(
+    text: str,
+    source: str = "",
+    max_tokens: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+) -> List[Dict[str, Any]]:
+    """
+    Structure-aware chunks: one per unit/module/project (split into windows,
+    each restating the section title, only when a section exceeds max_tokens),
+    the overview text in static windows, and one outline chunk for the whole
+    program. Chunks carry kind ("section" | "overview" | "outline"), section
+    and hours. Documents without unit headings get plain static chunks.
+    """
+    overview, sections = parse_syllabus(text)
+    if not sections:
+        return [{**chunk, "kind": "overview", "section": None, "hours": None}
+                for chunk in chunk_text(text, source, max_tokens, overlap)]
+
+    chunks: List[Dict[str, Any]] = []
+
+    def _add(piece: str, kind: str, section: Optional[str] = None, hours: Optional[int] = None):
+        chunks.append({
+            "source": source, "index": len(chunks), "text": piece, "tokens": _count_tokens(piece),
+            "kind": kind, "section": section, "hours": hours,
+        })
+
+    outline = syllabus_outline(text, source)
+    _add(outline, "outline")
+    for window in chunk_text("\n".join(overview), source, max_tokens, overlap):
+        _add(window["text"], "overview")
+    for section in sections:
+        if _count_tokens(section["text"]) <= max_tokens:
+            _add(section["text"], "section", section["title"], section["hours"])
+            continue
+        label = f"{section['title']} (continued)\n"
+        window_tokens = max(overlap + 1, max_tokens - _count_tokens(label))
+        windows = chunk_text(section["text"], source, window_tokens, overlap)
+        for i, window in enumerate(windows):
+            _add(window["text"] if i == 0 else label + window["text"], "section", section["title"], section["hours"])
+    return chunks
+
+
+# ---------------- Stats ----------------
+
+def _percentile(sorted_values: List[int], pct: float) -> int:
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))]
+
+
+def chunk_stats(
+    chunks: List[Dict[str, Any]],
+    max_tokens: int = DEFAULT_CHUNK_SIZE,
+    program_synonyms: Optional[Dict] = None,
+) -> Dict[str, Any]:
+    """
+    Chunk counts, token distribution, and per-program coverage (chunks and
+    tokens of each active program's documents; programs without any are
+    listed as uncovered).
+    """
+    from src.program_matcher import get_program_matcher
+
+    if program_synonyms is None:
+        from src.config import PROGRAM_SYNONYMS
+        program_synonyms = PROGRAM_SYNONYMS
+    matcher = get_program_matcher(program_synonyms)
+
+    sizes = sorted(chunk["tokens"] for chunk in chunks)
+    per_source: Dict[str, Dict[str, int]] = {}
+    for chunk in chunks:
+        entry = per_source.setdefault(chunk["source"], {"chunks": 0, "tokens": 0})
+        entry["chunks"] += 1
+        entry["tokens"] += chunk["tokens"]
+
+    active = [pid for pid, info in program_synonyms.items() if not (info or {}).get("discontinued")]
+    per_program: Dict[str, Dict[str, Any]] = {pid: {"chunks": 0, "tokens": 0, "sources": []} for pid in active}
+    for source, entry in sorted(per_source.items()):
+        for pid in matcher.programs_for_source(source):
+            if pid in per_program:
+                per_program[pid]["chunks"] += entry["chunks"]
+                per_program[pid]["tokens"] += entry["tokens"]
+                per_program[pid]["sources"].append(source)
+
+    return {
+        "chunks": len(chunks),
+        "sources": len(per_source),
+        "tokens": {
+            "total": sum(sizes),
+            "min": sizes[0] if sizes else 0,
+            "mean": round(sum(sizes) / len(sizes), 1) if sizes else 0.0,
+            "p50": _percentile(sizes, 50),
+            "p95": _percentile(sizes, 95),
+            "max": sizes[-1] if sizes else 0,
+        },
+        "short_chunks": sum(1 for size in sizes if size < _SHORT_CHUNK_RATIO * max_tokens),
+        "kinds": dict(Counter(chunk.get("kind", "window") for chunk in chunks)),
+        "per_source": per_source,
+        "per_program": per_program,
+        "uncovered_programs": sorted(pid for pid, entry in per_program.items() if not entry["chunks"]),
+    }
@@ -0,0 +1,190 @@
+"""
+Knowledge base manifest: what is in the KB, and which version it is.
+
+Dated filenames ("certifications_2025_07") used to be hard-coded wherever a node
+needed to recognize a cross-program document, so re-uploading a document with
+a new date silently broke certification boosting, citations and filtering -
+and nothing signalled that the KB had changed at all.
+
+The manifest is computed once at startup from knowledge_base/database (the
+Markdown sources) and knowledge_base/database_txt (what is uploaded to the
+vector store): a SHA-256 per file plus a version id over all of them. Caches
+key on kb_version(), so a KB edit invalidates exactly what depends on the KB.
+
+Which documents are universal (apply to every program), their display names
+and roles come from assistant_config/KB_DOCUMENTS.json, keyed by versionless
+filename base ('certifications'), so a re-dated file is recognized without a
+code change. Roles in use:
+- certification_info: boosted in relevance assessment for certification questions
+- citation: cited alongside the program syllabus when used for grounding
+Its "local_only" list names Markdown sources that are read locally but never
+converted to TXT for the vector store (tools/build_kb_txt.py).
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+from src.utils import strip_doc_version
+
+logger = logging.getLogger(__name__)
+
+KB_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "knowledge_base")
+KB_DIR = os.path.join(KB_ROOT, "database")
+KB_SUBDIRS = ("database", "database_txt")
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class KBManifest:
+    """Per-file content hashes for the KB plus the universal-document registry."""
+
+    def __init__(self, files: Dict[str, Dict], universal_documents: Optional[Dict[str, Dict]] = None):
+        # "database/Foo_2025_07.md" -> {"sha256", "size", "base"}
+        self.files = files
+        self.universal_documents = {
+            base.lower(): info or {} for base, info in (universal_documents or {}).items()
+        }
+        digest = hashlib.sha256()
+        for path in sorted(files):
+            digest.update(f"{path}\0{files[path]['sha256']}\n".encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
+
+    # ---------------- Universal documents ----------------
+
+    def universal_bases(self) -> List[str]:
+        """Versionless bases of the universal documents ('certifications', ...)."""
+        return list(self.universal_documents)
+
+    def universal_base(self, source: str) -> Optional[str]:
+        """The universal document a chunk source belongs to, or None."""
+        source_base = strip_doc_version(source)
+        if not source_base:
+            return None
+        if source_base in self.universal_documents:
+            return source_base
+        # Sources are occasionally reported with a prefix or suffix ('file-xyz_Certifications_2025_07')
+        for base in self.universal_documents:
+            if base in source_base:
+                return base
+        return None
+
+    def has_role(self, source: str, role: str) -> bool:
+        base = self.universal_base(source)
+        return bool(base) and role in (self.universal_documents[base].get("roles") or [])
+
+    def display_name(self, source: str) -> Optional[str]:
+        base = self.universal_base(source)
+        return self.universal_documents[base].get("display_name") if base else None
+
+    # ---------------- Change detection ----------------
+
+    def sources(self, subdir: str = "database") -> List[str]:
+        """File names in one KB subdirectory."""
+        prefix = f"{subdir}/"
+        return sorted(path[len(prefix):] for path in self.files if path.startswith(prefix))
+
+    def diff(self, previous: Optional["KBManifest"]) -> Dict[str, List[str]]:
+        """Files added, removed and modified since `previous` (everything is added when None)."""
+        before = previous.files if previous else {}
+        return {
+            "added": sorted(set(self.files) - set(before)),
+            "removed": sorted(set(before) - set(self.files)),
+            "modified": sorted(
+                path for path in set(self.files) & set(before)
+                if self.files[path]["sha256"] != before[path]["sha256"]
+            ),
+        }
+
+    def to_dict(self) -> Dict:
+        return {"version": self.version, "files": self.files}
+
+    @classmethod
+    def from_dict(cls, data: Dict, universal_documents: Optional[Dict[str, Dict]] = None) -> "KBManifest":
+        return cls(data.get("files") or {}, universal_documents)
+
+
+def build_manifest(
+    root: str = KB_ROOT,
+    subdirs: Iterable[str] = KB_SUBDIRS,
+    universal_documents: Optional[Dict[str, Dict]] = None,
+) -> KBManifest:
+    """Hash every file under the given KB subdirectories."""
+    if universal_documents is None:
+        from src.config import KB_DOCUMENTS
+        universal_documents = KB_DOCUMENTS.get("universal_documents", {})
+    files: Dict[str, Dict] = {}
+    for subdir in subdirs:
+        directory = os.path.join(root, subdir)
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            continue
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.isfile(path) and not name.startswith("."):
+                files[f"{subdir}/{name}"] = {
+                    "sha256": _sha256(path),
+                    "size": os.path.getsize(path),
+                    "base": strip_doc_version(name),
+                }
+    manifest = KBManifest(files, universal_documents)
+    known = {info["base"] for info in files.values()}
+    for base in manifest.universal_bases():
+        if base not in known:
+            logger.warning(f"Universal document '{base}' (KB_DOCUMENTS.json) has no file in the knowledge base")
+    return manifest
+
+
+def record_manifest(manifest: KBManifest, path: str) -> Dict[str, List[str]]:
+    """Log what changed since the manifest saved at `path`, then save this one there."""
+    previous = None
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            previous = KBManifest.from_dict(json.load(handle))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Previous KB manifest {path} unreadable: {e}")
+    changes = manifest.diff(previous)
+    if previous is not None and previous.version != manifest.version:
+        logger.info(
+            f"Knowledge base changed {previous.version} -> {manifest.version}: "
+            + ", ".join(f"{len(paths)} {kind}" for kind, paths in changes.items())
+        )
+        for kind, paths in changes.items():
+            for changed in paths:
+                logger.info(f"   {kind}: {changed}")
+    try:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as handle:
+            json.dump(manifest.to_dict(), handle, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Could not save KB manifest to {path}: {e}")
+    return changes
+
+
+_manifest: Optional[KBManifest] = None
+
+
+def get_kb_manifest() -> KBManifest:
+    """The process-wide manifest, built on first use (the workflow builds it at startup)."""
+    global _manifest
+    if _manifest is None:
+        _manifest = build_manifest()
+        logger.info(f"Knowledge base version {_manifest.version} ({len(_manifest.files)} files)")
+    return _manifest
+
+
+def kb_version() -> str:
+    """Version id of the knowledge base; key caches on this."""
+    return get_kb_manifest().version
@@ -0,0 +1,211 @@
+"""
+Batch execution of JSON LLM calls.
+
+The judge harness, fixture runs and cache pre-warming send hundreds of
+independent call_openai_json requests and do not need the answers within
+seconds. JsonBatch collects them (same arguments as call_openai_json, one
+custom_id each), writes them as Batch API JSONL, submits the file, polls until
+the batch finishes and maps every result back to its custom_id - half the
+price of synchronous calls and no per-minute rate limit to pace against.
+
+Backends:
+- OpenAIBatchBackend: the Batch API (files.create + batches.create/retrieve).
+- LocalBatchBackend: stand-in that runs the same JSONL lines through the
+  synchronous Chat Completions API (concurrently) and produces the same output
+  format. Full price, but no waiting - for development, tests, and models or
+  accounts without batch access.
+
+Results follow call_openai_json: the parsed JSON object, or {} for a request
+that failed, expired or returned unparseable content.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils import json_chat_request
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+# Batch statuses after which nothing more will happen
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def parse_batch_output(output_jsonl: str) -> Dict[str, Dict]:
+    """{custom_id: parsed JSON content or {}} from Batch API output/error lines."""
+    results: Dict[str, Dict] = {}
+    for line in output_jsonl.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            logger.error(f"Unparseable batch output line: {line[:200]}")
+            continue
+        custom_id = entry.get("custom_id")
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            logger.error(f"Batch request {custom_id} failed: {entry.get('error') or response.get('body')}")
+            results[custom_id] = {}
+            continue
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            results[custom_id] = json.loads(content)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logger.error(f"Batch request {custom_id} returned unusable content: {e}")
+            results[custom_id] = {}
+    return results
+
+
+class JsonBatch:
+    """Collects call_openai_json requests and runs them as one batch."""
+
+    def __init__(self):
+        self._requests: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(
+        self,
+        custom_id: str,
+        system_prompt: str,
+        user_prompt: str,
+        model: str = None,
+        schema: Dict = None,
+        schema_name: str = "response",
+    ) -> None:
+        """Queue one request; arguments as for call_openai_json (no timeout: batches have their own window)."""
+        if custom_id in self._requests:
+            raise ValueError(f"Duplicate batch custom_id: {custom_id}")
+        self._requests[custom_id] = json_chat_request(system_prompt, user_prompt, model, schema, schema_name)
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    def to_jsonl(self) -> str:
+        return "".join(
+            json.dumps(
+                {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body},
+                ensure_ascii=False,
+            ) + "\n"
+            for custom_id, body in self._requests.items()
+        )
+
+    def run(
+        self,
+        backend,
+        poll_interval: float = 30.0,
+        timeout: float = 24 * 3600,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> Dict[str, Dict]:
+        """
+        Submit, wait for completion and return {custom_id: result} for every
+        queued request. A batch that does not finish within `timeout` is
+        cancelled; its unfinished requests come back as {}.
+        """
+        if not self._requests:
+            return {}
+        batch_id = backend.submit(self.to_jsonl())
+        logger.info(f"Submitted batch {batch_id} with {len(self._requests)} request(s)")
+        started = time.monotonic()
+        while True:
+            status, output = backend.poll(batch_id)
+            if status in TERMINAL_STATUSES:
+                break
+            if time.monotonic() - started >= timeout:
+                logger.error(f"Batch {batch_id} still {status} after {timeout:.0f}s; cancelling")
+                backend.cancel(batch_id)
+                status, output = "cancelled", None
+                break
+            sleep(poll_interval)
+
+        parsed = parse_batch_output(output or "")
+        results = {custom_id: parsed.get(custom_id, {}) for custom_id in self._requests}
+        failed = sum(1 for result in results.values() if not result)
+        logger.info(
+            f"Batch {batch_id} {status} in {time.monotonic() - started:.0f}s | "
+            f"{len(results) - failed} ok, {failed} failed"
+        )
+        return results
+
+
+class OpenAIBatchBackend:
+    """The OpenAI Batch API."""
+
+    def __init__(self, client=None, completion_window: str = "24h"):
+        if client is None:
+            from src.config import openai_client as client
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, jsonl: str) -> str:
+        input_file = self.client.files.create(
+            file=("batch_input.jsonl", jsonl.encode("utf-8")), purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def poll(self, batch_id: str) -> Tuple[str, Optional[str]]:
+        """(status, output + error lines once terminal, else None)."""
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status not in TERMINAL_STATUSES:
+            return batch.status, None
+        parts = [
+            self.client.files.content(file_id).text
+            for file_id in (batch.output_file_id, batch.error_file_id)
+            if file_id
+        ]
+        return batch.status, "\n".join(parts)
+
+    def cancel(self, batch_id: str) -> None:
+        try:
+            self.client.batches.cancel(batch_id)
+        except Exception as e:
+            logger.error(f"Could not cancel batch {batch_id}: {e}")
+
+
+class LocalBatchBackend:
+    """Runs batch lines through the synchronous API; same input and output format as the Batch API."""
+
+    def __init__(self, client=None, workers: int = 4):
+        if client is None:
+            from src.config import openai_client as client
+        self.client = client
+        self.workers = workers
+        self._outputs: Dict[str, str] = {}
+
+    def _execute(self, line: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = self.client.chat.completions.create(**line["body"])
+            body = response.model_dump() if hasattr(response, "model_dump") else response
+            return {
+                "custom_id": line["custom_id"],
+                "response": {"status_code": 200, "body": body},
+                "error": None,
+            }
+        except Exception as e:
+            return {
+                "custom_id": line["custom_id"],
+                "response": None,
+                "error": {"message": str(e)},
+            }
+
+    def submit(self, jsonl: str) -> str:
+        lines: List[Dict[str, Any]] = [json.loads(line) for line in jsonl.splitlines() if line.strip()]
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            outputs = list(executor.map(self._execute, lines))
+        batch_id = f"local_batch_{len(self._outputs) + 1}"
+        self._outputs[batch_id] = "".join(json.dumps(o, ensure_ascii=False, default=str) + "\n" for o in outputs)
+        return batch_id
+
+    def poll(self, batch_id: str) -> Tuple[str, Optional[str]]:
+        return "completed", self._outputs.pop(batch_id, "")
+
+    def cancel(self, batch_id: str) -> None:
+        self._outputs.pop(batch_id, None)
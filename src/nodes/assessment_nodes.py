@@ -6,19 +6,32 @@ Nodes for relevance assessment and document filtering in the RAG workflow.
 
 import logging
 import json
+import time
 
 from src.state import RAGState
 from src.config import (
     RELEVANCE_ASSESSMENT_PROMPT,
     DOCUMENT_FILTERING_INSTRUCTIONS,
     PROGRAM_SYNONYMS,
+    RELEVANCE_MAX_CONCURRENCY,
 )
-from src.utils import call_openai_json, strip_doc_version
+from src.kb_manifest import get_kb_manifest
+from src.program_matcher import get_program_matcher
+from src.utils import call_openai_json
+from src.doc_store import doc_text
+from src.instrumentation import propagate_context
+from src.resilience import AIMDLimiter
 from src.slack_helpers import send_slack_update
 
 
 logger = logging.getLogger(__name__)
 
+# Shared by all requests in the process: batch calls back off together when
+# OpenAI slows down or errors, and ramp back up as calls succeed
+RELEVANCE_LIMITER = AIMDLimiter(
+    "relevance_assessment", initial=4, max_limit=RELEVANCE_MAX_CONCURRENCY, slow_seconds=15,
+)
+
 
 def relevance_assessment_node(state: RAGState) -> RAGState:
     """
@@ -104,7 +117,7 @@ def relevance_assessment_node(state: RAGState) -> RAGState:
     def _assess_batch(batch):
         """batch: list of (global_idx, doc). Returns {global_chunk_id: assessment}."""
         chunks_block = "\n\n".join(
-            f"Chunk {gidx+1} | Source: {doc.get('source', 'unknown')}\n{doc.get('content', '')[:400]}"
+            f"Chunk {gidx+1} | Source: {doc.get('source', 'unknown')}\n{doc_text(state, doc)[:400]}"
             for gidx, doc in batch
         )
         user_prompt = f"""
@@ -120,13 +133,19 @@ Return one assessment per chunk, keyed by chunk_id (matching the numbering above
 """
         # Short timeout on purpose: a failed/slow call degrades gracefully (its
         # chunks are kept at medium score), so waiting long here buys nothing
-        result = call_openai_json(
-            RELEVANCE_ASSESSMENT_PROMPT,
-            user_prompt,
-            timeout=25,
-            schema=_RELEVANCE_SCHEMA,
-            schema_name="relevance_assessments",
-        )
+        RELEVANCE_LIMITER.acquire()
+        started = time.perf_counter()
+        result = {}
+        try:
+            result = call_openai_json(
+                RELEVANCE_ASSESSMENT_PROMPT,
+                user_prompt,
+                timeout=25,
+                schema=_RELEVANCE_SCHEMA,
+                schema_name="relevance_assessments",
+            )
+        finally:
+            RELEVANCE_LIMITER.release(bool(result), time.perf_counter() - started)
         return {a.get("chunk_id"): a for a in (result.get("assessments") or [])}
 
     indexed = list(enumerate(docs_to_assess))
@@ -138,8 +157,10 @@ Return one assessment per chunk, keyed by chunk_id (matching the numbering above
         by_id = _assess_batch(batches[0])
     else:
         from concurrent.futures import ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=min(4, len(batches))) as executor:
-            for partial in executor.map(_assess_batch, batches):
+        # RELEVANCE_LIMITER decides how many of these actually call OpenAI at once
+        with ThreadPoolExecutor(max_workers=min(RELEVANCE_MAX_CONCURRENCY, len(batches))) as executor:
+            # propagate_context: batch LLM calls are still attributed to this node
+            for partial in executor.map(propagate_context(_assess_batch), batches):
                 by_id.update(partial)
 
     assessed_docs = []
@@ -169,14 +190,8 @@ Return one assessment per chunk, keyed by chunk_id (matching the numbering above
         elif query_intent == "certification":
             threshold = 0.2
             # BOOST: universal/overview documents carry the certification info
-            # even when they score low
-            doc_source_lower = doc_source.lower()
-            is_universal_or_overview = any(univ in doc_source_lower for univ in [
-                "certifications_2025_07",
-                "ironhack_portfolio_overview",
-                "course_design_overview"
-            ])
-            if is_universal_or_overview:
+            # even when they score low (certification_info role in KB_DOCUMENTS.json)
+            if get_kb_manifest().has_role(doc_source, "certification_info"):
                 relevance_score = max(relevance_score, 0.8)
                 should_include = True
             elif relevance_score >= 0.4:
@@ -185,7 +200,8 @@ Return one assessment per chunk, keyed by chunk_id (matching the numbering above
             threshold = 0.3
 
         if should_include and relevance_score >= threshold:
-            assessed_docs.append(doc)
+            # Score travels with the doc: prompt packing fills budgets by relevance
+            assessed_docs.append({**doc, "relevance_score": relevance_score})
             relevance_scores.append(relevance_score)
         else:
             rejection_reasons.append(f"Doc {idx+1}: {reasoning}")
@@ -234,16 +250,6 @@ def document_filtering_node(state: RAGState) -> RAGState:
     if not docs_to_filter:
         return {**state, "metadata": metadata}
 
-    # Universal documents that apply to all programs
-    UNIVERSAL_DOCUMENTS = [
-        "certifications_2025_07",
-        "course_design_overview_2025_07",
-        "computer_specs_min_requirements",
-        "ironhack_portfolio_overview_2025_07",
-        "mein_now_title_equivalence",
-        "discontinued_programs"
-    ]
-
     # Get valid programs (actual program IDs, not document names like "certifications")
     valid_programs = [prog_id for prog_id in detected_programs if prog_id in PROGRAM_SYNONYMS]
 
@@ -253,25 +259,18 @@ def document_filtering_node(state: RAGState) -> RAGState:
         logger.info("Portfolio-wide question - keeping docs from all programs")
         valid_programs = []
 
-    # Build expected source patterns for detected programs.
-    # Version-tolerant: match on the versionless filename base so a syllabus
-    # re-uploaded with a new date suffix (e.g. 2025_07 -> 2026_02) still matches.
-    expected_sources = set()
-    for prog_id in valid_programs:
-        prog_info = PROGRAM_SYNONYMS.get(prog_id, {})
-        filenames = prog_info.get("filenames", [])
-        for filename in filenames:
-            base = strip_doc_version(filename)
-            if base:
-                expected_sources.add(base)
+    # Each source resolves (memoized) to its program and whether it is a universal doc.
+    # Programs match on the versionless filename base, so a syllabus re-uploaded
+    # with a new date suffix (e.g. 2025_07 -> 2026_02) still matches.
+    matcher = get_program_matcher()
+    expected_programs = set(valid_programs)
 
     # Simple filtering: keep only matching docs
     source_filtered_docs = []
     program_doc_count = 0  # Track program-specific docs separately
 
     for doc in docs_to_filter:
-        source = doc.get("source", "").lower()
-        source_base = strip_doc_version(source)
+        program_id, is_universal = matcher.resolve_source(doc.get("source", ""))
 
         # Full syllabus docs were injected deliberately - always keep
         if doc.get("full_syllabus"):
@@ -280,7 +279,7 @@ def document_filtering_node(state: RAGState) -> RAGState:
             continue
 
         # Keep universal documents (but don't count toward program docs)
-        if any(univ in source for univ in UNIVERSAL_DOCUMENTS):
+        if is_universal:
             source_filtered_docs.append(doc)
             continue
 
@@ -291,7 +290,7 @@ def document_filtering_node(state: RAGState) -> RAGState:
             continue
 
         # Keep only docs matching detected program
-        if any(expected in source_base for expected in expected_sources):
+        if program_id in expected_programs:
             source_filtered_docs.append(doc)
             program_doc_count += 1
         else:
@@ -338,7 +337,7 @@ def document_filtering_node(state: RAGState) -> RAGState:
             docs_summary.append({
                 "chunk_id": idx + 1,
                 "source": doc.get("source", "unknown"),
-                "content_preview": doc.get("content", "")[:150]  # Reduced preview length
+                "content_preview": doc_text(state, doc)[:150]  # Reduced preview length
             })
 
         # Build comparison-specific or certification-specific context
@@ -413,38 +412,22 @@ Return as JSON: {{"kept_chunk_ids": [1, 2, 5, ...], "reasoning": "explanation"}}
             # For comparison queries, ensure we have docs from all programs
             if query_intent == "comparison" and valid_programs:
                 # Check if we have docs from all programs
-                programs_represented = set()
-                for doc in final_docs:
-                    source = doc.get("source", "").lower()
-                    for prog_id in valid_programs:
-                        prog_info = PROGRAM_SYNONYMS.get(prog_id, {})
-                        filenames = prog_info.get("filenames", [])
-                        for filename in filenames:
-                            base_filename = filename.replace(".txt", "").replace(".md", "").lower()
-                            if base_filename in source or filename.lower() in source:
-                                programs_represented.add(prog_id)
-                                break
+                programs_represented = {matcher.resolve_source(d.get("source", ""))[0] for d in final_docs}
 
-                # If missing programs, add top docs from missing programs
-                missing_programs = set(valid_programs) - programs_represented
+                # If missing programs, add the top doc of each from its bucket
+                missing_programs = [p for p in valid_programs if p not in programs_represented]
                 if missing_programs:
                     logger.warning(f"Comparison query missing docs from programs: {missing_programs}")
+                    final_ids = {id(d) for d in final_docs}
+                    top_by_program = {}
+                    for doc in filtered_docs:
+                        if id(doc) in final_ids:
+                            continue
+                        top_by_program.setdefault(matcher.resolve_source(doc.get("source", ""))[0], doc)
                     for prog_id in missing_programs:
-                        prog_info = PROGRAM_SYNONYMS.get(prog_id, {})
-                        filenames = prog_info.get("filenames", [])
-                        # Find top doc from this program
-                        for doc in filtered_docs:
-                            source = doc.get("source", "").lower()
-                            for filename in filenames:
-                                base_filename = filename.replace(".txt", "").replace(".md", "").lower()
-                                if base_filename in source or filename.lower() in source:
-                                    if doc not in final_docs:
-                                        final_docs.append(doc)
-                                        programs_represented.add(prog_id)
-                                        logger.info(f"Added doc from missing program: {prog_id}")
-                                        break
-                            if prog_id in programs_represented:
-                                break
+                        if prog_id in top_by_program:
+                            final_docs.append(top_by_program[prog_id])
+                            logger.info(f"Added doc from missing program: {prog_id}")
 
             # If AI filtering removed too many docs, be more permissive
             if len(final_docs) < 2 and len(filtered_docs) >= 2:
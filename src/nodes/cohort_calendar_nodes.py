@@ -126,12 +126,13 @@ def cohort_calendar_response_node(state: RAGState) -> RAGState:
         send_slack_update(state, "Answering from cohort calendar...")
         context = _format_cohort_context(rows)
         today_str = date.today().strftime("%A, %B %d, %Y")
+        # Static system prompt (cacheable prefix); today's date goes with the data
         system = (
             f"You are the Product Wizard, the Ironhack admissions team's assistant. "
             f"You answer questions about Ironhack cohorts/calendar using only the provided table. "
             f"Speak in the first person singular ('I found', 'I checked') - warm and direct, "
             f"like a sharp teammate on Slack, never 'we'. "
-            f"Today is {today_str}. "
+            f"Today's date is given with the data. "
             f"When the user asks about the 'next' or 'upcoming' cohort/start date, only consider cohorts "
             f"starting AFTER today - never present a past start date as 'next'. "
             f"If the user asks about a specific month or year, answer for that month/year only. "
@@ -141,7 +142,10 @@ def cohort_calendar_response_node(state: RAGState) -> RAGState:
             f"Do not make up information. "
             f"When the question is about who teaches: always give both Lead Teacher and Co-Teacher when present, and clearly label who is who (e.g. 'Lead teacher: X. Co-teacher: Y.')."
         )
-        user_content = f"Cohort calendar data (canceled cohorts are marked):\n\n{context}\n\nUser question: {query}"
+        user_content = (
+            f"Today is {today_str}.\n\n"
+            f"Cohort calendar data (canceled cohorts are marked):\n\n{context}\n\nUser question: {query}"
+        )
         answer = call_openai_text(system, user_content, timeout=30)
         if not answer:
             answer = "I couldn't generate an answer from the calendar. Please try again."
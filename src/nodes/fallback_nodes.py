@@ -7,12 +7,16 @@ in the RAG workflow.
 
 import logging
 import json
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from src.state import RAGState
 from src.config import (
     FUN_FALLBACK_GENERATION,
     REFINEMENT_STRATEGIES_PROMPT,
+    REQUEST_TIME_BUDGET_SECONDS,
 )
+from src.deadline import remaining_seconds
+from src.instrumentation import METRICS, summarize_trace
 from src.utils import (
     convert_markdown_to_slack,
     call_openai_json,
@@ -24,6 +28,37 @@ from src.slack_helpers import send_slack_update
 logger = logging.getLogger(__name__)
 
 
+# ---------------- Refinement rules ----------------
+# Failure modes whose strategy doesn't need judgement, checked in order before
+# the LLM strategy call: (rule, predicate over the failure analysis, strategy).
+# Only failures no rule matches go to REFINEMENT_STRATEGIES_PROMPT.
+_REFINEMENT_RULES: Tuple[Tuple[str, Callable[[Dict[str, Any]], bool], str], ...] = (
+    # Prevent infinite loops
+    ("max_iterations",
+     lambda a: a["iteration_count"] >= a["max_iterations"], "FUN_FALLBACK"),
+    # Another retrieval/generation/verification round would overrun the request deadline
+    ("time_budget",
+     lambda a: a["estimated_round_seconds"] > a["remaining_seconds"], "FUN_FALLBACK"),
+    # Fabrication/cross-contamination on the last allowed round: a retry won't fix it in time
+    ("critical_on_last_round",
+     lambda a: a["has_critical_violations"] and a["iteration_count"] + 1 >= a["max_iterations"], "FUN_FALLBACK"),
+    # Nothing survived filtering: retrieve more first...
+    ("no_docs",
+     lambda a: a["num_docs_retrieved"] == 0 and a["previous_strategy"] != "EXPAND_CHUNKS", "EXPAND_CHUNKS"),
+    # ...and if the larger retrieval found nothing either, the topic isn't documented
+    ("no_docs_after_expansion",
+     lambda a: a["num_docs_retrieved"] == 0, "FUN_FALLBACK"),
+)
+
+
+def select_refinement_rule(failure_analysis: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """(rule name, strategy) of the first rule matching the failure analysis, or None if ambiguous."""
+    for name, matches, strategy in _REFINEMENT_RULES:
+        if matches(failure_analysis):
+            return name, strategy
+    return None
+
+
 def iterative_refinement_node(state: RAGState) -> RAGState:
     """
     Determine and apply refinement strategy.
@@ -31,6 +66,8 @@ def iterative_refinement_node(state: RAGState) -> RAGState:
     - Relax filters
     - Enhance query
     - Generate fun fallback
+    Deterministic failure modes (see _REFINEMENT_RULES) are decided locally;
+    the LLM only picks a strategy for the ambiguous ones.
     """
     logger.info("=== Iterative Refinement Node ===")
 
@@ -39,19 +76,12 @@ def iterative_refinement_node(state: RAGState) -> RAGState:
     is_fallback = state.get("is_fallback", False)
     filtered_docs = state.get("filtered_docs", [])
     relevance_scores = state.get("relevance_scores", [])
+    metadata = state.get("metadata", {}) or {}
 
     # Prevent infinite loops - check query intent for max iterations
     query_intent = state.get("query_intent", "general_info")
     max_allowed_iterations = 3 if query_intent == "comparison" else 2
 
-    if iteration_count >= max_allowed_iterations:
-        logger.warning(f"Max iterations reached ({iteration_count}), forcing fun fallback")
-        return {
-            **state,
-            "refinement_strategy": "FUN_FALLBACK",
-            "iteration_count": iteration_count + 1
-        }
-
     # Analyze failure mode
     avg_relevance = sum(relevance_scores) / len(relevance_scores) if relevance_scores else 0.0
     num_docs = len(filtered_docs)
@@ -64,20 +94,51 @@ def iterative_refinement_node(state: RAGState) -> RAGState:
         "avg_relevance": avg_relevance
     }
 
-    user_prompt = f"""
+    # Time spent so far (node wall time from the request trace); a refinement
+    # round costs about as much as the passes before it. Time left comes from
+    # the request deadline, or the budget when the caller set none.
+    elapsed_seconds = summarize_trace(metadata.get("trace") or [])["node_ms"] / 1000
+    time_left = remaining_seconds(state)
+    if time_left is None:
+        time_left = REQUEST_TIME_BUDGET_SECONDS - elapsed_seconds
+    rule = select_refinement_rule({
+        **failure_analysis,
+        "max_iterations": max_allowed_iterations,
+        "has_critical_violations": state.get("has_critical_violations", False),
+        "previous_strategy": state.get("refinement_strategy", ""),
+        "estimated_round_seconds": elapsed_seconds / (iteration_count + 1),
+        "remaining_seconds": time_left,
+    })
+
+    if rule:
+        rule_name, selected_strategy = rule
+        refinement_params = {}
+        logger.info(
+            f"Refinement Strategy: {selected_strategy} (rule: {rule_name}, {time_left:.1f}s left) "
+            f"| Iteration: {iteration_count + 1}"
+        )
+    else:
+        rule_name = "llm"
+        user_prompt = f"""
 Failure Analysis:
 {json.dumps(failure_analysis, indent=2)}
 
 Determine the best refinement strategy to improve results.
 """
 
-    # Use faster model for refinement strategy selection (classification task)
-    result = call_openai_json(REFINEMENT_STRATEGIES_PROMPT, user_prompt, timeout=15)
+        # Use faster model for refinement strategy selection (classification task)
+        result = call_openai_json(REFINEMENT_STRATEGIES_PROMPT, user_prompt, timeout=15)
+
+        selected_strategy = result.get("selected_strategy", "FUN_FALLBACK")
+        refinement_params = result.get("parameters", {})
 
-    selected_strategy = result.get("selected_strategy", "FUN_FALLBACK")
-    refinement_params = result.get("parameters", {})
+        logger.info(f"Refinement Strategy: {selected_strategy} | Iteration: {iteration_count + 1}")
 
-    logger.info(f"Refinement Strategy: {selected_strategy} | Iteration: {iteration_count + 1}")
+    METRICS.inc(
+        "product_wizard_refinement_decisions_total",
+        "Refinement strategy decisions by deciding rule (llm = strategy LLM call).",
+        {"rule": rule_name, "strategy": selected_strategy},
+    )
 
     # Update state with refinement decision
     return {
@@ -85,8 +146,9 @@ Determine the best refinement strategy to improve results.
         "iteration_count": iteration_count + 1,
         "refinement_strategy": selected_strategy,
         "metadata": {
-            **state.get("metadata", {}),
+            **metadata,
             "refinement_applied": selected_strategy,
+            "refinement_rule": rule_name,
             "refinement_params": refinement_params
         }
     }
@@ -13,7 +13,14 @@ from src.config import (
     GENERATION_INSTRUCTIONS,
     COMPARISON_INSTRUCTIONS,
     PROGRAM_SYNONYMS,
+    GENERATION_CONTEXT_TOKEN_BUDGET,
+    MODEL_QUALITY,
 )
+from src.context_budget import pack_context
+from src.doc_store import hydrate_docs, store_docs
+from src.kb_manifest import get_kb_manifest
+from src.program_matcher import get_program_matcher
+from src.resilience import CLOSED, breaker_for
 from src.utils import (
     call_openai_text,
     format_conversation_history,
@@ -26,6 +33,23 @@ from src.slack_helpers import send_slack_update
 logger = logging.getLogger(__name__)
 
 
+def _local_index_answer(index_entries: list) -> str:
+    """Deterministic portfolio-wide answer: the term index's programs with their evidence lines."""
+    by_term = {}
+    for e in index_entries:
+        by_term.setdefault(e["term"], []).append(e)
+    sections = []
+    for term, entries in by_term.items():
+        lines = [f"- **{e['program_name']}**: {e['evidence']}" if e["evidence"] else f"- **{e['program_name']}**"
+                 for e in entries]
+        sections.append(f"Programs whose syllabus mentions \"{term}\":\n" + "\n".join(lines))
+    return (
+        "\n\n".join(sections)
+        + "\n\n_This list comes from a literal search of every program syllabus; a detailed answer "
+        "is not available right now, please ask again in a few minutes._"
+    )
+
+
 def generate_response_node(state: RAGState) -> RAGState:
     """
     Generate answer from filtered, relevant documents.
@@ -63,23 +87,48 @@ def generate_response_node(state: RAGState) -> RAGState:
                 ),
                 "source": ", ".join(index_sources),
                 "score": 1.0,
+                "pinned": True,
             }
-            filtered_docs = [index_doc] + filtered_docs
+            doc_store_id, index_refs = store_docs(state, [index_doc])
+            state = {**state, "doc_store_id": doc_store_id}
+            filtered_docs = index_refs + filtered_docs
             logger.info(f"Portfolio-wide term index: {len(index_entries)} matches across programs")
 
+            # OpenAI is failing: the index alone answers "which programs mention X"
+            if breaker_for("chat.completions", MODEL_QUALITY).state != CLOSED:
+                logger.warning("OpenAI circuit open - answering from the local term index")
+                return {
+                    **state,
+                    "filtered_docs": filtered_docs,
+                    "undocumented_entities": [],
+                    "generated_response": _local_index_answer(index_entries),
+                    "source_citations": unique_citations_from_docs(index_entries),
+                    "local_index_answer": True,
+                }
+
     if not filtered_docs:
         logger.warning("No documents available for generation")
         return {
             **state,
             "generated_response": "I don't have sufficient information in the curriculum documents to answer this question accurately.",
             "source_citations": [],
-            "is_fallback": True
+            "is_fallback": True,
+            "local_index_answer": False,
         }
 
-    # Compile context from filtered documents
-    # Include full chunk content - low usage volume makes cost negligible, completeness is more important
+    # Compile context from filtered documents within the token budget: pinned docs
+    # (full syllabi, term index) first, then chunks by relevance, overlaps dropped
+    packed_docs, pack_stats = pack_context(
+        hydrate_docs(state, filtered_docs), GENERATION_CONTEXT_TOKEN_BUDGET, max_docs=10
+    )
+    logger.info(
+        f"Context packed: {pack_stats['packed_docs']}/{pack_stats['input_docs']} docs, "
+        f"~{pack_stats['packed_tokens']}/{pack_stats['budget_tokens']} tokens "
+        f"(duplicates={pack_stats['duplicates_dropped']}, over_budget={pack_stats['over_budget_dropped']}, "
+        f"condensed_syllabi={pack_stats['condensed_syllabi']})"
+    )
     context_chunks = []
-    for idx, doc in enumerate(filtered_docs[:10]):
+    for idx, doc in enumerate(packed_docs):
         source = doc.get("source", "unknown")
         content = doc.get("content", "")
         context_chunks.append(f"[Chunk {idx+1} - Source: {source}]\n{content}")
@@ -111,13 +160,17 @@ def generate_response_node(state: RAGState) -> RAGState:
     if query_intent == "duration":
         duration_emphasis = "\n\nCRITICAL FOR DURATION QUERIES: If the retrieved documents contain a breakdown of hours (e.g., prework hours + course hours), you MUST include BOTH the total hours AND the breakdown in your response. Format: 'X hours total: Y hours prework + Z hours course' or similar format that clearly shows both total and breakdown."
 
-    # Breakdown requests get the complete syllabus in context - the answer must cover
-    # ALL of it, not a fragment (users previously got weeks 5-6 of a 9-week program)
+    # Breakdown requests get the complete syllabus (or its outline) in context - the answer
+    # must cover ALL of it, not a fragment (users previously got weeks 5-6 of a 9-week program)
     breakdown_emphasis = ""
     if state.get("is_breakdown_request", False):
+        syllabus_form = (
+            "a syllabus outline listing every unit with its hours and main topics"
+            if any(d.get("syllabus_outline") for d in packed_docs) else "the complete syllabus document"
+        )
         breakdown_emphasis = (
-            "\n\nCRITICAL FOR BREAKDOWN/OVERVIEW REQUESTS: The context includes the complete syllabus "
-            "document. Your answer MUST cover the ENTIRE program structure - every unit/module/week "
+            f"\n\nCRITICAL FOR BREAKDOWN/OVERVIEW REQUESTS: The context includes {syllabus_form}. "
+            "Your answer MUST cover the ENTIRE program structure - every unit/module/week "
             "present in the document, in order, from prework to final project. Do NOT stop partway, "
             "do NOT cover only some units, and do NOT tell the user to contact a team for the rest. "
             "Keep per-unit detail concise (topics and hours) so the full structure fits."
@@ -159,17 +212,25 @@ def generate_response_node(state: RAGState) -> RAGState:
         )
         logger.info(f"Undocumented entities in query: {_missing_entities}")
 
+    # Static instructions only: the system prompt must be a byte-identical prefix
+    # across requests so the provider's prompt cache can reuse it. Comparison
+    # instructions go last so non-comparison calls still share the longest prefix.
+    # Anything derived from the request (emphasis blocks) belongs in the user prompt.
     system_prompt = f"""{MASTER_PROMPT}
 
 {GENERATION_INSTRUCTIONS}
 
-{additional_instructions}
-{duration_emphasis}{breakdown_emphasis}{portfolio_emphasis}{entity_emphasis}
-
 CRITICAL: Generate answers ONLY from the provided document context. Never use external knowledge.
-"""
+{additional_instructions}"""
 
-    user_prompt = f"""
+    request_requirements = "".join(
+        (duration_emphasis, breakdown_emphasis, portfolio_emphasis, entity_emphasis)
+    ).strip()
+    requirements_block = (
+        f"\nRequest-Specific Requirements:\n{request_requirements}\n" if request_requirements else ""
+    )
+
+    user_prompt = f"""{requirements_block}
 User Query: "{enhanced_query}"
 Query Intent: {query_intent}
 Programs: {detected_programs}
@@ -204,14 +265,8 @@ Generate a comprehensive, accurate answer with proper source citations.
     # Universal docs (Certifications, Computer specs, ...) are legitimate grounding too:
     # excluding them attributed certification answers to the wrong file.
     valid_detected = [p for p in detected_programs if p in PROGRAM_SYNONYMS]
-    universal_docs = [
-        d for d in filtered_docs
-        if any(u in (d.get("source") or "").lower() for u in (
-            "certifications_2025_07", "computer_specs_min_requirements",
-            "course_design_overview", "ironhack_portfolio_overview",
-            "mein_now_title_equivalence",
-        ))
-    ]
+    manifest = get_kb_manifest()
+    universal_docs = [d for d in filtered_docs if manifest.has_role(d.get("source") or "", "citation")]
     syllabus_docs = (
         docs_for_program_syllabi(filtered_docs, valid_detected, PROGRAM_SYNONYMS) + universal_docs
         if valid_detected
@@ -232,7 +287,8 @@ Generate a comprehensive, accurate answer with proper source citations.
         # answers instead of looping them through refinement
         "undocumented_entities": _missing_entities,
         "generated_response": generated_response,
-        "source_citations": citations
+        "source_citations": citations,
+        "local_index_answer": False,
     }
 
 
@@ -272,6 +328,40 @@ def discontinued_program_response_node(state: RAGState) -> RAGState:
     }
 
 
+def answer_bank_response_node(state: RAGState) -> RAGState:
+    """
+    Serve the precomputed, verified answer for a template question (set by
+    triage only when the bank holds one built from the current KB). If the
+    entry is gone by now, it is a miss: answer_template is cleared and
+    route_after_answer_bank sends the question down the normal path.
+    """
+    logger.info("=== Answer Bank Response ===")
+    from src import answer_bank
+
+    program = (state.get("detected_programs") or [""])[0]
+    key = state.get("answer_template", "")
+    entry = answer_bank.ANSWER_BANK.get(program, key) if answer_bank.ANSWER_BANK else None
+    if entry is None:
+        # Triage saw the entry a moment ago; never post an empty answer for it
+        logger.warning(f"Answer bank entry vanished: {program} | {key}; answering through the pipeline")
+        return {**state, "answer_template": ""}
+
+    return {
+        **state,
+        "final_response": entry["response"],
+        "generated_response": entry["response"],
+        "source_citations": entry["citations"],
+        "metadata": {
+            **(state.get("metadata") or {}),
+            "answer_bank": {
+                "template": key,
+                "kb_version": entry.get("kb_version"),
+                "generated_at": entry.get("generated_at"),
+            },
+        },
+    }
+
+
 def _topic_aliases(topic: str) -> list:
     """
     Strict-equivalent aliases for a topic (Kubernetes -> K8s), via one small
@@ -416,34 +506,8 @@ def generate_negative_coverage_node(state: RAGState) -> RAGState:
     primary_program = valid_detected[0] if valid_detected else None
 
     if not primary_program:
-        query_lower = enhanced_query.lower()
-
-        def _alias_matches(alias: str) -> bool:
-            a = alias.lower().strip()
-            if not a:
-                return False
-            if len(a) <= 3 and re.match(r"^[a-z0-9]+$", a):
-                return bool(re.search(rf"(?<!\w){re.escape(a)}(?!\w)", query_lower))
-            return a in query_lower
-
-        alias_candidates = []
-        for prog_id, prog_info in PROGRAM_SYNONYMS.items():
-            for alias in prog_info.get("aliases", []):
-                alias_candidates.append((prog_id, alias))
-        alias_candidates.sort(key=lambda x: -len(x[1]))
-        for prog_id, alias in alias_candidates:
-            if _alias_matches(alias):
-                primary_program = prog_id
-                break
-        if not primary_program:
-            for prog_id, prog_info in PROGRAM_SYNONYMS.items():
-                for filename in prog_info.get("filenames", []):
-                    base_name = filename.replace("_", " ").replace(".txt", "").replace(".md", "").lower()
-                    if len(base_name) >= 4 and base_name in query_lower:
-                        primary_program = prog_id
-                        break
-                if primary_program:
-                    break
+        matcher = get_program_matcher()
+        primary_program = matcher.best_program(enhanced_query) or matcher.program_for_filename_phrase(enhanced_query)
 
     program_name = program_display_name(primary_program, PROGRAM_SYNONYMS)
 
@@ -21,6 +21,7 @@ from src.state import RAGState
 from src.nodes.query_nodes import query_enhancement_node, program_detection_node
 from src.slack_helpers import send_slack_update
 from src.utils import is_breakdown_request, is_portfolio_wide_query
+from src.instrumentation import propagate_context
 
 
 logger = logging.getLogger(__name__)
@@ -103,8 +104,8 @@ def parallel_query_processing_node(state: RAGState) -> RAGState:
         # executor.submit() schedules the function to run in a separate thread
         # We get a Future object that will eventually contain the result
         future_to_node = {
-            executor.submit(run_query_enhancement): "query_enhancement",
-            executor.submit(run_program_detection): "program_detection"
+            executor.submit(propagate_context(run_query_enhancement)): "query_enhancement",
+            executor.submit(propagate_context(run_program_detection)): "program_detection"
         }
 
         # Collect results as they complete using as_completed
@@ -5,16 +5,23 @@ Nodes for document retrieval in the RAG workflow.
 """
 
 import logging
+import time
 
 from src.state import RAGState
 from src.config import (
     VECTOR_STORE_ID,
     PROGRAM_SYNONYMS,
     MODEL_FAST,
+    SYLLABUS_OUTLINE_ENABLED,
+    SYLLABUS_OUTLINE_MAX_CHARS,
     openai_client,
 )
 from src.slack_helpers import send_slack_update
-from src.utils import load_full_syllabus_docs
+from src.utils import load_full_syllabus_docs, load_syllabus_outline_docs
+from src.deadline import remaining_timeout
+from src.resilience import breaker_for, is_degradation_error
+from src.doc_store import store_docs
+from src.instrumentation import record_llm_usage
 
 
 logger = logging.getLogger(__name__)
@@ -106,6 +113,30 @@ def hybrid_retrieval_node(state: RAGState) -> RAGState:
             "retrieval_stats": {"error": "Invalid vector store ID"}
         }
 
+    # Bounded by the request deadline; with no time left, answer from no docs
+    search_timeout = remaining_timeout(30)
+    if search_timeout is None:
+        logger.warning("Vector search skipped: request deadline reached")
+        return {
+            **state,
+            "retrieval_query": retrieval_query,
+            "retrieved_docs": [],
+            "retrieval_stats": {"error": "Request deadline reached"}
+        }
+
+    # Vector search degraded: fail fast instead of waiting out the timeout
+    breaker = breaker_for("responses", MODEL_FAST)
+    if not breaker.allow():
+        logger.warning(f"Vector search skipped: circuit {breaker.name} is open")
+        return {
+            **state,
+            "retrieval_query": retrieval_query,
+            "retrieved_docs": [],
+            "retrieval_stats": {"error": "Vector search circuit open"}
+        }
+    search_started = time.perf_counter()
+    resp = None
+
     # Perform vector search using OpenAI's Responses API (same as working system)
     try:
         # Use OpenAI's Responses API for vector search (non-deprecated approach)
@@ -161,8 +192,10 @@ def hybrid_retrieval_node(state: RAGState) -> RAGState:
             # 256, not lower: the cap must never truncate the tool call itself
             # (status=incomplete at 64 degraded retrieval for long queries)
             max_output_tokens=256,
-            timeout=30,
+            timeout=search_timeout,
         )
+        breaker.record(True, time.perf_counter() - search_started)
+        record_llm_usage(getattr(resp, "usage", None))
 
         logger.info(f"✅ Received response from OpenAI Responses API")
         logger.debug(f"Response type: {type(resp)}")
@@ -255,6 +288,8 @@ def hybrid_retrieval_node(state: RAGState) -> RAGState:
             logger.warning(f"⚠️  No documents retrieved from vector store")
 
     except Exception as e:
+        if resp is None:
+            breaker.record(not is_degradation_error(e), time.perf_counter() - search_started)
         logger.error(f"❌ Vector store retrieval failed: {e}")
         logger.error(f"❌ Query: {retrieval_query[:100]}")
         logger.error(f"❌ Vector Store ID: {VECTOR_STORE_ID}")
@@ -271,21 +306,30 @@ def hybrid_retrieval_node(state: RAGState) -> RAGState:
         logger.warning(f"⚠️  Returning empty results - system will handle gracefully")
 
     # For breakdown/overview questions, top-k chunks only surface fragments of the
-    # curriculum (users got weeks 5-6 of a 9-week program). Prepend the complete
-    # syllabus document(s) from the local knowledge base so generation sees the
-    # whole structure. Flagged full_syllabus=True so filtering keeps them.
+    # curriculum (users got weeks 5-6 of a 9-week program). Prepend the syllabus
+    # from the local knowledge base so generation sees the whole structure - as its
+    # outline index (every unit, hours, topics; a few KB) unless disabled, else the
+    # complete document. Flagged full_syllabus=True so filtering keeps them.
     if state.get("is_breakdown_request", False):
         valid_programs = [p for p in detected_programs if p in PROGRAM_SYNONYMS]
         if valid_programs:
-            full_docs = load_full_syllabus_docs(valid_programs, PROGRAM_SYNONYMS)
+            if SYLLABUS_OUTLINE_ENABLED:
+                full_docs = load_syllabus_outline_docs(valid_programs, PROGRAM_SYNONYMS, SYLLABUS_OUTLINE_MAX_CHARS)
+            else:
+                full_docs = load_full_syllabus_docs(valid_programs, PROGRAM_SYNONYMS)
             if full_docs:
                 retrieved_docs = full_docs + retrieved_docs
                 retrieval_stats["full_syllabus_docs"] = [d["source"] for d in full_docs]
+                retrieval_stats["syllabus_outlines"] = sum(1 for d in full_docs if d.get("syllabus_outline"))
                 logger.info(f"Prepended {len(full_docs)} full syllabus doc(s) for breakdown request")
 
+    # Text goes to the request's doc store; state carries references only
+    doc_store_id, retrieved_docs = store_docs(state, retrieved_docs)
+
     return {
         **state,
         "retrieval_query": retrieval_query,
         "retrieved_docs": retrieved_docs,
-        "retrieval_stats": retrieval_stats
+        "retrieval_stats": retrieval_stats,
+        "doc_store_id": doc_store_id,
     }
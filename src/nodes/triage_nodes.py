@@ -5,15 +5,23 @@ One structured LLM call performs what previously took four separate calls:
 query enhancement, program detection, cohort/calendar classification, and
 coverage-question classification. Strict structured output enforces the shape;
 deterministic backstops (breakdown/portfolio flags, cohort filter regexes)
-still run in code. Falls back to the legacy multi-call path if the call fails.
+still run in code. Falls back to the legacy multi-call path if the call fails,
+unless OpenAI is degraded (circuit open): then the rule-based result is used
+as-is rather than making more calls that would fail too.
 """
 
 import logging
 import json
+import threading
 import time
 
 from src.state import RAGState
-from src.config import UNIFIED_TRIAGE_PROMPT, PROGRAM_SYNONYMS
+from src import answer_bank
+from src.config import MODEL_FAST, UNIFIED_TRIAGE_PROMPT, PROGRAM_SYNONYMS, TRIAGE_RULES_MIN_CONFIDENCE
+from src.instrumentation import METRICS
+from src.program_matcher import get_program_matcher
+from src.resilience import CLOSED, breaker_for
+from src.triage_rules import rule_based_triage
 from src.utils import (
     call_openai_json,
     format_conversation_history,
@@ -76,6 +84,30 @@ def _program_reference() -> str:
     return "\n".join(lines)
 
 
+# Built once: instructions + program reference are static, so they form a
+# byte-identical system prompt the provider's prompt cache can reuse. Only the
+# query and conversation go in the user prompt.
+_TRIAGE_SYSTEM_PROMPT = f"""{UNIFIED_TRIAGE_PROMPT}
+
+Program ids and aliases:
+{_program_reference()}
+"""
+
+
+# Triage path counts for the skip-rate log line (also exported on /metrics)
+_triage_counts = {"rules": 0, "llm": 0}
+_triage_counts_lock = threading.Lock()
+
+
+def _count_triage_path(path: str) -> float:
+    """Record which path answered triage; returns the running LLM skip rate."""
+    METRICS.inc("product_wizard_triage_total", "Triage decisions by path (rules = LLM call skipped).", {"path": path})
+    with _triage_counts_lock:
+        _triage_counts[path] += 1
+        total = _triage_counts["rules"] + _triage_counts["llm"]
+        return _triage_counts["rules"] / total
+
+
 def unified_triage_node(state: RAGState) -> RAGState:
     """
     Single-call triage. Sets: enhanced_query, query_intent, ambiguity_score,
@@ -90,6 +122,19 @@ def unified_triage_node(state: RAGState) -> RAGState:
     conversation_stage = state.get("conversation_stage", "initial")
     conv_context = format_conversation_history(conversation_history, limit=5)
 
+    # Deterministic fast path: unambiguous questions don't need the LLM call
+    rules = rule_based_triage(query, is_follow_up=conversation_stage == "follow_up" or bool(conversation_history))
+    if rules["confidence"] >= TRIAGE_RULES_MIN_CONFIDENCE:
+        skip_rate = _count_triage_path("rules")
+        logger.info(
+            f"Rule-based triage (confidence {rules['confidence']:.2f}, rules={rules['rules_matched']}) - "
+            f"LLM triage skipped | skip rate {skip_rate:.0%}"
+        )
+        return _apply_triage_result(state, query, rules, start_time, triage_path="rules")
+
+    if breaker_for("chat.completions", MODEL_FAST).state != CLOSED:
+        return _degraded_triage(state, query, rules, start_time)
+
     user_prompt = f"""
 Conversation Stage: {"follow-up message within an existing Slack thread" if conversation_stage == "follow_up" else "new question kicking off a Slack thread"}
 
@@ -98,20 +143,20 @@ Original Query: "{query}"
 Conversation Context:
 {conv_context}
 
-Program ids and aliases:
-{_program_reference()}
-
 Analyze the query and return the triage JSON.
 """
 
     result = call_openai_json(
-        UNIFIED_TRIAGE_PROMPT,
+        _TRIAGE_SYSTEM_PROMPT,
         user_prompt,
         timeout=20,
         schema=_TRIAGE_SCHEMA,
         schema_name="query_triage",
     )
 
+    if not result and breaker_for("chat.completions", MODEL_FAST).state != CLOSED:
+        return _degraded_triage(state, query, rules, start_time)
+
     if not result:
         # Legacy fallback: run the old multi-call path so one failed API call
         # never takes the bot down
@@ -120,8 +165,30 @@ Analyze the query and return the triage JSON.
         from src.nodes.cohort_calendar_nodes import cohort_calendar_classification_node
         fallback_state = parallel_query_processing_node(state)
         fallback_state = cohort_calendar_classification_node(fallback_state)
-        return {**fallback_state, "triage_used": False}
+        # answer_template is otherwise only reset by _apply_triage_result; a value
+        # checkpointed from the previous turn must not serve this question
+        return {**fallback_state, "triage_used": False, "answer_template": ""}
+
+    skip_rate = _count_triage_path("llm")
+    logger.info(
+        f"LLM triage (rules confidence {rules['confidence']:.2f}, rules={rules['rules_matched']}) | "
+        f"skip rate {skip_rate:.0%}"
+    )
+    return _apply_triage_result(state, query, result, start_time, triage_path="llm")
+
+
+def _degraded_triage(state: RAGState, query: str, rules: dict, start_time: float) -> RAGState:
+    """OpenAI is failing: go with the low-confidence rule result instead of more LLM calls."""
+    skip_rate = _count_triage_path("rules")
+    logger.warning(
+        f"OpenAI circuit open - using rule-based triage (confidence {rules['confidence']:.2f}) | "
+        f"skip rate {skip_rate:.0%}"
+    )
+    return _apply_triage_result(state, query, rules, start_time, triage_path="rules_degraded")
 
+
+def _apply_triage_result(state: RAGState, query: str, result: dict, start_time: float, triage_path: str) -> RAGState:
+    """Validate a triage result (LLM or rules) and apply the deterministic backstops."""
     enhanced_query = (result.get("enhanced_query") or query).strip() or query
     query_intent = result.get("query_intent", "general_info")
     if query_intent not in _VALID_INTENTS:
@@ -148,11 +215,11 @@ Analyze the query and return the triage JSON.
 
     duration = time.perf_counter() - start_time
     logger.info(
-        f"Triage in {duration:.2f}s | intent={query_intent} | programs={detected_programs} | "
+        f"Triage ({triage_path}) in {duration:.2f}s | intent={query_intent} | programs={detected_programs} | "
         f"cohort={is_cohort} | coverage={is_coverage} | breakdown={is_breakdown} | portfolio={is_portfolio}"
     )
 
-    return {
+    triaged = {
         **state,
         "enhanced_query": enhanced_query,
         "query_intent": query_intent,
@@ -167,7 +234,24 @@ Analyze the query and return the triage JSON.
         "is_portfolio_wide": is_portfolio,
         "discontinued_program": discontinued_program,
         "triage_used": True,
+        "metadata": {**(state.get("metadata") or {}), "triage_path": triage_path},
     }
+    return {**triaged, "answer_template": _banked_template(query, triaged)}
+
+
+def _banked_template(query: str, triaged: dict) -> str:
+    """Template key when the answer bank holds a current answer for this question, else ""."""
+    bank = answer_bank.ANSWER_BANK
+    if bank is None or triaged.get("skip_answer_bank"):
+        return ""
+    key = answer_bank.match_template(query, triaged)
+    if not key or bank.get(triaged["detected_programs"][0], key) is None:
+        return ""
+    METRICS.inc("product_wizard_answer_bank_hits_total", "Questions answered from the precomputed answer bank.", {
+        "template": key.partition(":")[0],
+    })
+    logger.info(f"Answer bank hit: {triaged['detected_programs'][0]} | {key}")
+    return key
 
 
 def _detect_discontinued_program(text: str, detected_programs: list) -> str:
@@ -177,8 +261,6 @@ def _detect_discontinued_program(text: str, detected_programs: list) -> str:
     Analytics bootcamp 1 year long?" is a DA duration question, not a question
     about the discontinued 1-year program).
     """
-    import re as _re
-
     active_detected = [
         p for p in detected_programs
         if p in PROGRAM_SYNONYMS and not PROGRAM_SYNONYMS[p].get("discontinued")
@@ -186,17 +268,4 @@ def _detect_discontinued_program(text: str, detected_programs: list) -> str:
     if active_detected:
         return ""
 
-    text_lower = (text or "").lower()
-    for pid, info in PROGRAM_SYNONYMS.items():
-        if not info.get("discontinued"):
-            continue
-        for alias in info.get("aliases", []):
-            a = alias.lower().strip()
-            if not a:
-                continue
-            if len(a) <= 3:
-                if _re.search(rf"(?<!\w){_re.escape(a)}(?!\w)", text_lower):
-                    return pid
-            elif a in text_lower:
-                return pid
-    return ""
+    return get_program_matcher().first_program(text or "", "discontinued") or ""
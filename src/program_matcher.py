@@ -0,0 +1,251 @@
+"""
+Program detection from PROGRAM_SYNONYMS, compiled once.
+
+Alias and filename lookups used to loop over every program and alias per call
+(triage, discontinued-program detection, negative coverage, document filtering,
+source -> program mapping). ProgramMatcher compiles each lookup once, at
+startup, into a single prefix-factored regex (a character trie), so a query or
+chunk source is scanned once regardless of how many programs and aliases exist.
+Chunk sources resolve to (program id, is_universal) through a memo that is
+pre-filled from the knowledge base file list, so document filtering does one
+dict lookup per chunk. Universal documents are the ones the KB manifest
+registers (src/kb_manifest.py, assistant_config/KB_DOCUMENTS.json).
+
+The alias semantics of the call sites they replace are kept:
+- mentions() / best_program(): short alphanumeric aliases (<= 3 chars, codes like
+  'da', 'df') must stand alone, other aliases match as substrings. Scanning is
+  overlapping, so every alias occurrence is seen, not just the leftmost
+  non-overlapping ones.
+- first_program(): the first program in PROGRAM_SYNONYMS order with an alias in
+  the text (where it appears does not matter); every short alias must stand alone.
+- match_aliases(): every alias must stand alone; non-overlapping, leftmost and
+  longest first, with spans into the original text (used to rewrite codes).
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.kb_manifest import get_kb_manifest
+from src.utils import strip_doc_version
+
+# Chunk sources are a small, fixed set (the KB files); the cap only guards
+# against unbounded growth from unexpected source names
+_MAX_RESOLVED_SOURCES = 4096
+
+def _trie(items: List[str]) -> str:
+    """
+    Prefix-factored alternation ('ai(?: (?:eng|pm)|...)?'), so each position costs
+    one walk down a character trie instead of one attempt per alias. Optional
+    suffixes are greedy: the longest item matching at a position wins.
+    """
+    root: Dict = {}
+    for item in items:
+        node = root
+        for ch in item:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(root)
+
+
+def _mention_pattern(aliases: List[str], bound_symbols: bool = False) -> str:
+    """
+    Short aliases (codes) must stand alone; longer ones match anywhere. Short
+    aliases with symbols ('c#') match anywhere too, unless bound_symbols.
+    """
+    def bounded(alias: str) -> bool:
+        return len(alias) <= 3 and (bound_symbols or bool(re.match(r"^[a-z0-9]+$", alias)))
+
+    long_ = [a for a in aliases if not bounded(a)]
+    short = [a for a in aliases if bounded(a)]
+    parts = []
+    if long_:
+        parts.append(_trie(long_))
+    if short:
+        parts.append(rf"(?<!\w){_trie(short)}(?!\w)")
+    return "|".join(parts)
+
+
+class ProgramMatcher:
+    """Precompiled alias and filename patterns for one PROGRAM_SYNONYMS mapping."""
+
+    def __init__(
+        self,
+        program_synonyms: Dict,
+        universal_documents: Optional[Iterable[str]] = None,
+        known_sources: Iterable[str] = (),
+    ):
+        # Cross-program documents that apply to every program (versionless bases,
+        # matched as substrings of the lowercased source name)
+        if universal_documents is None:
+            universal_documents = get_kb_manifest().universal_bases()
+        self._order: Dict[str, int] = {pid: i for i, pid in enumerate(program_synonyms)}
+
+        # alias -> (pid, rank); rank reproduces the old "longest alias first,
+        # then program order" candidate list, so ties resolve the same way
+        candidates: List[Tuple[str, str]] = []
+        discontinued = set()
+        # Per-program patterns, in program order, for first_program()
+        self._program_patterns: List[Tuple[str, "re.Pattern"]] = []
+        for pid, info in program_synonyms.items():
+            info = info or {}
+            if info.get("discontinued"):
+                discontinued.add(pid)
+            own = [a for a in (alias.lower().strip() for alias in info.get("aliases", [])) if a]
+            candidates.extend((pid, a) for a in own)
+            if own:
+                self._program_patterns.append(
+                    (pid, re.compile(_mention_pattern(own, bound_symbols=True), re.IGNORECASE))
+                )
+        self._discontinued = discontinued
+        candidates.sort(key=lambda c: -len(c[1]))
+        self._aliases: Dict[str, Tuple[str, int]] = {}
+        for rank, (pid, alias) in enumerate(candidates):
+            self._aliases.setdefault(alias, (pid, rank))
+
+        subsets = {
+            "all": list(self._aliases),
+            "active": [a for a, (pid, _) in self._aliases.items() if pid not in discontinued],
+            "discontinued": [a for a, (pid, _) in self._aliases.items() if pid in discontinued],
+        }
+        self._mention_patterns: Dict[str, Optional["re.Pattern"]] = {}
+        self._bounded_patterns: Dict[str, Optional["re.Pattern"]] = {}
+        for subset, aliases in subsets.items():
+            if not aliases:
+                self._mention_patterns[subset] = self._bounded_patterns[subset] = None
+                continue
+            # Zero-width lookahead: one match attempt per position (overlapping scan)
+            self._mention_patterns[subset] = re.compile(rf"(?=({_mention_pattern(aliases)}))", re.IGNORECASE)
+            self._bounded_patterns[subset] = re.compile(rf"(?<!\w){_trie(aliases)}(?!\w)", re.IGNORECASE)
+
+        # Versionless syllabus filename bases ('devops_bootcamp') for chunk sources,
+        # and their spelled-out form ('devops bootcamp 2025 07') for free text
+        self._bases: Dict[str, str] = {}
+        self._phrases: Dict[str, str] = {}
+        for pid, info in program_synonyms.items():
+            for fn in (info or {}).get("filenames", []):
+                base = strip_doc_version(fn)
+                if base:
+                    self._bases.setdefault(base, pid)
+                phrase = fn.replace("_", " ").replace(".txt", "").replace(".md", "").lower()
+                if len(phrase) >= 4:
+                    self._phrases.setdefault(phrase, pid)
+        self._source_pattern = (
+            re.compile(rf"(?=({_trie(list(self._bases))}))") if self._bases else None
+        )
+        self._phrase_pattern = (
+            re.compile(rf"(?=({_trie(list(self._phrases))}))", re.IGNORECASE)
+            if self._phrases else None
+        )
+
+        universal = [u.lower() for u in universal_documents if u]
+        self._universal_pattern = re.compile(_trie(universal)) if universal else None
+        # source -> (program id, is_universal), precomputed for the KB files
+        self._resolved: Dict[str, Tuple[Optional[str], bool]] = {}
+        for source in known_sources:
+            self.resolve_source(source)
+
+    # ---------------- Aliases ----------------
+
+    def mentions(self, text: str, subset: str = "all") -> List[Tuple[str, str, int]]:
+        """(program id, alias, start) for every alias occurrence, in text order."""
+        pattern = self._mention_patterns.get(subset)
+        if not pattern or not text:
+            return []
+        out = []
+        for m in pattern.finditer(text):
+            alias = m.group(1).lower()
+            out.append((self._aliases[alias][0], alias, m.start()))
+        return out
+
+    def first_program(self, text: str, subset: str = "all") -> Optional[str]:
+        """First program (PROGRAM_SYNONYMS order) with an alias in text, else None."""
+        if not text:
+            return None
+        for pid, pattern in self._program_patterns:
+            if subset != "all" and (pid in self._discontinued) != (subset == "discontinued"):
+                continue
+            if pattern.search(text):
+                return pid
+        return None
+
+    def best_program(self, text: str, subset: str = "all") -> Optional[str]:
+        """Program of the longest alias mentioned in text (program order breaks ties)."""
+        hits = self.mentions(text, subset)
+        if not hits:
+            return None
+        alias = min((a for _, a, _ in hits), key=lambda a: self._aliases[a][1])
+        return self._aliases[alias][0]
+
+    def match_aliases(self, text: str, subset: str = "all") -> List[Tuple[str, str, Tuple[int, int]]]:
+        """(program id, alias, span) for stand-alone alias mentions, non-overlapping."""
+        pattern = self._bounded_patterns.get(subset)
+        if not pattern or not text:
+            return []
+        return [
+            (self._aliases[m.group(0).lower()][0], m.group(0).lower(), m.span())
+            for m in pattern.finditer(text)
+        ]
+
+    # ---------------- Filenames ----------------
+
+    def programs_for_source(self, source: str) -> List[str]:
+        """Program ids whose syllabus filename base occurs in the (versionless) source name."""
+        src_base = strip_doc_version(source or "")
+        if not src_base or not self._source_pattern:
+            return []
+        pids = {self._bases[m.group(1)] for m in self._source_pattern.finditer(src_base)}
+        return sorted(pids, key=self._order.get)
+
+    def program_for_source(self, source: str) -> Optional[str]:
+        pids = self.programs_for_source(source)
+        return pids[0] if pids else None
+
+    def resolve_source(self, source: str) -> Tuple[Optional[str], bool]:
+        """(program id or None, is_universal) for a chunk source, memoized per source name."""
+        source = source or ""
+        cached = self._resolved.get(source)
+        if cached is None:
+            is_universal = bool(self._universal_pattern and self._universal_pattern.search(source.lower()))
+            cached = (self.program_for_source(source), is_universal)
+            if len(self._resolved) < _MAX_RESOLVED_SOURCES:
+                self._resolved[source] = cached
+        return cached
+
+    def program_for_filename_phrase(self, text: str) -> Optional[str]:
+        """Program whose spelled-out syllabus filename appears in free text."""
+        if not self._phrase_pattern or not text:
+            return None
+        pids = {self._phrases[m.group(1).lower()] for m in self._phrase_pattern.finditer(text)}
+        return min(pids, key=self._order.get) if pids else None
+
+
+def _kb_sources() -> List[str]:
+    return get_kb_manifest().sources("database")
+
+
+# Keyed by mapping identity; in production there is exactly one (PROGRAM_SYNONYMS)
+_MATCHERS: Dict[int, Tuple[Dict, ProgramMatcher]] = {}
+_MAX_CACHED_MATCHERS = 16
+
+
+def get_program_matcher(program_synonyms: Optional[Dict] = None) -> ProgramMatcher:
+    """Shared matcher for a synonyms mapping (default: PROGRAM_SYNONYMS), built on first use."""
+    if program_synonyms is None:
+        from src.config import PROGRAM_SYNONYMS
+        program_synonyms = PROGRAM_SYNONYMS
+    cached = _MATCHERS.get(id(program_synonyms))
+    if cached is not None and cached[0] is program_synonyms:
+        return cached[1]
+    if len(_MATCHERS) >= _MAX_CACHED_MATCHERS:
+        _MATCHERS.clear()
+    matcher = ProgramMatcher(program_synonyms, known_sources=_kb_sources())
+    _MATCHERS[id(program_synonyms)] = (program_synonyms, matcher)
+    return matcher
@@ -0,0 +1,209 @@
+"""
+Circuit breakers and adaptive concurrency for OpenAI calls.
+
+When OpenAI degrades, every node used to wait out its full timeout before
+call_openai_json returned {} - and the legacy triage fallback then made more
+calls. Now:
+
+- CircuitBreaker (one per endpoint + model, via breaker_for) watches a sliding
+  window of recent calls. When enough of them failed (timeouts, connection
+  errors, 429s, 5xx) or were slow, it opens and calls fail fast for
+  open_seconds; callers take their existing deterministic paths ({} / "" / no
+  docs, rule triage). Then a single probe call is let through: success closes
+  the circuit, failure re-opens it.
+- AIMDLimiter caps concurrent calls for a fan-out (the relevance batches):
+  each success under the latency target raises the limit additively (+1 per
+  limit's worth of successes), each failure or slow call halves it.
+
+Both are per process and thread-safe. State changes are exported on /metrics.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from src.instrumentation import METRICS
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Error/latency-window circuit breaker for one endpoint."""
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_ratio: float = 0.5,
+        slow_call_seconds: float = 30.0,
+        open_seconds: float = 30.0,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # True per call that failed or was slow
+        self._outcomes: deque = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        if state == OPEN:
+            self._opened_at = self._clock()
+        if state in (OPEN, CLOSED):
+            self._probe_in_flight = False
+        if state == CLOSED:
+            self._outcomes.clear()
+        logger.warning(f"Circuit {self.name} -> {state}")
+        METRICS.inc(
+            "product_wizard_circuit_transitions_total",
+            "OpenAI circuit breaker state changes.",
+            {"breaker": self.name, "state": state},
+        )
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (False = fail fast)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+        METRICS.inc(
+            "product_wizard_circuit_rejections_total",
+            "OpenAI calls failed fast by an open circuit.",
+            {"breaker": self.name},
+        )
+        return False
+
+    def record(self, success: bool, duration: float) -> None:
+        """Outcome of a call that allow() let through."""
+        bad = not success or duration > self.slow_call_seconds
+        with self._lock:
+            state = self._current_state()
+            if state == HALF_OPEN:
+                self._transition(OPEN if bad else CLOSED)
+                return
+            if state == OPEN:
+                return
+            self._outcomes.append(bad)
+            if len(self._outcomes) >= self.min_calls and (
+                sum(self._outcomes) / len(self._outcomes) >= self.failure_ratio
+            ):
+                self._transition(OPEN)
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def breaker_for(endpoint: str, model: str) -> CircuitBreaker:
+    """The process-wide breaker for an endpoint + model (created on first use from config)."""
+    name = f"{endpoint}:{model}"
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(name)
+        if breaker is None:
+            from src.config import (
+                CIRCUIT_FAILURE_RATIO,
+                CIRCUIT_MIN_CALLS,
+                CIRCUIT_OPEN_SECONDS,
+                CIRCUIT_SLOW_CALL_SECONDS,
+                CIRCUIT_WINDOW,
+            )
+            breaker = _BREAKERS[name] = CircuitBreaker(
+                name,
+                window=CIRCUIT_WINDOW,
+                min_calls=CIRCUIT_MIN_CALLS,
+                failure_ratio=CIRCUIT_FAILURE_RATIO,
+                slow_call_seconds=CIRCUIT_SLOW_CALL_SECONDS,
+                open_seconds=CIRCUIT_OPEN_SECONDS,
+            )
+        return breaker
+
+
+def reset_breakers() -> None:
+    with _BREAKERS_LOCK:
+        _BREAKERS.clear()
+
+
+def is_degradation_error(error: Exception) -> bool:
+    """Errors that say the service is struggling (as opposed to a bad request of ours)."""
+    import openai
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease limit on concurrent calls."""
+
+    def __init__(
+        self,
+        name: str,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        backoff: float = 0.5,
+        slow_seconds: Optional[float] = None,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.slow_seconds = slow_seconds
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        with self._cond:
+            return int(self._limit)
+
+    def acquire(self) -> None:
+        """Block until fewer than `limit` calls are in flight."""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, success: bool, duration: float) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            slow = self.slow_seconds is not None and duration > self.slow_seconds
+            if success and not slow:
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            else:
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+            METRICS.inc(
+                "product_wizard_concurrency_adjustments_total",
+                "AIMD concurrency limit adjustments (increase on success, decrease on failure/slow).",
+                {"limiter": self.name, "direction": "increase" if success and not slow else "decrease"},
+            )
+            self._cond.notify_all()
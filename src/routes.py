@@ -4,6 +4,8 @@ Defines conditional routing logic for the RAG pipeline.
 """
 
 import logging
+from src.config import REQUEST_DEADLINE_RESERVE_SECONDS
+from src.deadline import is_nearly_expired
 from src.state import RAGState
 from src.utils import is_valid_coverage_topic
 
@@ -11,16 +13,26 @@ logger = logging.getLogger(__name__)
 
 
 def route_after_cohort_calendar_classification(state: RAGState) -> str:
-    """Route after triage: discontinued-program answer, cohort response, or standard retrieval."""
+    """Route after triage: discontinued-program answer, precomputed answer, cohort response, or standard retrieval."""
     if state.get("discontinued_program"):
         logger.info(f"Routing to discontinued_program_response ({state['discontinued_program']})")
         return "discontinued_program_response"
+    if state.get("answer_template"):
+        logger.info(f"Routing to answer_bank_response ({state['answer_template']})")
+        return "answer_bank_response"
     if state.get("is_cohort_calendar_question", False):
         logger.info("Routing to cohort_calendar_response (cohort/calendar question)")
         return "cohort_calendar_response"
     return "hybrid_retrieval"
 
 
+def route_after_answer_bank(state: RAGState) -> str:
+    """END once the banked answer is served; on a miss, the route triage would have taken without it."""
+    if state.get("answer_template"):
+        return "end"
+    return route_after_cohort_calendar_classification(state)
+
+
 def route_after_query_enhancement(state: RAGState) -> str:
     """Route after query enhancement based on ambiguity."""
     ambiguity_score = state.get("ambiguity_score", 0.5)
@@ -34,6 +46,10 @@ def route_after_document_filtering(state: RAGState) -> str:
     """Route after document filtering - re-fetch if not enough docs."""
     needs_refetch = state.get("metadata", {}).get("needs_refetch", False)
 
+    if needs_refetch and is_nearly_expired(state, REQUEST_DEADLINE_RESERVE_SECONDS):
+        logger.warning("Skipping re-fetch: request deadline nearly reached, answering from current docs")
+        return "coverage_classification"
+
     if needs_refetch:
         # Clear the flag and go back to retrieval with higher limits
         logger.info("Routing back to retrieval for re-fetch with doubled limits")
@@ -111,12 +127,16 @@ def route_after_faithfulness_verification(state: RAGState) -> str:
         threshold = 0.7
         max_iterations = 1
 
+    # Near the request deadline there is no time for another refinement round:
+    # a response that would be refined gets the fallback instead
+    out_of_time = is_nearly_expired(state, REQUEST_DEADLINE_RESERVE_SECONDS)
+
     # Production gate: require faithfulness >= threshold to finalize
     # NEVER allow responses with critical violations (fabrication, cross-contamination, wrong numbers)
     has_critical_violations = state.get("has_critical_violations", False)
     if has_critical_violations:
         logger.warning(f"Blocking response due to critical violations (fabrication/cross-contamination)")
-        if iteration_count < max_iterations:
+        if iteration_count < max_iterations and not out_of_time:
             return "iterative_refinement"
         else:
             return "generate_fun_fallback"
@@ -137,8 +157,11 @@ def route_after_faithfulness_verification(state: RAGState) -> str:
             )
         return "finalize_response"
     # Allow refinement attempts based on query type
-    elif iteration_count < max_iterations:
+    elif iteration_count < max_iterations and not out_of_time:
         return "iterative_refinement"
+    elif iteration_count < max_iterations:
+        logger.warning("Request deadline nearly reached, routing to fun fallback instead of refinement")
+        return "generate_fun_fallback"
     else:
         # Max iterations reached - force fun fallback
         logger.warning(f"Max iterations ({max_iterations}) reached for {query_intent} query, routing to fun fallback")
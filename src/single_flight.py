@@ -0,0 +1,102 @@
+"""
+Single-flight coalescing of identical in-flight questions.
+
+When a question is pasted into a channel, several people often mention the bot
+with the same text within seconds, and each mention used to run the whole
+pipeline. SingleFlight.do(key, fn) runs fn once per key at a time: callers that
+arrive while it is running wait for that run and receive the same result (or
+the same exception). Nothing is cached after the run finishes.
+
+question_key() builds the key from the normalized query plus the conversation
+so far, so only questions that would get the same answer are coalesced: a
+follow-up in a thread with different history runs on its own.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from src.instrumentation import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"<@[A-Z0-9]+>", " ", text or "")
+    text = re.sub(r"['’]", "", text.lower())
+    return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+
+def question_key(query: str, conversation_history: Optional[Iterable[Any]] = None) -> str:
+    """Key for coalescing: normalized query + normalized (role, text) of each prior message."""
+    parts = [_normalize(query)]
+    for message in conversation_history or []:
+        role = getattr(message, "type", "") or (message.get("role", "") if isinstance(message, dict) else "")
+        content = getattr(message, "content", None)
+        if content is None and isinstance(message, dict):
+            content = message.get("content", "")
+        parts.append(f"{role}:{_normalize(str(content or ''))}")
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one fn per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.stats = {"executions": 0, "coalesced": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns (result, shared); shared is True when another caller's run was reused."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            METRICS.inc(
+                "product_wizard_coalesced_requests_total",
+                "Questions answered by waiting on an identical in-flight question.",
+                {},
+            )
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.waiters:
+                logger.info(f"Coalesced {call.waiters} identical in-flight question(s) into one run")
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+INFLIGHT_QUESTIONS = SingleFlight()
@@ -1,17 +1,30 @@
 """
 Slack helper functions for event deduplication and progress updates.
-Includes conversation history retrieval, event deduplication, and Slack message management.
+Includes conversation history retrieval (cached per thread), event deduplication,
+and Slack message management.
 """
 
 import logging
 import re
 import threading
-from collections import deque
-from typing import Dict, List, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 
-from src.config import SLACK_BOT_TOKEN, slack_web_client
+from src.config import (
+    EVENT_DEDUPE_BACKEND,
+    EVENT_DEDUPE_REDIS_URL,
+    EVENT_DEDUPE_SQLITE_PATH,
+    EVENT_DEDUPE_TTL_SECONDS,
+    SLACK_BOT_TOKEN,
+    SLACK_HISTORY_CACHE_MAX_THREADS,
+    SLACK_HISTORY_CACHE_TTL_SECONDS,
+    SLACK_PROGRESS_MIN_INTERVAL_SECONDS,
+    slack_web_client,
+)
+from src.event_dedupe import build_dedupe_store
 from src.state import RAGState
 
 # Configure logging
@@ -19,8 +32,13 @@ logger = logging.getLogger(__name__)
 
 
 # ---------------- Slack Event De-duplication ----------------
-SEEN_EVENT_IDS: deque = deque(maxlen=512)
-SEEN_ENVELOPE_IDS: deque = deque(maxlen=1024)
+# Shared across workers/restarts with the sqlite or redis backend (src/event_dedupe.py)
+EVENT_DEDUPE = build_dedupe_store(
+    backend=EVENT_DEDUPE_BACKEND,
+    sqlite_path=EVENT_DEDUPE_SQLITE_PATH,
+    redis_url=EVENT_DEDUPE_REDIS_URL,
+    ttl_seconds=EVENT_DEDUPE_TTL_SECONDS,
+)
 
 
 def _build_event_dedupe_key(event: Dict) -> Optional[str]:
@@ -46,6 +64,243 @@ def _build_event_dedupe_key(event: Dict) -> Optional[str]:
         return None
 
 
+# ---------------- Thread History Cache ----------------
+# Every mention/DM used to re-read its thread with conversations_replies, a
+# Tier 3 method (~50/min per workspace). Threads are cached per (channel,
+# thread_ts) and kept current from the events we already receive (incoming
+# messages, edits, deletions) plus our own replies, so Slack is only asked on
+# a miss, after the TTL, or when we know the cache may have missed something:
+#  - a reply in a channel whose plain message events we don't receive (the app
+#    only gets app_mention there, so other people's replies are invisible);
+#  - an edit/deletion of a message we don't hold;
+#  - a reply of ours whose ts we couldn't learn;
+#  - a fetch that didn't return the whole thread (has_more).
+# The cache is per process; the TTL bounds staleness (Procfile runs 1 worker).
+
+_HISTORY_FETCH_LIMIT = 100
+# Used when a 429 carries no Retry-After header
+_DEFAULT_RETRY_AFTER_SECONDS = 30
+
+
+def _ts_key(ts: str) -> float:
+    try:
+        return float(ts)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ThreadHistoryCache:
+    """Raw thread messages ({ts, text, user, bot_id}) per (channel, thread_ts), LRU + TTL bounded."""
+
+    def __init__(self, max_threads: int = 1000, ttl_seconds: float = 600, clock=time.monotonic):
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        # Channels we receive plain message events for (so replies there are seen)
+        self._observed_channels: set = set()
+        self._lock = threading.Lock()
+
+    def _entry(self, channel: str, thread_ts: str) -> Optional[Dict]:
+        entry = self._entries.get((channel, thread_ts))
+        if entry is not None:
+            self._entries.move_to_end((channel, thread_ts))
+        return entry
+
+    def get(self, channel: str, thread_ts: str) -> Optional[List[Dict]]:
+        """Cached messages (oldest first), or None if Slack should be asked."""
+        with self._lock:
+            entry = self._entry(channel, thread_ts)
+            if entry is None or entry["gap"] or not entry["complete"]:
+                return None
+            if self._clock() - entry["synced_at"] > self.ttl_seconds:
+                return None
+            return list(entry["messages"])
+
+    def peek(self, channel: str, thread_ts: str) -> Optional[List[Dict]]:
+        """Whatever is cached, however stale (the fallback while Slack rate-limits us)."""
+        with self._lock:
+            entry = self._entry(channel, thread_ts)
+            return list(entry["messages"]) if entry is not None else None
+
+    def store(self, channel: str, thread_ts: str, messages: List[Dict], complete: bool = True) -> None:
+        """Replace the entry with a fresh copy of the thread."""
+        with self._lock:
+            self._entries[(channel, thread_ts)] = {
+                "messages": sorted((_raw_message(m) for m in messages), key=lambda m: _ts_key(m["ts"])),
+                "synced_at": self._clock(),
+                "complete": complete,
+                "gap": False,
+            }
+            self._entries.move_to_end((channel, thread_ts))
+            while len(self._entries) > self.max_threads:
+                self._entries.popitem(last=False)
+
+    def observe_channel(self, channel: str) -> None:
+        with self._lock:
+            self._observed_channels.add(channel)
+
+    def append(self, channel: str, thread_ts: str, message: Dict) -> None:
+        """
+        Add a message to its thread. A thread root (ts == thread_ts) we haven't
+        seen starts a new, complete entry; a reply only updates an existing one.
+        """
+        msg = _raw_message(message)
+        if not msg["ts"]:
+            return
+        with self._lock:
+            entry = self._entry(channel, thread_ts)
+            if entry is None:
+                if msg["ts"] != thread_ts:
+                    return
+                self._entries[(channel, thread_ts)] = {
+                    "messages": [msg], "synced_at": self._clock(), "complete": True, "gap": False,
+                }
+                while len(self._entries) > self.max_threads:
+                    self._entries.popitem(last=False)
+                return
+            messages = entry["messages"]
+            for i, existing in enumerate(messages):
+                if existing["ts"] == msg["ts"]:
+                    messages[i] = {**existing, **{k: v for k, v in msg.items() if v}}
+                    return
+            messages.append(msg)
+            messages.sort(key=lambda m: _ts_key(m["ts"]))
+            if channel not in self._observed_channels:
+                entry["gap"] = True
+
+    def edit(self, channel: str, thread_ts: str, ts: str, text: str) -> None:
+        with self._lock:
+            entry = self._entry(channel, thread_ts)
+            if entry is None:
+                return
+            for msg in entry["messages"]:
+                if msg["ts"] == ts:
+                    msg["text"] = text
+                    return
+            entry["gap"] = True
+
+    def delete(self, channel: str, thread_ts: str, ts: str) -> None:
+        with self._lock:
+            entry = self._entry(channel, thread_ts)
+            if entry is None:
+                return
+            kept = [m for m in entry["messages"] if m["ts"] != ts]
+            if len(kept) == len(entry["messages"]):
+                entry["gap"] = True
+            entry["messages"] = kept
+
+    def mark_gap(self, channel: str, thread_ts: str) -> None:
+        with self._lock:
+            entry = self._entry(channel, thread_ts)
+            if entry is not None:
+                entry["gap"] = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._observed_channels.clear()
+
+
+def _raw_message(message: Dict) -> Dict:
+    return {
+        "ts": str(message.get("ts") or ""),
+        "text": message.get("text", "") or "",
+        "user": message.get("user", "") or "",
+        "bot_id": message.get("bot_id", "") or "",
+    }
+
+
+THREAD_HISTORY = ThreadHistoryCache(
+    max_threads=SLACK_HISTORY_CACHE_MAX_THREADS,
+    ttl_seconds=SLACK_HISTORY_CACHE_TTL_SECONDS,
+)
+
+# While Slack rate-limits conversations_replies, serve what we have instead of asking again
+_history_backoff_until = 0.0
+
+
+def record_thread_message(channel: str, thread_ts: str, message: Dict) -> None:
+    """Record a message we are about to handle (mention or DM) in its thread's cache entry."""
+    if channel and thread_ts:
+        THREAD_HISTORY.append(channel, thread_ts, message)
+
+
+def record_bot_reply(channel: str, thread_ts: str, ts: Optional[str], text: str) -> None:
+    """Record the answer we posted (or edited into the progress message) in the thread."""
+    if not (channel and thread_ts):
+        return
+    if not ts:
+        THREAD_HISTORY.mark_gap(channel, thread_ts)
+        return
+    # If the progress message was cached with its progress text, the answer replaces it
+    THREAD_HISTORY.append(channel, thread_ts, {"ts": ts, "text": text, "bot_id": "self"})
+
+
+def observe_message_event(event: Dict) -> None:
+    """
+    Keep cached threads current from a raw Slack `message` event (any subtype,
+    including our own bot messages). Call before any filtering.
+    """
+    try:
+        channel = event.get("channel", "")
+        if not channel:
+            return
+        subtype = event.get("subtype")
+        if subtype == "message_changed":
+            msg = event.get("message") or {}
+            THREAD_HISTORY.edit(channel, msg.get("thread_ts") or msg.get("ts", ""), msg.get("ts", ""), msg.get("text", ""))
+        elif subtype == "message_deleted":
+            prev = event.get("previous_message") or {}
+            ts = event.get("deleted_ts") or prev.get("ts", "")
+            THREAD_HISTORY.delete(channel, prev.get("thread_ts") or ts, ts)
+        elif subtype in (None, "bot_message", "thread_broadcast", "file_share"):
+            THREAD_HISTORY.observe_channel(channel)
+            ts = event.get("ts", "")
+            thread_ts = event.get("thread_ts") or ts
+            if ts and thread_ts != ts:
+                THREAD_HISTORY.append(channel, thread_ts, event)
+    except Exception as e:
+        logger.debug(f"Failed to observe message event: {e}")
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Seconds to back off if `error` is a Slack 429, else None."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) != 429:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float(_DEFAULT_RETRY_AFTER_SECONDS)
+
+
+def _fetch_thread(channel: str, thread_ts: str) -> Optional[List[Dict]]:
+    """Read the thread from Slack into the cache. None if Slack is unavailable or rate-limiting."""
+    global _history_backoff_until
+    if time.monotonic() < _history_backoff_until:
+        logger.info("Slack history fetch skipped (rate-limited); serving cached thread")
+        return None
+    try:
+        response = slack_web_client.conversations_replies(
+            channel=channel,
+            ts=thread_ts,
+            limit=_HISTORY_FETCH_LIMIT
+        )
+    except Exception as e:
+        retry_after = _retry_after_seconds(e)
+        if retry_after is None:
+            raise
+        _history_backoff_until = time.monotonic() + retry_after
+        logger.warning(f"Slack rate-limited conversations_replies; backing off {retry_after:.0f}s")
+        return None
+    messages = response.get("messages", []) or []
+    THREAD_HISTORY.store(channel, thread_ts, messages, complete=not response.get("has_more"))
+    return messages
+
+
 def get_conversation_history(
     channel: str,
     thread_ts: str,
@@ -54,7 +309,12 @@ def get_conversation_history(
 ) -> List[BaseMessage]:
     """
     Retrieve conversation history from Slack thread.
-    Returns a list of BaseMessage objects for use in RAG pipeline.
+    Returns a list of BaseMessage objects for use in RAG pipeline: the last
+    ``limit`` messages, oldest first.
+
+    Served from THREAD_HISTORY when the cached thread is current; otherwise
+    read from Slack. While Slack rate-limits us, the cached copy (possibly
+    stale) is used, or no history at all.
 
     If ``latest_ts`` is provided, the corresponding message is excluded so the
     active Slack event can be handled separately.
@@ -66,19 +326,17 @@ def get_conversation_history(
     - im:history (for direct messages)
     """
     try:
-        if not slack_web_client:
-            logger.warning("Slack web client not available")
-            return []
-
-        # Get conversation history from the thread
-        response = slack_web_client.conversations_replies(
-            channel=channel,
-            ts=thread_ts,
-            limit=limit
-        )
+        raw_messages = THREAD_HISTORY.get(channel, thread_ts)
+        if raw_messages is None:
+            if not slack_web_client:
+                logger.warning("Slack web client not available")
+                return []
+            raw_messages = _fetch_thread(channel, thread_ts)
+            if raw_messages is None:
+                raw_messages = THREAD_HISTORY.peek(channel, thread_ts) or []
 
         messages = []
-        for msg in response.get("messages", []):
+        for msg in raw_messages:
             msg_ts = msg.get("ts")
 
             # Skip the most recent Slack event to avoid duplicating the active query
@@ -107,7 +365,7 @@ def get_conversation_history(
                 messages.append(HumanMessage(content=clean_text))
 
         # Return messages in chronological order (oldest first)
-        return messages
+        return messages[-limit:] if limit else messages
 
     except Exception as e:
         logger.warning(f"Failed to retrieve conversation history: {e}")
@@ -125,20 +383,30 @@ def _already_processed(event: Dict) -> bool:
         key = _build_event_dedupe_key(event)
         if not key:
             return False
-        if key in SEEN_EVENT_IDS:
+        if EVENT_DEDUPE.seen_or_add(key):
             logger.info(f"Duplicate event suppressed: {key}")
             return True
-        SEEN_EVENT_IDS.append(key)
         return False
-    except Exception:
+    except Exception as e:
+        logger.warning(f"Event dedupe lookup failed, processing event: {e}")
         return False
 
 
 # ---------------- Slack Update Helper ----------------
-
-# Global variables to store the current say function and progress message (avoid serialization issues)
+# Progress updates used to be synchronous chat.update calls on every node
+# transition (8-10 per question, on the critical path). They now go to a
+# background sender and never block the pipeline thread:
+#  - per thread only the latest step is kept, so rapid successive steps
+#    coalesce into a single update;
+#  - per channel at most one call goes out every
+#    SLACK_PROGRESS_MIN_INTERVAL_SECONDS (longer after a 429, per Retry-After);
+#  - a failed update is dropped rather than re-posted as a new message; the
+#    next step or the final answer overwrites it anyway.
+# Handlers call finish_slack_progress() before posting the answer: pending
+# steps are discarded and the progress message's ts is returned for reuse.
+
+# Global say function for the request being handled (avoid serialization issues)
 _current_say_function = None
-_current_progress_message_ts = None
 _progress_steps = [
     "🔍 Analyzing your question...",
     "🎯 Detecting program focus...",
@@ -151,123 +419,161 @@ _progress_steps = [
     "🔍 Verifying answer accuracy...",
     "✅ Finalizing response..."
 ]
-_current_step = 0
 
-# Lock for thread-safe access to _current_progress_message_ts and _current_step
+# Lock for thread-safe access to _current_say_function
 _message_lock = threading.Lock()
 
 
+def _response_ts(response) -> Optional[str]:
+    """ts of a posted message from a say()/chat_postMessage response."""
+    if hasattr(response, 'get') and response.get('ts'):
+        return response.get('ts')
+    return getattr(response, 'ts', None)
+
+
+class ProgressSender:
+    """Background, coalescing, per-channel rate-limited sender of progress messages."""
+
+    def __init__(self, min_interval: float = 1.0, clock=time.monotonic):
+        self.min_interval = min_interval
+        self._clock = clock
+        # (channel, thread_ts) -> {say, ts, step, text, sent_text, inflight, closed}
+        self._progress: Dict[Tuple[str, str], Dict] = {}
+        self._channel_next_at: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {"submitted": 0, "sent": 0, "coalesced": 0, "failed": 0}
+
+    def submit(self, channel: str, thread_ts: str, say, step_name: str) -> None:
+        """Queue `step_name` as the thread's progress text. Returns immediately."""
+        with self._cond:
+            entry = self._progress.get((channel, thread_ts))
+            if entry is None:
+                entry = self._progress[(channel, thread_ts)] = {
+                    "say": say, "ts": None, "step": 0, "text": None, "sent_text": None,
+                    "inflight": False, "closed": False,
+                }
+            step_index = next((i for i, step in enumerate(_progress_steps) if step_name in step), entry["step"])
+            entry["step"] = step_index
+            text = f"({step_index + 1}/{len(_progress_steps)}) {_progress_steps[step_index]}"
+            if text == entry["text"]:
+                return
+            self.stats["submitted"] += 1
+            if entry["text"] != entry["sent_text"]:
+                self.stats["coalesced"] += 1
+            entry["text"] = text
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="slack-progress", daemon=True)
+                self._worker.start()
+            self._cond.notify_all()
+
+    def finish(self, channel: str, thread_ts: str, timeout: float = 5.0) -> Optional[str]:
+        """
+        Stop updating the thread's progress message: drop pending steps, wait for
+        a call already in flight, and return the message's ts (None if none was posted).
+        """
+        with self._cond:
+            entry = self._progress.get((channel, thread_ts))
+            if entry is None:
+                return None
+            entry["closed"] = True
+            deadline = self._clock() + timeout
+            while entry["inflight"]:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            self._progress.pop((channel, thread_ts), None)
+            return entry["ts"]
+
+    def _next_due(self, now: float):
+        for (channel, thread_ts), entry in self._progress.items():
+            if entry["inflight"] or entry["closed"] or entry["text"] == entry["sent_text"]:
+                continue
+            if now >= self._channel_next_at.get(channel, 0.0):
+                return (channel, thread_ts), entry
+        return None
+
+    def _wait_seconds(self, now: float) -> Optional[float]:
+        waits = [
+            self._channel_next_at.get(channel, 0.0) - now
+            for (channel, _), entry in self._progress.items()
+            if not (entry["inflight"] or entry["closed"]) and entry["text"] != entry["sent_text"]
+        ]
+        return max(0.01, min(waits)) if waits else None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_due(self._clock())
+                while job is None:
+                    self._cond.wait(self._wait_seconds(self._clock()))
+                    job = self._next_due(self._clock())
+                (channel, thread_ts), entry = job
+                entry["inflight"] = True
+                text, ts, say = entry["text"], entry["ts"], entry["say"]
+                self._channel_next_at[channel] = self._clock() + self.min_interval
+            new_ts, retry_after = self._send(channel, thread_ts, ts, say, text)
+            with self._cond:
+                entry["inflight"] = False
+                entry["sent_text"] = text
+                if new_ts:
+                    entry["ts"] = new_ts
+                if retry_after is not None:
+                    self._channel_next_at[channel] = self._clock() + retry_after
+                self._cond.notify_all()
+
+    def _send(self, channel: str, thread_ts: str, ts: Optional[str], say, text: str):
+        """One Slack call. Returns (ts of a newly posted message, Retry-After seconds on 429)."""
+        try:
+            if ts is None:
+                response = say(text=text, thread_ts=thread_ts or None, channel=channel)
+                self.stats["sent"] += 1
+                return _response_ts(response), None
+            if not slack_web_client:
+                logger.warning("Slack web client not available for progress update")
+                return None, None
+            slack_web_client.chat_update(channel=channel, ts=ts, text=text)
+            self.stats["sent"] += 1
+            return None, None
+        except Exception as e:
+            self.stats["failed"] += 1
+            retry_after = _retry_after_seconds(e)
+            logger.warning(f"Failed to send Slack progress update: {e}")
+            return None, retry_after
+
+
+PROGRESS_SENDER = ProgressSender(min_interval=SLACK_PROGRESS_MIN_INTERVAL_SECONDS)
+
+
 def set_slack_say_function(say_func):
     """Set the current Slack say function for updates."""
-    global _current_say_function, _current_progress_message_ts, _current_step
+    global _current_say_function
     with _message_lock:
         _current_say_function = say_func
-        _current_progress_message_ts = None
-        _current_step = 0
 
 
 def clear_slack_say_function():
     """Clear the current Slack say function."""
-    global _current_say_function, _current_progress_message_ts, _current_step
+    global _current_say_function
     with _message_lock:
         _current_say_function = None
-        _current_progress_message_ts = None
-        _current_step = 0
 
 
 def send_slack_update(state: RAGState, step_name: str):
-    """Safely send/update Slack progress message with step numbering."""
+    """Queue a numbered progress update for the state's thread (non-blocking)."""
     try:
-        if _current_say_function and state.get("slack_channel"):
-            global _current_step, _current_progress_message_ts
-
-            # Find the step index and update _current_step under lock
-            with _message_lock:
-                step_index = next((i for i, step in enumerate(_progress_steps) if step_name in step), _current_step)
-                _current_step = step_index
-                current_progress_message_ts = _current_progress_message_ts
-
-            # Create progress message with numbering (outside lock - no shared state)
-            total_steps = len(_progress_steps)
-            progress_text = f"({_current_step + 1}/{total_steps}) {_progress_steps[_current_step]}"
-
-            if current_progress_message_ts:
-                # Update existing message using Slack Web API
-                try:
-                    if not slack_web_client:
-                        logger.warning("Slack web client not available for update")
-                        # Fallback to sending new message
-                        response = _current_say_function(
-                            text=progress_text,
-                            thread_ts=state.get("slack_thread_ts"),
-                            channel=state.get("slack_channel")
-                        )
-                        # Try to extract timestamp from response and update under lock
-                        new_ts = None
-                        if hasattr(response, 'get') and response.get('ts'):
-                            new_ts = response.get('ts')
-                        elif hasattr(response, 'ts'):
-                            new_ts = response.ts
-                        if new_ts:
-                            with _message_lock:
-                                _current_progress_message_ts = new_ts
-                    else:
-                        slack_web_client.chat_update(
-                            channel=state.get("slack_channel"),
-                            ts=current_progress_message_ts,
-                            text=progress_text
-                        )
-                except Exception as update_error:
-                    logger.warning(f"Failed to update message, sending new one: {update_error}")
-                    # Fallback to sending new message
-                    response = _current_say_function(
-                        text=progress_text,
-                        thread_ts=state.get("slack_thread_ts"),
-                        channel=state.get("slack_channel")
-                    )
-                    # Try to extract timestamp from response and update under lock
-                    new_ts = None
-                    if hasattr(response, 'get') and response.get('ts'):
-                        new_ts = response.get('ts')
-                    elif hasattr(response, 'ts'):
-                        new_ts = response.ts
-                    if new_ts:
-                        with _message_lock:
-                            _current_progress_message_ts = new_ts
-            else:
-                # Atomically check and create new message under lock
-                # Use a flag to track if we created the message vs another thread
-                created_by_us = False
-                with _message_lock:
-                    # Double-check: another thread may have created the message while we waited
-                    if _current_progress_message_ts is None:
-                        # Send new message and store timestamp
-                        response = _current_say_function(
-                            text=progress_text,
-                            thread_ts=state.get("slack_thread_ts"),
-                            channel=state.get("slack_channel")
-                        )
-                        # Try to extract timestamp from response
-                        new_ts = None
-                        if hasattr(response, 'get') and response.get('ts'):
-                            new_ts = response.get('ts')
-                        elif hasattr(response, 'ts'):
-                            new_ts = response.ts
-                        if new_ts:
-                            _current_progress_message_ts = new_ts
-                            created_by_us = True
-
-                # If we found a message was created by another thread, update it
-                if not created_by_us:
-                    try:
-                        if slack_web_client:
-                            slack_web_client.chat_update(
-                                channel=state.get("slack_channel"),
-                                ts=_current_progress_message_ts,
-                                text=progress_text
-                            )
-                    except Exception as e:
-                        logger.warning(f"Failed to update message after retry: {e}")
-
+        say = _current_say_function
+        if say and state.get("slack_channel"):
+            PROGRESS_SENDER.submit(state.get("slack_channel"), state.get("slack_thread_ts") or "", say, step_name)
     except Exception as e:
         logger.warning(f"Failed to send Slack update: {e}")
+
+
+def finish_slack_progress(channel: str, thread_ts: str) -> Optional[str]:
+    """Stop progress updates for the thread; returns the progress message's ts, if one was posted."""
+    try:
+        return PROGRESS_SENDER.finish(channel, thread_ts or "")
+    except Exception as e:
+        logger.warning(f"Failed to finish Slack progress: {e}")
+        return None
@@ -5,28 +5,87 @@ Handles event processing for the RAG bot in Slack channels and DMs.
 
 import logging
 import re
+import time
 from typing import Dict
 
-from src.config import SLACK_BOT_TOKEN
+from src.config import (
+    REQUEST_COALESCING,
+    REQUEST_TIME_BUDGET_SECONDS,
+    SLACK_BOT_TOKEN,
+    SLACK_API_BASE_URL,
+)
 from src.workflow import rag_workflow
 
 # ---------------- Slack Helpers ----------------
 from src.slack_helpers import (
     _already_processed,
     get_conversation_history,
+    observe_message_event,
+    record_bot_reply,
+    record_thread_message,
     set_slack_say_function,
     clear_slack_say_function,
+    finish_slack_progress,
 )
-import src.slack_helpers as slack_helpers
+from src.instrumentation import finish_request_trace
+from src.deadline import new_deadline
+from src.doc_store import release_doc_store
+from src.single_flight import INFLIGHT_QUESTIONS, question_key
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+def _posted_ts(response) -> str:
+    """ts of a message posted with say(), if the response carries one."""
+    try:
+        return (response.get("ts") if hasattr(response, "get") else getattr(response, "ts", "")) or ""
+    except Exception:
+        return ""
+
+
+def _checkpointed_doc_store_id(config: Dict):
+    """doc_store_id in the thread's latest checkpoint, or None."""
+    try:
+        return rag_workflow.get_state(config).values.get("doc_store_id")
+    except Exception as e:
+        logger.debug(f"No checkpointed doc store for {config}: {e}")
+        return None
+
+
+def _run_workflow(initial_state: Dict, config: Dict) -> Dict:
+    """
+    Invoke the workflow, coalescing identical in-flight questions: a request whose
+    normalized query and history match one already running waits for that run
+    and reuses its result. (The waiting thread gets no checkpoint of its own;
+    its next turn starts from the Slack history as usual.)
+    """
+    def run() -> Dict:
+        start = time.perf_counter()
+        result = None
+        try:
+            result = rag_workflow.invoke(initial_state, config)
+            finish_request_trace(result, time.perf_counter() - start)
+            return result
+        finally:
+            # A failed run's store id is only in its last checkpoint
+            release_doc_store(result.get("doc_store_id") if result is not None else _checkpointed_doc_store_id(config))
+
+    if not REQUEST_COALESCING:
+        return run()
+    key = question_key(initial_state.get("query", ""), initial_state.get("conversation_history"))
+    result, shared = INFLIGHT_QUESTIONS.do(key, run)
+    if shared:
+        logger.info(f"Answered from an identical in-flight question (thread {config['configurable']['thread_id']})")
+    return result
+
+
 def handle_mention(event, say):
     """Handle @mentions in Slack."""
     if _already_processed(event):
         return
+    # The whole request, history fetch included, must finish within the budget
+    request_deadline = new_deadline(REQUEST_TIME_BUDGET_SECONDS)
 
     text = event.get("text", "")
     user_id = event.get("user", "unknown")
@@ -34,6 +93,7 @@ def handle_mention(event, say):
     event_ts = event.get("ts") or event.get("event_ts", "")
     thread_ts = event.get("thread_ts", event_ts)
     channel_type = event.get("channel_type")
+    record_thread_message(channel, thread_ts, event)
 
     # Remove bot mention from text
     query = re.sub(r'<@[A-Z0-9]+>', '', text).strip()
@@ -70,6 +130,7 @@ def handle_mention(event, say):
             "is_follow_up": is_follow_up,
             "conversation_stage": conversation_stage,
             "iteration_count": 0,
+            "request_deadline": request_deadline,
             "metadata": {
                 "slack_user_id": user_id,
                 "slack_channel_type": channel_type,
@@ -82,40 +143,47 @@ def handle_mention(event, say):
             "slack_thread_ts": thread_ts
         }
 
-        result = rag_workflow.invoke(initial_state, config)
+        result = _run_workflow(initial_state, config)
 
         response = result.get("final_response", "I encountered an error processing your question.")
 
         # Update the progress message with the final answer
-        if slack_helpers._current_progress_message_ts:
+        progress_ts = finish_slack_progress(channel, thread_ts)
+        if progress_ts:
             try:
                 from slack_sdk import WebClient
-                client = WebClient(token=SLACK_BOT_TOKEN)
+                client = WebClient(token=SLACK_BOT_TOKEN, base_url=SLACK_API_BASE_URL)
                 # Note: Don't include thread_ts when updating a reply in a thread
                 # The ts parameter is sufficient to identify the message to update
                 client.chat_update(
                     channel=channel,
-                    ts=slack_helpers._current_progress_message_ts,
+                    ts=progress_ts,
                     text=response
                 )
+                record_bot_reply(channel, thread_ts, progress_ts, response)
             except Exception as e:
                 logger.warning(f"Failed to update progress message with final answer: {e}")
                 # Fallback to sending new message
-                say(text=response, thread_ts=thread_ts, channel=channel)
+                posted = say(text=response, thread_ts=thread_ts, channel=channel)
+                record_bot_reply(channel, thread_ts, _posted_ts(posted), response)
         else:
             # Send response in thread
-            say(text=response, thread_ts=thread_ts, channel=channel)
+            posted = say(text=response, thread_ts=thread_ts, channel=channel)
+            record_bot_reply(channel, thread_ts, _posted_ts(posted), response)
 
     except Exception as e:
         logger.error(f"Error processing mention: {e}")
         say(text="I encountered an error processing your question. Please try again.", thread_ts=thread_ts, channel=channel)
     finally:
-        # Clean up the say function
+        # Clean up the say function and any progress still queued for this thread
         clear_slack_say_function()
+        finish_slack_progress(channel, thread_ts)
 
 
 def handle_message(event, say):
     """Handle DMs."""
+    # Every message event (edits, deletions, our own replies) keeps cached threads current
+    observe_message_event(event)
     if event.get("subtype") or event.get("bot_id"):
         return
 
@@ -126,6 +194,7 @@ def handle_message(event, say):
 
     if _already_processed(event):
         return
+    request_deadline = new_deadline(REQUEST_TIME_BUDGET_SECONDS)
 
     query = event.get("text", "")
     # Remove bot summon phrases (case-insensitive)
@@ -134,6 +203,7 @@ def handle_message(event, say):
     event_ts = event.get("ts") or event.get("event_ts", "")
     thread_ts = event.get("thread_ts", event_ts)
     user_id = event.get("user", "unknown")
+    record_thread_message(channel, thread_ts, event)
 
     logger.info(f"Processing DM from {user_id} ({channel_type}): {query}")
 
@@ -164,6 +234,7 @@ def handle_message(event, say):
             "is_follow_up": is_follow_up,
             "conversation_stage": conversation_stage,
             "iteration_count": 0,
+            "request_deadline": request_deadline,
             "metadata": {
                 "slack_user_id": user_id,
                 "slack_channel_type": channel_type,
@@ -176,19 +247,22 @@ def handle_message(event, say):
             "slack_thread_ts": thread_ts
         }
 
-        result = rag_workflow.invoke(initial_state, config)
+        result = _run_workflow(initial_state, config)
         response = result.get("final_response", "I encountered an error processing your question.")
 
         # Update the progress message with the final answer
-        if slack_helpers._current_progress_message_ts:
+        progress_ts = finish_slack_progress(channel, thread_ts)
+        if progress_ts:
             try:
                 from slack_sdk import WebClient
-                client = WebClient(token=SLACK_BOT_TOKEN)
+                client = WebClient(token=SLACK_BOT_TOKEN, base_url=SLACK_API_BASE_URL)
                 client.chat_update(
                     channel=channel,
-                    ts=slack_helpers._current_progress_message_ts,
+                    ts=progress_ts,
                     text=response
                 )
+                # The progress message was posted in the thread; the fallback below is not
+                record_bot_reply(channel, thread_ts, progress_ts, response)
             except Exception as e:
                 logger.warning(f"Failed to update progress message with final answer: {e}")
                 # Fallback to sending new message
@@ -201,5 +275,6 @@ def handle_message(event, say):
         logger.error(f"Error processing DM: {e}")
         say(text="I encountered an error processing your question. Please try again.", channel=channel)
     finally:
-        # Clean up the say function
+        # Clean up the say function and any progress still queued for this thread
         clear_slack_say_function()
+        finish_slack_progress(channel, thread_ts)
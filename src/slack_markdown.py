@@ -0,0 +1,276 @@
+"""
+Markdown -> Slack mrkdwn rendering.
+
+Every finalize, fallback and cohort response ends in convert_markdown_to_slack,
+and a streamed answer is re-rendered on each partial update. The original
+implementation ran eight whole-text re.sub passes plus placeholder protect and
+restore passes for code; this one makes a single forward pass over the lines
+with precompiled patterns:
+
+- Fenced code blocks (```...```) are set aside first and restored verbatim.
+- Each line is rendered on its own (memoized): inline code kept verbatim,
+  '## Header' -> '*Header*', **bold** -> *bold*, [text](url) -> <url|text>.
+- List items and blank-line collapsing need only the line plus a little
+  state (see _Renderer).
+
+The output is identical to the old pipeline (tests/test_slack_markdown.py
+checks it against the knowledge base), except that inline spans - bold,
+links, inline code - no longer pair across a line break: the old patterns
+could bold from a stray '**' on one line to the next one.
+
+SlackMarkdownStream renders text that grows: complete lines outside an open
+code fence are rendered once, so each update only renders the unfinished tail.
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+_CODE_BLOCK = re.compile(r"```[\s\S]*?```")
+_FENCE = "```"
+_INLINE_CODE = re.compile(r"`[^`\n]+`")
+_HEADER = re.compile(r"^##+\s+(.+)$")
+_BOLD = re.compile(r"\*\*([^*]+)\*\*")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+_DASH_ITEM = re.compile(r"^\s*-\s+")
+# A '*' item needs whitespace before the marker: indentation, or a blank line above
+_STAR_ITEM = re.compile(r"^\s+\*\s+")
+_STAR_ITEM_AFTER_BLANK = re.compile(r"^\s*\*\s+")
+# Empty header / item markers: the original patterns ran on into the next line
+_EMPTY_HEADER = re.compile(r"^##+\s*$")
+_HEADER_TO_END = re.compile(r"^##+\s+(.+)$", re.MULTILINE)
+_LIST_MARKER = re.compile(r"\s*[-*]")
+
+# Private-use placeholders: never produced by Markdown, inert for every pattern above
+_BLOCK_MARK = "\ue000"
+_CODE_MARK = "\ue001"
+_BLOCK_PLACEHOLDER = re.compile(f"{_BLOCK_MARK}(\\d+){_BLOCK_MARK}")
+_CODE_PLACEHOLDER = re.compile(f"{_CODE_MARK}(\\d+){_CODE_MARK}")
+
+
+@lru_cache(maxsize=4096)
+def _render_line(line: str) -> str:
+    """Inline rendering of one non-blank line: inline code verbatim, header, bold, links."""
+    code: List[str] = []
+    if "`" in line:
+        def _protect(match):
+            code.append(match.group(0))
+            return f"{_CODE_MARK}{len(code) - 1}{_CODE_MARK}"
+        line = _INLINE_CODE.sub(_protect, line)
+    if line.startswith("##"):
+        line = _HEADER.sub(r"*\1*", line)
+    if "**" in line:
+        line = _BOLD.sub(r"*\1*", line)
+    if "](" in line:
+        line = _LINK.sub(r"<\2|\1>", line)
+    if code:
+        line = _CODE_PLACEHOLDER.sub(lambda m: code[int(m.group(1))], line)
+    return line
+
+
+class _Renderer:
+    """
+    One rendering pass. Lines go through the stages of the original pipeline in
+    order - header, inline, '-' items, '*' items, blank-line collapse - and a
+    stage holds back only what it cannot decide yet: blank lines (a list item
+    swallows the blanks before it) and empty '##' / '-' / '*' markers (their
+    text is on the next non-blank line). Content lines are never held, so
+    everything in out is final.
+    """
+
+    def __init__(self):
+        self.out: List[str] = []
+        self._last: Optional[str] = None
+        self._header: Optional[List[str]] = None  # empty header line + blank lines after it
+        self._blanks: List[str] = []  # blank lines before the next content line
+        self._dash: Optional[str] = None  # empty '-' item waiting for its text
+        self._dash_ws = False  # whitespace follows it (otherwise it is no item)
+        self._dash_before: List[str] = []  # blanks it swallows if it is an item
+        self._dash_prefix = ""  # bullets of earlier empty items on the same line
+        self._star: Optional[str] = None  # same for an empty '*' item
+        self._star_ws = False
+        self._star_before: List[str] = []
+
+    def copy(self) -> "_Renderer":
+        """The same state with an empty out, for rendering a tail that is thrown away."""
+        clone = _Renderer()
+        clone.__dict__.update(self.__dict__)
+        clone.out, clone._last = [], (self.out[-1] if self.out else self._last)
+        clone._header = None if self._header is None else list(self._header)
+        clone._blanks = list(self._blanks)
+        return clone
+
+    def feed(self, lines: List[str]) -> None:
+        for raw in lines:
+            if not raw.strip():
+                if self._header is not None:
+                    self._header.append(raw)
+                elif self._dash is not None:
+                    self._dash_ws = True
+                else:
+                    self._blanks.append(raw)
+                continue
+            if self._header is not None:
+                # The header's \s+ ran on through the blank lines to this text
+                self._header = None
+                raw = "## " + raw.lstrip()
+            elif raw.startswith("##") and _EMPTY_HEADER.match(raw):
+                self._header = [raw]
+                continue
+            line = _render_line(raw)
+            if self._blanks or self._dash is not None or self._star is not None or _LIST_MARKER.match(line):
+                self._dash_stage(line)
+            else:
+                # Nothing to decide: not a list line, nothing held back
+                self.out.append(line)
+                self._last = line
+
+    def finish(self) -> List[str]:
+        if self._header is not None:
+            text, self._header = "\n".join(self._header), None
+            # Nothing follows: the pattern backtracks within the trailing whitespace, or fails
+            first, *rest = _HEADER_TO_END.sub(r"*\1*", text, count=1).split("\n")
+            self._dash_stage(first)
+            self.feed(rest)
+        if self._dash is not None:
+            dash, self._dash = self._dash, None
+            if self._dash_ws:
+                self._star_stage(self._dash_prefix + "• ", [])
+            else:
+                self._star_stage(self._dash_prefix + dash, self._dash_before)
+        if self._star is not None:
+            if self._star_ws or self._blanks:
+                self._emit("• ")
+            else:
+                for line in self._star_before + [self._star]:
+                    self._emit(line)
+            self._star = None
+        for line in self._blanks:
+            self._emit(line)
+        self._blanks = []
+        return self.out
+
+    def _dash_stage(self, line: str) -> None:
+        """'-' items: '^\\s*-\\s+' -> '• ', swallowing the blank lines before them."""
+        blanks, self._blanks = self._blanks, []
+        prefix = ""
+        if self._dash is not None:
+            # The empty item's \s+ ran on to this line (taking its indentation)
+            prefix, self._dash = self._dash_prefix + "• ", None
+            if line[0].isspace():
+                self._star_stage(prefix + line.lstrip(), [])
+                return
+        if line.strip() == "-":
+            self._dash, self._dash_ws, self._dash_prefix = line, not line.endswith("-"), prefix
+            self._dash_before = blanks
+            return
+        item = _DASH_ITEM.match(line)
+        if item:
+            line, blanks = "• " + line[item.end():], []
+        self._star_stage(prefix + line, blanks)
+
+    def _star_stage(self, line: str, blanks: List[str]) -> None:
+        """'*' items: '^\\s+\\*\\s+' -> '• ', where the whitespace may be the blank lines before."""
+        if self._star is not None:
+            self._star = None
+            self._emit("• " + line.lstrip())
+            return
+        if line.strip() == "*" and (blanks or line[0].isspace()):
+            self._star, self._star_ws, self._star_before = line, not line.endswith("*"), blanks
+            return
+        item = (_STAR_ITEM_AFTER_BLANK if blanks else _STAR_ITEM).match(line)
+        if item:
+            line, blanks = "• " + line[item.end():], []
+        for blank in blanks:
+            self._emit(blank)
+        self._emit(line)
+
+    def _emit(self, line: str) -> None:
+        # Runs of 2+ empty lines (3+ newlines) collapse to one
+        if line == "" and self._last == "":
+            return
+        self.out.append(line)
+        self._last = line
+
+
+def _protect_blocks(text: str) -> Tuple[str, List[str]]:
+    blocks: List[str] = []
+
+    def _protect(match):
+        blocks.append(match.group(0))
+        return f"{_BLOCK_MARK}{len(blocks) - 1}{_BLOCK_MARK}"
+
+    if _FENCE in text:
+        text = _CODE_BLOCK.sub(_protect, text)
+    return text, blocks
+
+
+def _restore_blocks(lines: List[str], blocks: List[str]) -> List[str]:
+    if not blocks:
+        return lines
+    return [_BLOCK_PLACEHOLDER.sub(lambda m: blocks[int(m.group(1))], line) for line in lines]
+
+
+@lru_cache(maxsize=256)
+def convert_markdown_to_slack(text: str) -> str:
+    """
+    Convert markdown formatting to Slack-friendly formatting.
+    - Headers (##, ###) -> Bold
+    - **bold** -> *bold* (Slack uses single asterisk)
+    - Markdown lists -> Slack-friendly lists with bullets
+    - Code blocks and inline code -> Preserved verbatim
+    - Links -> Slack link format
+    """
+    protected, blocks = _protect_blocks(text)
+    renderer = _Renderer()
+    renderer.feed(protected.split("\n"))
+    return "\n".join(_restore_blocks(renderer.finish(), blocks)).strip()
+
+
+class SlackMarkdownStream:
+    """
+    convert_markdown_to_slack for a text that only grows (streamed generation):
+    update(text_so_far) returns convert_markdown_to_slack(text_so_far), but
+    lines that are final are rendered once instead of on every update.
+    """
+
+    def __init__(self):
+        self._consumed = ""  # input whose lines are in _renderer
+        self._renderer = _Renderer()
+
+    @staticmethod
+    def _stable_end(tail: str) -> int:
+        """Length of the tail's prefix of complete lines outside any open code fence."""
+        end = tail.rfind("\n") + 1
+        while end:
+            last_block_end = 0
+            for match in _CODE_BLOCK.finditer(tail, 0, end):
+                last_block_end = match.end()
+            open_fence = tail.find(_FENCE, last_block_end, end)
+            if open_fence == -1:
+                break
+            # Cut before the line opening the fence; that may split an earlier block, so re-check
+            end = tail.rfind("\n", 0, open_fence) + 1
+        return end
+
+    def update(self, text: str) -> str:
+        if not text.startswith(self._consumed):
+            self.__init__()  # not a continuation: start over
+        tail = text[len(self._consumed):]
+        stable = self._stable_end(tail)
+        if stable:
+            self._feed(self._renderer, tail[:stable - 1])
+            self._consumed += tail[:stable]
+            tail = tail[stable:]
+
+        pending = self._renderer.copy()
+        self._feed(pending, tail)
+        pending.finish()
+        return "\n".join(self._renderer.out + pending.out).strip()
+
+    @staticmethod
+    def _feed(renderer: _Renderer, text: str) -> None:
+        protected, blocks = _protect_blocks(text)
+        start = len(renderer.out)
+        renderer.feed(protected.split("\n"))
+        renderer.out[start:] = _restore_blocks(renderer.out[start:], blocks)
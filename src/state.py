@@ -31,6 +31,12 @@ class RAGState(TypedDict, total=False):
     retrieval_query: str
     retrieved_docs: List[Dict]
     retrieval_stats: Dict
+    # Doc text lives in the per-request doc store (src/doc_store.py); doc lists
+    # in state hold references (chunk_id, source, scores) only
+    doc_store_id: str
+
+    # Absolute deadline (epoch seconds) for the whole request (src/deadline.py)
+    request_deadline: float
 
     # Slack Integration (stored separately to avoid serialization issues)
     slack_channel: Optional[str]
@@ -60,12 +66,19 @@ class RAGState(TypedDict, total=False):
     # Discontinued program interception
     discontinued_program: str
 
+    # Answer bank (src/answer_bank.py): template key of a stored answer to serve;
+    # skip_answer_bank forces the full pipeline (used by the precompute job)
+    answer_template: str
+    skip_answer_bank: bool
+
     # Undocumented-entity guard (set by generation, read by routing)
     undocumented_entities: List[str]
 
     # Generation
     generated_response: str
     source_citations: List[str]
+    # Answer written from the local term index while the LLM circuit is open
+    local_index_answer: bool
 
     # Faithfulness Verification
     faithfulness_score: float
@@ -0,0 +1,214 @@
+"""
+Deterministic triage fast path.
+
+Many questions are unambiguous from their wording alone ("DA duration", "next
+UX cohort in May", "does DevOps cover Kubernetes?"). rule_based_triage() fills
+the same fields as the unified triage LLM call from program aliases and keyword
+rules, plus a confidence score. unified_triage_node skips the LLM call when the
+confidence clears TRIAGE_RULES_MIN_CONFIDENCE.
+
+Confidence stays low whenever the wording leaves room for interpretation:
+follow-ups (context must be resolved), several intents matching at once, ambiguous
+aliases ("AI", "security"), or questions that need a program but name none.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import PROGRAM_SYNONYMS
+from src.program_matcher import get_program_matcher
+from src.utils import is_breakdown_request, is_portfolio_wide_query
+
+# Aliases that are also common words/topics: a detection resting on these alone
+# ("does WD cover web security?", "which AI tools...") is left to the LLM
+_AMBIGUOUS_ALIASES = {"ai", "ui", "security", "cyber", "pm", "ai course", "ai bootcamp"}
+
+CONFIDENT = 0.9
+UNSURE = 0.5
+
+
+# ---------------- Program aliases ----------------
+
+def match_programs(text: str) -> List[Tuple[str, str, Tuple[int, int]]]:
+    """
+    (program id, alias, span) for each active-program alias mention in text. Short
+    aliases (<= 3 chars: codes like DA, UX, PM) only count when written in capitals -
+    'de', 'ac' or '5 pm' are ordinary words otherwise.
+    """
+    return [
+        (pid, alias, span)
+        for pid, alias, span in get_program_matcher().match_aliases(text, "active")
+        if len(alias) > 3 or text[span[0]:span[1]].isupper()
+    ]
+
+
+# ---------------- Intent rules ----------------
+
+_MONTHS = (
+    "january", "february", "march", "april", "may", "june", "july",
+    "august", "september", "october", "november", "december",
+)
+
+_COHORT = re.compile(
+    r"\bcohorts?\b|\bintakes?\b|\bstart(ing)? dates?\b|\bnext (edition|class|start|batch)\b"
+    r"|\bwho (teaches|is teaching|is the (lead )?teacher|is the pm)\b|\b(lead |co-?)?teachers?\b|\binstructors?\b"
+    r"|\bwhen (is|does|do|will)\b.*\b(start|starts|begin|begins|kick off)\b|\bcalendar\b",
+    re.IGNORECASE,
+)
+_COMPARISON = re.compile(r"\bcompar(e|ed|ing|ison)\b|\bdifferences?\b|\bvs\.?(?!\w)|\bversus\b", re.IGNORECASE)
+_DURATION = re.compile(
+    r"\bhow long\b|\bduration\b|\bhow many (hours|weeks|months)\b|\blength of\b|\bhours\b|\bweeks long\b",
+    re.IGNORECASE,
+)
+_CERTIFICATION = re.compile(r"\bcertif\w*|\bcredentials?\b|\bdiploma\b", re.IGNORECASE)
+_REQUIREMENTS = re.compile(
+    r"\bprerequisites?\b|\brequirements?\b|\brequired\b|\bcomputer\b|\blaptop\b|\bspecs\b|\beligib\w*|\badmissions?\b",
+    re.IGNORECASE,
+)
+_CAREER = re.compile(r"\bcareers?\b|\bjobs?\b|\bsalar(y|ies)\b|\bemploy\w*|\bhired\b", re.IGNORECASE)
+_TECHNICAL = re.compile(
+    r"\bwhat (tools|technologies|tech stack|stack|languages|frameworks|libraries|software)\b|\btech stack\b",
+    re.IGNORECASE,
+)
+_COVERAGE = re.compile(
+    r"\b(does|do|will|is|are)\b(?P<subject>.*?)\b(cover|covers|teach|teaches|include|includes|go over|goes over)\s+"
+    r"(?P<topic>[^?.!]+)",
+    re.IGNORECASE,
+)
+_COVERAGE_PASSIVE = re.compile(
+    r"\b(is|are)\s+(?P<topic>[^?.!]+?)\s+(covered|taught|included)\b", re.IGNORECASE
+)
+_TOPIC_LEADING = re.compile(r"^(any|some|the|about|how to|anything about)\s+", re.IGNORECASE)
+# Any trailing prepositional qualifier ("in the prework", "during week 3", "for
+# beginners") narrows the question, it is not part of the topic the KB is scanned for
+_TOPIC_TRAILING = re.compile(
+    r"\s+(in|at|during|on|for|before|after|within|throughout|from|by|as part of)\s+.*$", re.IGNORECASE
+)
+# Longer topics are left to the LLM triage: a literal scan for them would answer "not covered"
+_SHORT_TOPIC_WORDS = 3
+_PART_TIME = re.compile(r"\bpart[- ]time\b|\bPT\b")
+_FULL_TIME = re.compile(r"\bfull[- ]time\b|\bFT\b")
+_FUTURE = re.compile(r"\bnext\b|\bupcoming\b|\bsoonest\b|\bearliest\b|\bafter\b|\bnew\b", re.IGNORECASE)
+_YEAR = re.compile(r"\b(20\d{2})\b")
+
+
+def _month(text: str) -> Optional[str]:
+    for name in _MONTHS:
+        if name == "may":
+            # 'may' is usually the modal verb: only the capitalized month or 'in/for/of may'
+            if re.search(r"\bMay\b", text) or re.search(r"\b(in|for|of|starting)\s+may\b", text, re.IGNORECASE):
+                return "may"
+            continue
+        if re.search(rf"\b{name}\b", text, re.IGNORECASE):
+            return name
+    return None
+
+
+def _coverage_topic(text: str) -> Optional[str]:
+    """The single topic in 'does X cover <topic>?' / 'is <topic> taught in X?', else None."""
+    m = _COVERAGE.search(text) or _COVERAGE_PASSIVE.search(text)
+    if not m:
+        return None
+    topic = _TOPIC_TRAILING.sub("", m.group("topic").strip())
+    topic = _TOPIC_LEADING.sub("", topic).strip(" '\"")
+    if not topic or len(topic.split()) > 4:
+        return None
+    # Several topics, or the "topic" is really a program name
+    if re.search(r",|\band\b|\bor\b|/", topic) or match_programs(topic):
+        return None
+    return topic
+
+
+def _expand_codes(query: str, matches: List[Tuple[str, str, Tuple[int, int]]]) -> str:
+    """Spell out program codes (DA -> Data Analytics), as the LLM triage does for retrieval."""
+    enhanced = query
+    for pid, alias, (start, end) in sorted(matches, key=lambda m: m[2][0], reverse=True):
+        if len(alias) <= 3 and alias not in _AMBIGUOUS_ALIASES:
+            name = PROGRAM_SYNONYMS.get(pid, {}).get("display_name", pid)
+            enhanced = enhanced[:start] + name + enhanced[end:]
+    return enhanced
+
+
+def rule_based_triage(query: str, is_follow_up: bool = False) -> Dict[str, Any]:
+    """
+    Triage fields (same keys as the unified triage LLM output) plus `confidence`
+    (0-1) and `rules_matched` for logging.
+    """
+    text = (query or "").strip()
+    matches = match_programs(text)
+    programs = list(dict.fromkeys(pid for pid, _, _ in matches))
+    only_ambiguous = bool(matches) and all(alias in _AMBIGUOUS_ALIASES for _, alias, _ in matches)
+
+    topic = _coverage_topic(text)
+    matched = {
+        "cohort": bool(_COHORT.search(text)),
+        "comparison": bool(_COMPARISON.search(text)),
+        "duration": bool(_DURATION.search(text)),
+        "certification": bool(_CERTIFICATION.search(text)),
+        "requirements": bool(_REQUIREMENTS.search(text)),
+        "career_outcome": bool(_CAREER.search(text)),
+        "technical_detail": bool(_TECHNICAL.search(text)),
+        "coverage": topic is not None,
+        "breakdown": is_breakdown_request(text),
+    }
+    rules = [name for name, hit in matched.items() if hit]
+
+    result: Dict[str, Any] = {
+        "enhanced_query": _expand_codes(text, matches) if matches else text,
+        "query_intent": "general_info",
+        "detected_programs": programs,
+        "is_cohort_calendar_question": False,
+        "cohort_filters": {"track": None, "type": None, "month": None, "year": None, "future_only": False},
+        "is_coverage_question": False,
+        "coverage_topic": None,
+        "rules_matched": rules,
+    }
+
+    confidence = CONFIDENT
+    if len(rules) == 1:
+        rule = rules[0]
+        if rule == "cohort":
+            result["is_cohort_calendar_question"] = True
+            year = _YEAR.search(text)
+            result["cohort_filters"] = {
+                "track": PROGRAM_SYNONYMS[programs[0]].get("code") if len(programs) == 1 else None,
+                "type": "PT" if _PART_TIME.search(text) else ("FT" if _FULL_TIME.search(text) else None),
+                "month": _month(text),
+                "year": int(year.group(1)) if year else None,
+                "future_only": bool(_FUTURE.search(text)),
+            }
+            if len(programs) > 1:
+                confidence = UNSURE
+        elif rule == "comparison":
+            result["query_intent"] = "comparison"
+            if len(programs) < 2:
+                confidence = UNSURE
+        elif rule == "coverage":
+            result["query_intent"] = "coverage"
+            result["is_coverage_question"] = True
+            result["coverage_topic"] = topic
+            if len(programs) != 1 or len(topic.split()) > _SHORT_TOPIC_WORDS:
+                confidence = UNSURE
+        elif rule == "breakdown":
+            if len(programs) != 1:
+                confidence = UNSURE
+        else:
+            result["query_intent"] = rule
+            # Program-specific intents need the program; generic ones (certifications,
+            # computer requirements) are fine portfolio-wide
+            if rule in ("duration", "technical_detail", "career_outcome") and len(programs) != 1:
+                confidence = UNSURE
+    else:
+        # No rule, or rules disagree: the LLM reads it better
+        confidence = UNSURE if rules else 0.3
+
+    if is_follow_up:
+        confidence = min(confidence, 0.3)  # "does it teach Python?" needs the thread
+    if only_ambiguous:
+        confidence = min(confidence, UNSURE)
+    if is_portfolio_wide_query(text):
+        confidence = min(confidence, UNSURE)
+
+    result["confidence"] = confidence
+    result["ambiguity_score"] = round(1.0 - confidence, 2)
+    return result
@@ -7,80 +7,23 @@ import json
 import logging
 import os
 import re
+import time
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 
 from src.config import openai_client
+from src.deadline import remaining_timeout
+from src.instrumentation import record_llm_usage
+from src.kb_chunking import syllabus_outline
+from src.resilience import breaker_for, is_degradation_error
+from src.slack_markdown import convert_markdown_to_slack  # noqa: F401 (re-exported)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
-def convert_markdown_to_slack(text: str) -> str:
-    """
-    Convert markdown formatting to Slack-friendly formatting.
-    - Headers (##, ###) -> Bold with newlines
-    - **bold** -> *bold* (Slack uses single asterisk)
-    - Markdown lists -> Slack-friendly lists with bullets
-    - Code blocks -> Preserved with backticks
-    - Links -> Slack link format
-    """
-    # Protect code blocks from being modified
-    code_blocks = []
-    def protect_code(match):
-        code_blocks.append(match.group(0))
-        return f"__CODE_BLOCK_{len(code_blocks)-1}__"
-
-    # Protect inline code
-    inline_code = []
-    def protect_inline_code(match):
-        inline_code.append(match.group(0))
-        return f"__INLINE_CODE_{len(inline_code)-1}__"
-
-    # Protect code blocks (```code```)
-    text = re.sub(r'```[\s\S]*?```', protect_code, text)
-
-    # Protect inline code (`code`)
-    text = re.sub(r'`([^`]+)`', protect_inline_code, text)
-
-    # Remove markdown headers and convert to bold
-    # Handle both ## and ### headers
-    text = re.sub(r'^##+\s+(.+)$', r'*\1*', text, flags=re.MULTILINE)
-
-    # Convert markdown bold (**text**) to Slack bold (*text*)
-    # But be careful not to convert single asterisks that are already Slack formatting
-    text = re.sub(r'\*\*([^*]+)\*\*', r'*\1*', text)
-
-    # Convert markdown links [text](url) to Slack format <url|text>
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<\2|\1>', text)
-
-    # Convert markdown lists (- or *) to Slack bullets (•)
-    # Handle both - and * list markers, but avoid converting asterisks in bold text
-    text = re.sub(r'^[\s]*[-]\s+', '• ', text, flags=re.MULTILINE)
-    # For asterisk lists, be more careful - only convert if it's at start of line with spaces
-    text = re.sub(r'^[\s]+\*\s+', '• ', text, flags=re.MULTILINE)
-
-    # Convert numbered lists (1. 2. etc.) to Slack format (1. 2. etc. - keep as is)
-    # Slack supports numbered lists, so we can keep them
-
-    # Remove excessive blank lines (more than 2 consecutive)
-    text = re.sub(r'\n{3,}', '\n\n', text)
-
-    # Restore inline code
-    for i, code in enumerate(inline_code):
-        text = text.replace(f"__INLINE_CODE_{i}__", code)
-
-    # Restore code blocks
-    for i, code in enumerate(code_blocks):
-        text = text.replace(f"__CODE_BLOCK_{i}__", code)
-
-    # Clean up any remaining markdown artifacts
-    text = text.strip()
-
-    return text
-
-
 def format_conversation_history(messages: List[BaseMessage], limit: int = 5) -> str:
     """Format conversation history for prompts."""
     if not messages:
@@ -107,6 +50,34 @@ def _sampling_kwargs(model: str, temperature: float) -> Dict:
     return {"temperature": temperature}
 
 
+def json_chat_request(
+    system_prompt: str,
+    user_prompt: str,
+    model: str = None,
+    schema: Dict = None,
+    schema_name: str = "response",
+) -> Dict:
+    """Chat Completions request body for a JSON call (shared by call_openai_json and src/llm_batch.py)."""
+    from src.config import MODEL_FAST
+    model = model or MODEL_FAST
+    if schema:
+        response_format = {
+            "type": "json_schema",
+            "json_schema": {"name": schema_name, "strict": True, "schema": schema},
+        }
+    else:
+        response_format = {"type": "json_object"}
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "response_format": response_format,
+        **_sampling_kwargs(model, 0.1),
+    }
+
+
 def call_openai_json(
     system_prompt: str,
     user_prompt: str,
@@ -121,33 +92,31 @@ def call_openai_json(
         system_prompt: System prompt for the API call
         user_prompt: User prompt for the API call
         model: Model to use (default: MODEL_FAST from config)
-        timeout: Request timeout in seconds
+        timeout: Request timeout in seconds (capped at the request deadline's remaining time)
         schema: Optional JSON Schema; when given, uses strict structured outputs
                 so the shape is enforced by the API instead of hoped for
         schema_name: Name for the structured output schema
     """
-    from src.config import MODEL_FAST
-    model = model or MODEL_FAST
-    if schema:
-        response_format = {
-            "type": "json_schema",
-            "json_schema": {"name": schema_name, "strict": True, "schema": schema},
-        }
-    else:
-        response_format = {"type": "json_object"}
+    request = json_chat_request(system_prompt, user_prompt, model, schema, schema_name)
+    timeout = remaining_timeout(timeout)
+    if timeout is None:
+        logger.warning("OpenAI JSON call skipped: request deadline reached")
+        return {}
+    breaker = breaker_for("chat.completions", request["model"])
+    if not breaker.allow():
+        logger.warning(f"OpenAI JSON call skipped: circuit {breaker.name} is open")
+        return {}
+    start = time.perf_counter()
+    response = None
     try:
-        response = openai_client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format=response_format,
-            timeout=timeout,
-            **_sampling_kwargs(model, 0.1),
-        )
+        response = openai_client.chat.completions.create(**request, timeout=timeout)
+        breaker.record(True, time.perf_counter() - start)
+        record_llm_usage(getattr(response, "usage", None))
         return json.loads(response.choices[0].message.content)
     except Exception as e:
+        if response is None:
+            # A rejected request (4xx) still means the service is answering
+            breaker.record(not is_degradation_error(e), time.perf_counter() - start)
         logger.error(f"OpenAI JSON call failed: {e}")
         return {}
 
@@ -159,10 +128,20 @@ def call_openai_text(system_prompt: str, user_prompt: str, model: str = None, ti
         system_prompt: System prompt for the API call
         user_prompt: User prompt for the API call
         model: Model to use (default: MODEL_QUALITY from config)
-        timeout: Request timeout in seconds
+        timeout: Request timeout in seconds (capped at the request deadline's remaining time)
     """
     from src.config import MODEL_QUALITY
     model = model or MODEL_QUALITY
+    timeout = remaining_timeout(timeout)
+    if timeout is None:
+        logger.warning("OpenAI text call skipped: request deadline reached")
+        return ""
+    breaker = breaker_for("chat.completions", model)
+    if not breaker.allow():
+        logger.warning(f"OpenAI text call skipped: circuit {breaker.name} is open")
+        return ""
+    start = time.perf_counter()
+    response = None
     try:
         response = openai_client.chat.completions.create(
             model=model,
@@ -173,8 +152,13 @@ def call_openai_text(system_prompt: str, user_prompt: str, model: str = None, ti
             timeout=timeout,
             **_sampling_kwargs(model, 0.3),
         )
+        breaker.record(True, time.perf_counter() - start)
+        record_llm_usage(getattr(response, "usage", None))
         return response.choices[0].message.content
     except Exception as e:
+        if response is None:
+            # A rejected request (4xx) still means the service is answering
+            breaker.record(not is_degradation_error(e), time.perf_counter() - start)
         logger.error(f"OpenAI text call failed: {e}")
         return ""
 
@@ -238,16 +222,6 @@ _MONTH_DISPLAY = {
     "09": "September", "10": "October", "11": "November", "12": "December",
 }
 
-_UNIVERSAL_DOC_DISPLAY = {
-    "certifications": "Certifications guide",
-    "computer_specs_min_requirements": "Computer requirements",
-    "course_design_overview": "Course design overview",
-    "ironhack_portfolio_overview": "Ironhack portfolio overview",
-    "mein_now_title_equivalence": "MeinNOW course title mapping",
-    "discontinued_programs": "Discontinued programs list",
-}
-
-
 def humanize_source_citation(source: str, program_synonyms: Dict) -> str:
     """
     User-friendly name for a source file, for people who don't care about .md files:
@@ -274,24 +248,19 @@ def humanize_source_citation(source: str, program_synonyms: Dict) -> str:
         label = f"{name} bootcamp syllabus" if "bootcamp" in base_lower and "bootcamp" not in name.lower() else f"{name} syllabus"
         return label + date_suffix
 
-    for needle, display in _UNIVERSAL_DOC_DISPLAY.items():
-        if needle in base_lower:
-            return display + date_suffix
+    from src.kb_manifest import get_kb_manifest
+    display = get_kb_manifest().display_name(s)
+    if display:
+        return display + date_suffix
 
     return base.replace("_", " ").strip() + date_suffix
 
 
 def program_for_source(source: str, program_synonyms: Dict) -> Optional[str]:
     """Map a chunk source filename to its program id, version-tolerant. None if no match."""
-    src_base = strip_doc_version(source or "")
-    if not src_base:
-        return None
-    for pid, info in (program_synonyms or {}).items():
-        for fn in (info or {}).get("filenames", []):
-            base = strip_doc_version(fn)
-            if base and base in src_base:
-                return pid
-    return None
+    from src.program_matcher import get_program_matcher
+
+    return get_program_matcher(program_synonyms or {}).resolve_source(source)[0]
 
 
 _BREAKDOWN_PATTERNS = re.compile(
@@ -389,6 +358,31 @@ def load_full_syllabus_docs(program_ids: List[str], program_synonyms: Dict) -> L
     return docs
 
 
+@lru_cache(maxsize=64)
+def _syllabus_outline(source: str, content: str, max_chars: int) -> str:
+    # Keyed by content, so an edited syllabus gets a new outline
+    return syllabus_outline(content, source, max_chars)
+
+
+def load_syllabus_outline_docs(
+    program_ids: List[str], program_synonyms: Dict, max_chars: int = 3000,
+) -> List[Dict[str, Any]]:
+    """
+    Like load_full_syllabus_docs, but each syllabus as its outline index (every
+    unit with hours and as many topics as fit in max_chars) - a few KB instead
+    of the 30-60 KB document. Syllabi without unit headings stay whole.
+    """
+    docs = []
+    for doc in load_full_syllabus_docs(program_ids, program_synonyms):
+        outline = _syllabus_outline(doc["source"], doc["content"], max_chars)
+        if not outline:
+            docs.append(doc)
+            continue
+        docs.append({**doc, "content": outline, "quote": outline[:200], "syllabus_outline": True})
+        logger.info(f"Syllabus outline for {doc['source']}: {len(outline)} of {len(doc['content'])} chars")
+    return docs
+
+
 _TOPIC_INDEX_STOPWORDS = {
     "which", "what", "who", "where", "when", "how", "does", "did", "are", "is", "was",
     "course", "courses", "program", "programs", "bootcamp", "bootcamps", "vertical", "verticals",
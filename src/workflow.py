@@ -5,9 +5,19 @@ Constructs the LangGraph StateGraph with all nodes and routing logic.
 
 import logging
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 
 from src.state import RAGState
+from src.config import (
+    CHECKPOINT_BACKEND,
+    CHECKPOINT_SQLITE_PATH,
+    CHECKPOINT_TTL_SECONDS,
+    CHECKPOINT_MAX_THREADS,
+    KB_MANIFEST_PATH,
+)
+from src.checkpointer import build_checkpointer
+from src.instrumentation import instrument_node
+from src.kb_manifest import get_kb_manifest, record_manifest
+from src.program_matcher import get_program_matcher
 
 # ---------------- Query Nodes ----------------
 # (query_enhancement is kept for the ENHANCE_QUERY_KEYWORDS refinement retry;
@@ -44,6 +54,7 @@ from src.nodes.generation_nodes import (
     generate_response_node,
     generate_negative_coverage_node,
     discontinued_program_response_node,
+    answer_bank_response_node,
 )
 
 # ---------------- Fallback Nodes ----------------
@@ -60,6 +71,7 @@ from src.nodes.cohort_calendar_nodes import (
 
 # ---------------- Routing Functions ----------------
 from src.routes import (
+    route_after_answer_bank,
     route_after_cohort_calendar_classification,
     route_after_document_filtering,
     route_after_coverage_classification,
@@ -71,44 +83,70 @@ from src.routes import (
 logger = logging.getLogger(__name__)
 
 
+def _add_node(workflow: StateGraph, name: str, node_fn) -> None:
+    """Register a node wrapped with instrumentation (trace entry + metrics)."""
+    workflow.add_node(name, instrument_node(name, node_fn))
+
+
 def build_workflow() -> StateGraph:
     """Build the LangGraph workflow with all nodes and routing."""
     logger.info("Building RAG workflow...")
 
+    # Hash the knowledge base (version id for caches, universal-doc registry) and
+    # log what changed since the last start
+    record_manifest(get_kb_manifest(), KB_MANIFEST_PATH)
+
+    # Compile program alias/source lookups now rather than on the first question
+    get_program_matcher()
+
     workflow = StateGraph(RAGState)
 
-    # Add all nodes
-    workflow.add_node("query_enhancement", query_enhancement_node)
-    workflow.add_node("unified_triage", unified_triage_node)
-    workflow.add_node("hybrid_retrieval", hybrid_retrieval_node)
-    workflow.add_node("relevance_assessment", relevance_assessment_node)
-    workflow.add_node("document_filtering", document_filtering_node)
-    workflow.add_node("coverage_classification", coverage_classification_node)
-    workflow.add_node("coverage_verification", coverage_verification_node)
-    workflow.add_node("generate_response", generate_response_node)
-    workflow.add_node("faithfulness_verification", faithfulness_verification_node)
-    workflow.add_node("iterative_refinement", iterative_refinement_node)
-    workflow.add_node("generate_fun_fallback", generate_fun_fallback_node)
-    workflow.add_node("generate_negative_coverage", generate_negative_coverage_node)
-    workflow.add_node("finalize_response", finalize_response_node)
-    workflow.add_node("cohort_calendar_response", cohort_calendar_response_node)
+    # Add all nodes (each wrapped with per-node latency/token instrumentation)
+    _add_node(workflow, "query_enhancement", query_enhancement_node)
+    _add_node(workflow, "unified_triage", unified_triage_node)
+    _add_node(workflow, "hybrid_retrieval", hybrid_retrieval_node)
+    _add_node(workflow, "relevance_assessment", relevance_assessment_node)
+    _add_node(workflow, "document_filtering", document_filtering_node)
+    _add_node(workflow, "coverage_classification", coverage_classification_node)
+    _add_node(workflow, "coverage_verification", coverage_verification_node)
+    _add_node(workflow, "generate_response", generate_response_node)
+    _add_node(workflow, "faithfulness_verification", faithfulness_verification_node)
+    _add_node(workflow, "iterative_refinement", iterative_refinement_node)
+    _add_node(workflow, "generate_fun_fallback", generate_fun_fallback_node)
+    _add_node(workflow, "generate_negative_coverage", generate_negative_coverage_node)
+    _add_node(workflow, "finalize_response", finalize_response_node)
+    _add_node(workflow, "cohort_calendar_response", cohort_calendar_response_node)
 
     # Entry: one unified triage call replaces query enhancement + program
     # detection + cohort classification + coverage classification
     workflow.set_entry_point("unified_triage")
 
-    # After triage: discontinued program, cohort/calendar path, or standard retrieval
-    workflow.add_node("discontinued_program_response", discontinued_program_response_node)
+    # After triage: discontinued program, precomputed answer, cohort/calendar path,
+    # or standard retrieval
+    _add_node(workflow, "discontinued_program_response", discontinued_program_response_node)
+    _add_node(workflow, "answer_bank_response", answer_bank_response_node)
     workflow.add_conditional_edges(
         "unified_triage",
         route_after_cohort_calendar_classification,
         {
             "discontinued_program_response": "discontinued_program_response",
+            "answer_bank_response": "answer_bank_response",
             "cohort_calendar_response": "cohort_calendar_response",
             "hybrid_retrieval": "hybrid_retrieval",
         },
     )
     workflow.add_edge("discontinued_program_response", END)
+    # A bank entry that vanished after triage is a miss, not an empty answer
+    workflow.add_conditional_edges(
+        "answer_bank_response",
+        route_after_answer_bank,
+        {
+            "end": END,
+            "discontinued_program_response": "discontinued_program_response",
+            "cohort_calendar_response": "cohort_calendar_response",
+            "hybrid_retrieval": "hybrid_retrieval",
+        },
+    )
     workflow.add_edge("cohort_calendar_response", END)
 
     # Add edges (standard RAG path)
@@ -183,8 +221,13 @@ def build_workflow() -> StateGraph:
     workflow.add_edge("generate_fun_fallback", END)
     workflow.add_edge("finalize_response", END)
 
-    # Compile with memory
-    memory = MemorySaver()
+    # Compile with bounded per-thread memory (latest checkpoint only, TTL + LRU cap)
+    memory = build_checkpointer(
+        CHECKPOINT_BACKEND,
+        sqlite_path=CHECKPOINT_SQLITE_PATH,
+        ttl_seconds=CHECKPOINT_TTL_SECONDS,
+        max_threads=CHECKPOINT_MAX_THREADS,
+    )
     return workflow.compile(checkpointer=memory)
 
 
@@ -0,0 +1,144 @@
+"""
+Offline tests for the precomputed answer bank: template matching on triaged
+questions, KB-version keying, serving a banked answer straight from triage, and
+the precompute job's verification gate. No OpenAI calls.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+import pytest  # noqa: E402
+
+import src.answer_bank as answer_bank  # noqa: E402
+import src.nodes.triage_nodes as triage_nodes  # noqa: E402
+from src.answer_bank import AnswerBank, match_template, template_question  # noqa: E402
+from src.nodes.generation_nodes import answer_bank_response_node  # noqa: E402
+from src.routes import route_after_answer_bank, route_after_cohort_calendar_classification  # noqa: E402
+from precompute_answer_bank import plan, precompute, verified_answer  # noqa: E402
+
+
+def _triaged(programs, **extra):
+    return {"detected_programs": programs, "conversation_history": [], **extra}
+
+
+@pytest.mark.parametrize("query,programs,expected", [
+    ("How long is the Data Analytics bootcamp?", ["data_analytics"], "duration"),
+    ("What certifications does DevOps include?", ["devops"], "certification"),
+    ("Does Data Analytics cover Python?", ["data_analytics"], "coverage:python"),
+    ("Compare Data Analytics and DevOps duration", ["data_analytics", "devops"], None),
+    ("How long is the bootcamp?", [], None),
+    ("How long is Data Analytics and what certifications does it include?", ["data_analytics"], None),
+    # One rule matches, but the banked answer does not answer the question
+    ("How long is week 3 of Web Development?", ["web_development"], None),
+    ("How long does the DevOps bootcamp spend on Kubernetes?", ["devops"], None),
+    ("What hours are the classes for UX UI part time?", ["ux_ui"], None),
+    ("What certifications does Data Analytics include and how much do they cost?", ["data_analytics"], None),
+])
+def test_match_template(query, programs, expected):
+    assert match_template(query, _triaged(programs)) == expected
+
+
+def test_canonical_questions_match_their_template():
+    from src.triage_rules import rule_based_triage
+
+    for key in ("duration", "certification", "requirements", "breakdown", "coverage:python"):
+        question = template_question("Data Analytics", key)
+        assert match_template(question, _triaged(rule_based_triage(question)["detected_programs"])) == key
+
+
+def test_follow_ups_never_match():
+    state = _triaged(["data_analytics"], conversation_history=[{"role": "user", "content": "hi"}])
+    assert match_template("How long is the Data Analytics bootcamp?", state) is None
+
+
+def test_entries_from_another_kb_version_are_ignored(tmp_path):
+    path = str(tmp_path / "bank.json")
+    old = AnswerBank(path, version="kb-old")
+    old.put("devops", "duration", "400 hours", ["DevOps_bootcamp_2025_07.md"])
+    old.save()
+
+    assert AnswerBank(path, version="kb-old").get("devops", "duration")["response"] == "400 hours"
+    current = AnswerBank(path, version="kb-new")
+    assert current.get("devops", "duration") is None
+    assert current.stats() == {"fresh": 0, "stale": 1}
+    assert plan(["devops"], ["duration", "breakdown"], current, force=False) == [
+        ("devops", "duration"), ("devops", "breakdown"),
+    ]
+
+
+def test_triage_serves_banked_answer(monkeypatch, tmp_path):
+    bank = AnswerBank(str(tmp_path / "bank.json"), version="kb-1")
+    bank.put("data_analytics", "duration", "*Data Analytics* is 360 hours.", ["Data_Analytics_Remote_bootcamp_2025_07.md"])
+    monkeypatch.setattr(answer_bank, "ANSWER_BANK", bank)
+
+    state = triage_nodes.unified_triage_node({"query": "How long is the Data Analytics bootcamp?", "conversation_history": []})
+    assert state["answer_template"] == "duration"
+    assert route_after_cohort_calendar_classification(state) == "answer_bank_response"
+
+    answered = answer_bank_response_node(state)
+    assert answered["final_response"] == "*Data Analytics* is 360 hours."
+    assert answered["source_citations"] == ["Data_Analytics_Remote_bootcamp_2025_07.md"]
+    assert answered["metadata"]["answer_bank"]["kb_version"] == "kb-1"
+    assert route_after_answer_bank(answered) == "end"
+
+    # The precompute job must always run the full pipeline
+    skipped = triage_nodes.unified_triage_node({
+        "query": "How long is the Data Analytics bootcamp?", "conversation_history": [], "skip_answer_bank": True,
+    })
+    assert skipped["answer_template"] == ""
+    assert route_after_cohort_calendar_classification(skipped) == "hybrid_retrieval"
+
+
+def test_vanished_entry_is_answered_by_the_pipeline(monkeypatch, tmp_path):
+    monkeypatch.setattr(answer_bank, "ANSWER_BANK", AnswerBank(str(tmp_path / "bank.json"), version="kb-1"))
+    state = {"query": "How long is the Data Analytics bootcamp?", "detected_programs": ["data_analytics"],
+             "answer_template": "duration"}
+
+    missed = answer_bank_response_node(state)
+    assert missed["answer_template"] == "" and not missed.get("final_response")
+    assert route_after_answer_bank(missed) == "hybrid_retrieval"
+
+
+def test_legacy_triage_fallback_clears_previous_template(monkeypatch):
+    import src.nodes.cohort_calendar_nodes as cohort_calendar_nodes
+    import src.nodes.parallel_query_nodes as parallel_query_nodes
+
+    monkeypatch.setattr(triage_nodes, "call_openai_json", lambda *args, **kwargs: None)
+    monkeypatch.setattr(parallel_query_nodes, "parallel_query_processing_node", lambda state: state)
+    monkeypatch.setattr(cohort_calendar_nodes, "cohort_calendar_classification_node", lambda state: state)
+
+    # Turn 2 of a thread whose turn 1 was served from the bank (checkpointed state)
+    state = triage_nodes.unified_triage_node({
+        "query": "Tell me more about the projects", "conversation_history": [], "answer_template": "duration",
+    })
+    assert state["triage_used"] is False
+    assert state["answer_template"] == ""
+    assert route_after_cohort_calendar_classification(state) != "answer_bank_response"
+
+
+def _result(nodes, **extra):
+    return {"final_response": "answer", "metadata": {"trace": [{"node": n} for n in nodes]}, **extra}
+
+
+def test_only_verified_answers_are_banked(tmp_path):
+    assert verified_answer(_result(["generate_response", "finalize_response"], faithfulness_score=0.9))
+    assert not verified_answer(_result(["generate_response", "finalize_response"], faithfulness_score=0.65))
+    assert not verified_answer(_result(["generate_fun_fallback"], faithfulness_score=0.9))
+    assert verified_answer(_result(["coverage_verification", "generate_negative_coverage"]))
+
+    answers = {
+        template_question("DevOps & Cloud Computing", "duration"): _result(["finalize_response"], faithfulness_score=0.95),
+        template_question("DevOps & Cloud Computing", "breakdown"): _result(["generate_fun_fallback"]),
+    }
+    bank = AnswerBank(str(tmp_path / "bank.json"), version="kb-1")
+    report = precompute([("devops", "duration"), ("devops", "breakdown")], bank, run=answers.__getitem__, workers=1)
+    assert report == {"stored": ["devops|duration"], "rejected": ["devops|breakdown"]}
+    assert bank.get("devops", "duration")["question"] == "How long is the DevOps & Cloud Computing program?"
@@ -0,0 +1,120 @@
+"""
+Offline tests for the bounded checkpointers (src/checkpointer.py): latest-only
+history, doc text stripping, TTL/LRU eviction and SQLite persistence shared
+between saver instances (as between gunicorn workers). Uses a tiny graph.
+"""
+
+import os
+import sys
+from typing import Dict, List, TypedDict
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from langgraph.graph import END, StateGraph  # noqa: E402
+
+from src.checkpointer import BoundedMemorySaver, SQLiteCheckpointSaver, build_checkpointer  # noqa: E402
+
+
+class _State(TypedDict, total=False):
+    query: str
+    turns: int
+    retrieved_docs: List[Dict]
+    final_response: str
+
+
+def _graph(saver):
+    def retrieve(state):
+        return {**state, "turns": state.get("turns", 0) + 1,
+                "retrieved_docs": [{"source": "DevOps_bootcamp_2025_07.md", "content": "x" * 5000, "score": 0.9}]}
+
+    def answer(state):
+        return {**state, "final_response": f"answer to {state['query']}"}
+
+    graph = StateGraph(_State)
+    graph.add_node("retrieve", retrieve)
+    graph.add_node("answer", answer)
+    graph.set_entry_point("retrieve")
+    graph.add_edge("retrieve", "answer")
+    graph.add_edge("answer", END)
+    return graph.compile(checkpointer=saver)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_latest_checkpoint_only_and_docs_stripped():
+    saver = BoundedMemorySaver()
+    graph = _graph(saver)
+    first = graph.invoke({"query": "q1"}, _config("t1"))
+    assert first["retrieved_docs"][0]["content"]  # the run itself still sees the text
+
+    graph.invoke({"query": "q2"}, _config("t1"))
+    assert len(saver.storage["t1"][""]) == 1
+    assert all(key[0] == "t1" for key in saver.blobs)
+
+    stored = saver.get_tuple(_config("t1")).checkpoint["channel_values"]
+    assert stored["turns"] == 2  # state still carries across turns
+    assert stored["retrieved_docs"] == [{"source": "DevOps_bootcamp_2025_07.md", "score": 0.9}]
+
+
+def test_lru_cap_and_ttl():
+    clock = _Clock()
+    saver = BoundedMemorySaver(max_threads=2, ttl_seconds=60, clock=clock)
+    graph = _graph(saver)
+    for thread_id in ("a", "b", "c"):
+        clock.now += 1
+        graph.invoke({"query": thread_id}, _config(thread_id))
+    assert saver.thread_count == 2 and saver.get_tuple(_config("a")) is None
+    assert {key[0] for key in saver.blobs} == {"b", "c"}
+
+    clock.now += 61
+    assert saver.get_tuple(_config("b")) is None
+    assert saver.thread_count == 1
+
+
+def test_sqlite_state_survives_restart_and_is_shared(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    worker_a = SQLiteCheckpointSaver(path)
+    worker_b = SQLiteCheckpointSaver(path)
+    _graph(worker_a).invoke({"query": "q1"}, _config("t1"))
+
+    # Another worker continues the thread, then the first picks up its newer state
+    assert _graph(worker_b).invoke({"query": "q2"}, _config("t1"))["turns"] == 2
+    assert _graph(worker_a).invoke({"query": "q3"}, _config("t1"))["turns"] == 3
+
+    worker_a.close()
+    worker_b.close()
+    restarted = SQLiteCheckpointSaver(path)
+    stored = restarted.get_tuple(_config("t1")).checkpoint["channel_values"]
+    assert stored["turns"] == 3 and "content" not in stored["retrieved_docs"][0]
+
+    restarted.delete_thread("t1")
+    assert SQLiteCheckpointSaver(path).get_tuple(_config("t1")) is None
+
+
+def test_sqlite_ttl_expires_rows(tmp_path):
+    clock = _Clock()
+    saver = SQLiteCheckpointSaver(str(tmp_path / "c.sqlite3"), ttl_seconds=60, clock=clock)
+    _graph(saver).invoke({"query": "q1"}, _config("t1"))
+    clock.now += 61
+    other = SQLiteCheckpointSaver(str(tmp_path / "c.sqlite3"), ttl_seconds=60, clock=clock)
+    assert other.get_tuple(_config("t1")) is None
+
+
+def test_build_checkpointer_backends(tmp_path):
+    assert type(build_checkpointer("memory")) is BoundedMemorySaver
+    assert isinstance(build_checkpointer("sqlite", sqlite_path=str(tmp_path / "x.sqlite3")), SQLiteCheckpointSaver)
+    # Unopenable path degrades to memory
+    assert type(build_checkpointer("sqlite", sqlite_path=str(tmp_path / "missing" / "x.sqlite3"))) is BoundedMemorySaver
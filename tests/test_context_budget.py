@@ -0,0 +1,108 @@
+"""
+Offline tests for the prompt context packer: budget filling by relevance,
+overlap dedupe, and structure-preserving syllabus condensing (breakdown
+answers must still see every unit). No OpenAI calls.
+"""
+
+import os
+import re
+import sys
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.context_budget import condense_syllabus, count_tokens, pack_context  # noqa: E402
+
+KB_DIR = os.path.join(os.path.dirname(__file__), "..", "knowledge_base", "database")
+
+
+def _words(prefix, n):
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+def test_count_tokens_nonzero_and_monotonic():
+    assert count_tokens("") == 0
+    assert 0 < count_tokens("hello world") < count_tokens("hello world " * 50)
+
+
+def test_chunks_packed_by_relevance_within_budget():
+    docs = [
+        {"source": "low.md", "content": _words("low", 200), "relevance_score": 0.3},
+        {"source": "high.md", "content": _words("high", 200), "relevance_score": 0.9},
+        {"source": "mid.md", "content": _words("mid", 200), "relevance_score": 0.6},
+    ]
+    budget = count_tokens(docs[1]["content"]) + count_tokens(docs[2]["content"]) + 60
+    packed, stats = pack_context(docs, budget)
+    assert [d["source"] for d in packed] == ["high.md", "mid.md"]
+    assert stats["over_budget_dropped"] == 1
+    assert stats["packed_tokens"] <= budget
+
+
+def test_max_docs_respected():
+    docs = [{"source": f"{i}.md", "content": _words(f"d{i}x", 30), "score": 1 - i / 10} for i in range(8)]
+    packed, _ = pack_context(docs, 100000, max_docs=6)
+    assert len(packed) == 6
+
+
+def test_overlapping_chunks_deduplicated():
+    base = _words("w", 120)
+    overlap = " ".join(base.split()[10:]) + " " + _words("tail", 5)
+    docs = [
+        {"source": "a.md", "content": base, "relevance_score": 0.9},
+        {"source": "a.md", "content": overlap, "relevance_score": 0.8},
+        {"source": "b.md", "content": _words("other", 60), "relevance_score": 0.5},
+    ]
+    packed, stats = pack_context(docs, 100000)
+    assert len(packed) == 2
+    assert stats["duplicates_dropped"] == 1
+
+
+def test_pinned_docs_come_first_regardless_of_score():
+    docs = [
+        {"source": "chunk.md", "content": _words("c", 50), "relevance_score": 0.95},
+        {"source": "index", "content": _words("i", 50), "score": 1.0, "pinned": True},
+    ]
+    packed, _ = pack_context(docs, 100000)
+    assert packed[0]["source"] == "index"
+
+
+def _unit_headings(text):
+    return [line.strip() for line in text.splitlines() if re.match(r"^#{2,4} .*(Unit|Module|Week|Módulo)", line)]
+
+
+def test_full_syllabus_condensed_keeps_every_unit():
+    path = os.path.join(KB_DIR, "AI_Driven_Marketing_bootcamp_2025_12.md")
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    doc = {"source": "AI_Driven_Marketing_bootcamp_2025_12.md", "content": content,
+           "full_syllabus": True, "score": 1.0}
+    budget = count_tokens(content) // 2
+    packed, stats = pack_context([doc], budget)
+
+    assert stats["condensed_syllabi"] == 1
+    condensed = packed[0]["content"]
+    assert count_tokens(condensed) < count_tokens(content)
+    headings = _unit_headings(content)
+    assert headings
+    for heading in headings:
+        assert heading in condensed
+    assert doc["content"] == content  # input not mutated
+
+
+def test_condense_syllabus_returns_original_when_it_fits():
+    text = "### **Unit 1: Basics (10 hours)**\n\n* Topic A\n"
+    assert condense_syllabus(text, 1000) == text
+
+
+def test_condense_syllabus_drops_prose_before_headings():
+    text = "\n".join(
+        ["### **Unit 1: Intro (40 hours)**", "**Objective**: " + "long prose sentence. " * 40]
+        + [f"* bullet {i} " + "detail " * 20 for i in range(10)]
+        + ["### **Unit 2: Advanced (60 hours)**", "**Objective**: " + "more prose here. " * 40]
+    )
+    condensed = condense_syllabus(text, 60)
+    assert "Unit 1: Intro (40 hours)" in condensed
+    assert "Unit 2: Advanced (60 hours)" in condensed
+    assert "long prose sentence. long prose" not in condensed
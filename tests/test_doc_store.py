@@ -0,0 +1,116 @@
+"""
+Offline tests for the per-request doc store: state carries references, prompts
+get the text, and the memory benchmark shows smaller checkpoints. No OpenAI calls.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+import src.doc_store as doc_store  # noqa: E402
+import src.nodes.generation_nodes as generation_nodes  # noqa: E402
+import src.slack_integration as slack_integration  # noqa: E402
+from src.doc_store import doc_text, hydrate_docs, release_doc_store, store_docs  # noqa: E402
+
+DOCS = [
+    {"source": "DevOps_bootcamp_2025_07.md", "content": "Unit 1: Linux and Bash (40 hours)", "score": 0.9},
+    {"source": "Certifications_2025_07.md", "content": "AWS Cloud Practitioner", "score": 0.7},
+]
+
+
+def test_refs_roundtrip_and_release():
+    store_id, refs = store_docs({}, DOCS)
+    assert all("content" not in r and r["chunk_id"] for r in refs)
+    assert refs[0]["source"] == "DevOps_bootcamp_2025_07.md" and refs[0]["score"] == 0.9
+
+    state = {"doc_store_id": store_id}
+    assert [d["content"] for d in hydrate_docs(state, refs)] == [d["content"] for d in DOCS]
+    assert doc_text(state, refs[1]) == "AWS Cloud Practitioner"
+
+    # Same request, second retrieval: same store, duplicate chunk stored once
+    same_id, again = store_docs(state, DOCS[:1])
+    assert same_id == store_id and again[0]["chunk_id"] == refs[0]["chunk_id"]
+
+    release_doc_store(store_id)
+    assert doc_text(state, refs[0]) == ""  # degrades to empty text, never raises
+    # A released id is not reused for the next request
+    next_id = store_docs(state, DOCS)[0]
+    assert next_id != store_id
+    release_doc_store(next_id)
+
+
+def test_inline_docs_pass_through():
+    assert hydrate_docs({}, DOCS) == DOCS
+    assert doc_text({}, DOCS[0]) == DOCS[0]["content"]
+
+
+def test_store_count_is_bounded(monkeypatch):
+    monkeypatch.setattr(doc_store, "MAX_STORES", 3)
+    ids = [store_docs({}, DOCS)[0] for _ in range(5)]
+    assert doc_store.doc_store_stats()["stores"] <= 3
+    assert doc_text({"doc_store_id": ids[0]}, {"chunk_id": doc_store.chunk_id_for(DOCS[0])}) == ""
+    for store_id in ids:
+        release_doc_store(store_id)
+
+
+def test_generation_prompt_gets_text_from_refs(monkeypatch):
+    prompts = []
+    monkeypatch.setattr(
+        generation_nodes, "call_openai_text",
+        lambda system, user, *a, **k: prompts.append(user) or "A long enough generated answer.",
+    )
+    store_id, refs = store_docs({}, DOCS)
+    result = generation_nodes.generate_response_node({
+        "query": "What does DevOps cover?",
+        "enhanced_query": "What does DevOps cover?",
+        "query_intent": "general_info",
+        "filtered_docs": refs,
+        "doc_store_id": store_id,
+    })
+    release_doc_store(store_id)
+    assert "Linux and Bash" in prompts[0]
+    assert all("content" not in d for d in result["filtered_docs"])
+
+
+def test_memory_benchmark_refs_shrink_checkpoints():
+    from state_memory_benchmark import run
+
+    stores_before = doc_store.doc_store_stats()["stores"]
+    report = run(requests=2, chunks=10)
+    assert report["refs"]["context_chars_per_request"] == report["inline"]["context_chars_per_request"]
+    assert report["refs"]["checkpoint_bytes_per_request"] * 5 < report["inline"]["checkpoint_bytes_per_request"]
+    assert doc_store.doc_store_stats()["stores"] == stores_before
+
+
+def test_failed_run_releases_its_checkpointed_store(monkeypatch):
+    class FailingWorkflow:
+        def __init__(self):
+            self.store_id = None
+
+        def invoke(self, state, config):
+            # Retrieval stored the docs, then a later node failed
+            self.store_id = store_docs(state, DOCS)[0]
+            raise RuntimeError("generation failed")
+
+        def get_state(self, config):
+            return type("Snapshot", (), {"values": {"doc_store_id": self.store_id}})()
+
+    workflow = FailingWorkflow()
+    monkeypatch.setattr(slack_integration, "rag_workflow", workflow)
+    monkeypatch.setattr(slack_integration, "REQUEST_COALESCING", False)
+    stores = doc_store.doc_store_stats()["stores"]
+    try:
+        slack_integration._run_workflow({"query": "What does DevOps cover?"}, {"configurable": {"thread_id": "t1"}})
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("the workflow error must propagate")
+    assert doc_store.doc_store_stats()["stores"] == stores
+    assert doc_text({"doc_store_id": workflow.store_id}, {"chunk_id": doc_store.chunk_id_for(DOCS[0])}) == ""
@@ -0,0 +1,110 @@
+"""
+Offline tests for Slack event de-duplication: memory/SQLite/Redis-compatible
+stores (atomic seen-or-add, TTL, sharing between processes) and the early drop
+of Slack retries in the Flask route. No network.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import src.slack_helpers as slack_helpers  # noqa: E402
+from src.event_dedupe import (  # noqa: E402
+    MemoryDedupeStore,
+    RedisDedupeStore,
+    SQLiteDedupeStore,
+    build_dedupe_store,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """The slice of redis-py the store uses: SET with NX and EX."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+
+    def set(self, name, value, nx=False, ex=None):
+        expires_at = self.data.get(name, (None, 0))[1]
+        if nx and name in self.data and expires_at > self.clock():
+            return None
+        self.data[name] = (value, self.clock() + ex)
+        return True
+
+
+def test_memory_store_ttl_and_cap():
+    clock = Clock()
+    store = MemoryDedupeStore(ttl_seconds=60, max_keys=3, clock=clock)
+    assert store.seen_or_add("a") is False
+    assert store.seen_or_add("a") is True
+    clock.now += 61
+    assert store.seen_or_add("a") is False
+    for key in ("b", "c", "d"):
+        store.seen_or_add(key)
+    assert len(store) == 3
+    # "a" was the oldest key and made room for "d"
+    assert store.seen_or_add("a") is False
+
+
+def test_sqlite_store_is_shared_between_processes(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "dedupe.sqlite3")
+    worker_1 = SQLiteDedupeStore(path, ttl_seconds=60, clock=clock)
+    worker_2 = SQLiteDedupeStore(path, ttl_seconds=60, clock=clock)
+    assert worker_1.seen_or_add("cmid:app_mention:abc") is False
+    assert worker_2.seen_or_add("cmid:app_mention:abc") is True
+    clock.now += 61
+    assert worker_2.seen_or_add("cmid:app_mention:abc") is False
+    assert worker_1.seen_or_add("cmid:app_mention:abc") is True
+    assert len(worker_1) == 1
+
+
+def test_redis_store_uses_set_nx_ex():
+    clock = Clock()
+    client = FakeRedis(clock)
+    store = RedisDedupeStore(client, ttl_seconds=60)
+    assert store.seen_or_add("k") is False
+    assert store.seen_or_add("k") is True
+    assert "slack-dedupe:k" in client.data
+    clock.now += 61
+    assert store.seen_or_add("k") is False
+
+
+def test_build_falls_back_to_memory(tmp_path):
+    assert isinstance(build_dedupe_store("sqlite", str(tmp_path / "d.sqlite3")), SQLiteDedupeStore)
+    assert isinstance(build_dedupe_store("sqlite", str(tmp_path / "missing" / "d.sqlite3")), MemoryDedupeStore)
+    assert isinstance(build_dedupe_store("redis", ""), MemoryDedupeStore)
+
+
+def test_already_processed_uses_store(monkeypatch, tmp_path):
+    monkeypatch.setattr(slack_helpers, "EVENT_DEDUPE", SQLiteDedupeStore(str(tmp_path / "d.sqlite3")))
+    event = {"type": "app_mention", "client_msg_id": "m-1", "channel": "C1", "ts": "1.0"}
+    assert slack_helpers._already_processed(event) is False
+    assert slack_helpers._already_processed(dict(event)) is True
+    assert slack_helpers._already_processed({"type": "app_mention"}) is False
+
+
+def test_slack_retries_dropped_before_processing():
+    from src.app import flask_app
+
+    client = flask_app.test_client()
+    response = client.post(
+        "/slack/events", json={"event_id": "Ev1"},
+        headers={"X-Slack-Retry-Num": "1", "X-Slack-Retry-Reason": "http_timeout"},
+    )
+    assert response.status_code == 200
+    assert response.headers.get("X-Slack-No-Retry") == "1"
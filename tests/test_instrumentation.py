@@ -0,0 +1,157 @@
+"""
+Offline tests for per-node instrumentation: trace entries in state metadata,
+LLM usage attribution (including worker threads), the Prometheus exposition
+and the slow-request log. No OpenAI or Slack calls.
+"""
+
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import src.utils as utils  # noqa: E402
+from src.instrumentation import (  # noqa: E402
+    METRICS,
+    finish_request_trace,
+    instrument_node,
+    propagate_context,
+    record_llm_usage,
+    render_metrics,
+)
+
+
+def _usage(prompt=100, completion=20, cached=0):
+    return SimpleNamespace(
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+    )
+
+
+class _FakeCompletions:
+    def __init__(self, content, usage):
+        self._content = content
+        self._usage = usage
+
+    def create(self, **kwargs):
+        message = SimpleNamespace(content=self._content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=self._usage)
+
+
+def _fake_client(content, usage):
+    return SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(content, usage)))
+
+
+def test_trace_entry_appended_to_metadata():
+    def node(state):
+        record_llm_usage(_usage(prompt=120, completion=30, cached=64))
+        record_llm_usage({"input_tokens": 10, "output_tokens": 5})
+        return {**state, "answer": "x"}
+
+    result = instrument_node("demo", node)({"metadata": {"trace": [{"node": "earlier"}]}})
+    trace = result["metadata"]["trace"]
+    assert [e["node"] for e in trace] == ["earlier", "demo"]
+    entry = trace[-1]
+    assert entry["llm_calls"] == 2
+    assert entry["prompt_tokens"] == 130
+    assert entry["completion_tokens"] == 35
+    assert entry["cached_tokens"] == 64
+    assert entry["cache_hits"] == 1
+    assert entry["duration_ms"] >= 0
+
+
+def test_usage_outside_node_is_ignored():
+    record_llm_usage(_usage())  # must not raise
+
+
+def test_worker_thread_calls_attributed_to_node():
+    def node(state):
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(propagate_context(lambda _: record_llm_usage(_usage())), range(3)))
+        return state
+
+    result = instrument_node("threaded", node)({})
+    assert result["metadata"]["trace"][-1]["llm_calls"] == 3
+
+
+def test_call_openai_json_records_usage(monkeypatch):
+    monkeypatch.setattr(utils, "openai_client", _fake_client(json.dumps({"ok": True}), _usage(50, 7)))
+
+    def node(state):
+        return {**state, "result": utils.call_openai_json("sys", "user")}
+
+    result = instrument_node("json_node", node)({})
+    assert result["result"] == {"ok": True}
+    entry = result["metadata"]["trace"][-1]
+    assert entry["llm_calls"] == 1
+    assert entry["prompt_tokens"] == 50
+
+
+def test_metrics_exposition_contains_node_series():
+    METRICS.reset()
+    instrument_node("metrics_node", lambda s: (record_llm_usage(_usage()), s)[1])({})
+    text = render_metrics()
+    assert "# TYPE product_wizard_node_duration_seconds histogram" in text
+    assert 'product_wizard_node_executions_total{node="metrics_node"} 1' in text
+    assert 'product_wizard_llm_tokens_total{kind="prompt",node="metrics_node"} 100' in text
+    assert 'product_wizard_node_duration_seconds_bucket{node="metrics_node",le="+Inf"} 1' in text
+
+
+def test_failing_node_counts_error_and_reraises():
+    METRICS.reset()
+
+    def node(state):
+        raise RuntimeError("boom")
+
+    try:
+        instrument_node("broken", node)({})
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("exception must propagate")
+    assert 'product_wizard_node_errors_total{node="broken"} 1' in render_metrics()
+
+
+def test_slow_request_logs_full_breakdown(caplog):
+    result = {"metadata": {"trace": [
+        {"node": "unified_triage", "duration_ms": 1200.0, "llm_calls": 1, "prompt_tokens": 900},
+        {"node": "generate_response", "duration_ms": 9000.0, "llm_calls": 1, "prompt_tokens": 8000},
+    ]}}
+    with caplog.at_level(logging.WARNING, logger="src.instrumentation"):
+        summary = finish_request_trace(result, elapsed=45.0, threshold=30.0)
+    assert summary["llm_calls"] == 2
+    assert summary["prompt_tokens"] == 8900
+    assert "Slow request" in caplog.text
+    assert "generate_response" in caplog.text
+
+
+def test_workflow_run_populates_trace(monkeypatch):
+    """Discontinued-program path: triage (one faked LLM call) -> deterministic answer."""
+    triage = {
+        "enhanced_query": "Do you offer the 1 year program?",
+        "query_intent": "general_info",
+        "ambiguity_score": 0.1,
+        "detected_programs": [],
+        "is_cohort_calendar_question": False,
+        "cohort_filters": {"track": None, "type": None, "month": None, "year": None, "future_only": False},
+        "is_coverage_question": False,
+        "coverage_topic": None,
+    }
+    monkeypatch.setattr(utils, "openai_client", _fake_client(json.dumps(triage), _usage(700, 40, 512)))
+    from src.workflow import rag_workflow
+
+    result = rag_workflow.invoke(
+        {"query": "Do you offer the 1 year program?", "iteration_count": 0, "metadata": {}},
+        {"configurable": {"thread_id": "test-instrumentation"}},
+    )
+    trace = result["metadata"]["trace"]
+    assert [e["node"] for e in trace] == ["unified_triage", "discontinued_program_response"]
+    assert trace[0]["llm_calls"] == 1 and trace[0]["cached_tokens"] == 512
+    assert trace[1]["llm_calls"] == 0
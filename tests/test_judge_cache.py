@@ -0,0 +1,136 @@
+"""
+Offline tests for the judge harness cache and rate limiter (tests/test_rag_judge.py).
+The pipeline and judge are replaced by counters - no OpenAI calls.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import test_rag_judge as judge  # noqa: E402
+
+FIXTURES = [
+    {"id": "a", "query": "Does DA teach Python?", "expected_answer": "Yes", "judge_criteria": ["Python"]},
+    {"id": "b", "query": "How long is web dev?", "expected_answer": "400h", "judge_criteria": ["hours"]},
+]
+
+
+def _install_fakes(monkeypatch):
+    calls = {"pipeline": 0, "judge": 0}
+
+    def fake_pipeline(test_case):
+        calls["pipeline"] += 1
+        return {
+            "final_response": f"answer to {test_case['query']}",
+            "citations": [],
+            "retrieved_documents": [],
+            "filtered_documents": [],
+            "metadata": {},
+            "elapsed_seconds": 1.5,
+            "timing": {"nodes_ms": {"generate_response": 900.0}},
+        }
+
+    def fake_judge(payload):
+        calls["judge"] += 1
+        return {"score": 9.0, "verdict": "pass", "feedback": "ok"}
+
+    monkeypatch.setattr(judge, "run_pipeline", fake_pipeline)
+    monkeypatch.setattr(judge, "judge_answer", fake_judge)
+    return calls
+
+
+def test_second_run_is_fully_cached(monkeypatch, tmp_path):
+    calls = _install_fakes(monkeypatch)
+    cache = judge.ResultCache(tmp_path)
+
+    first = judge.execute_tests(FIXTURES, parallel=True, workers=2, min_score=8.0, cache=cache)
+    second = judge.execute_tests(FIXTURES, parallel=True, workers=2, min_score=8.0, cache=cache)
+
+    assert calls == {"pipeline": 2, "judge": 2}
+    assert [r["id"] for r in second] == ["a", "b"]
+    assert all(r["passed"] for r in first + second)
+    assert all(r["timing"]["pipeline_cached"] and r["timing"]["judge_cached"] for r in second)
+    assert second[0]["timing"]["nodes_ms"] == {"generate_response": 900.0}
+
+
+def test_changed_criteria_rejudges_without_rerunning_pipeline(monkeypatch, tmp_path):
+    calls = _install_fakes(monkeypatch)
+    cache = judge.ResultCache(tmp_path)
+    judge.execute_tests(FIXTURES, parallel=False, workers=1, min_score=8.0, cache=cache)
+
+    edited = [dict(FIXTURES[0], judge_criteria=["Python", "cite the syllabus"]), FIXTURES[1]]
+    results = judge.execute_tests(edited, parallel=False, workers=1, min_score=8.0, cache=cache)
+
+    assert calls == {"pipeline": 2, "judge": 3}
+    assert results[0]["timing"]["pipeline_cached"] and not results[0]["timing"]["judge_cached"]
+
+
+def test_version_change_reruns_pipeline(monkeypatch, tmp_path):
+    calls = _install_fakes(monkeypatch)
+    cache = judge.ResultCache(tmp_path)
+    judge.run_case(FIXTURES[0], 8.0, cache, version_hash="v1")
+    judge.run_case(FIXTURES[0], 8.0, cache, version_hash="v1")
+    judge.run_case(FIXTURES[0], 8.0, cache, version_hash="v2")
+    assert calls["pipeline"] == 2
+
+
+def test_failed_judge_call_is_not_cached(monkeypatch, tmp_path):
+    calls = _install_fakes(monkeypatch)
+    monkeypatch.setattr(judge, "judge_answer", lambda payload: calls.__setitem__("judge", calls["judge"] + 1) or {})
+    cache = judge.ResultCache(tmp_path)
+    judge.run_case(FIXTURES[0], 8.0, cache, version_hash="v1")
+    judge.run_case(FIXTURES[0], 8.0, cache, version_hash="v1")
+    assert calls["judge"] == 2
+
+
+def test_version_hash_is_stable():
+    assert judge.compute_version_hash() == judge.compute_version_hash()
+    assert len(judge.compute_version_hash()) == 64
+
+
+def test_rate_limiter_spaces_acquisitions():
+    limiter = judge.RateLimiter(per_minute=600, burst=1)  # one slot per 0.1s
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.25
+    assert judge.RateLimiter(0).acquire() == 0.0
+
+
+def test_batch_judge_runs_uncached_verdicts_in_one_batch(monkeypatch, tmp_path):
+    calls = _install_fakes(monkeypatch)
+    submitted = []
+
+    class FakeBackend:
+        def submit(self, jsonl):
+            submitted.append([json.loads(line)["custom_id"] for line in jsonl.splitlines()])
+            return "batch-1"
+
+        def poll(self, batch_id):
+            lines = [
+                {"custom_id": custom_id, "response": {"status_code": 200, "body": {"choices": [
+                    {"message": {"content": json.dumps({"score": 9.0, "verdict": "pass"})}}
+                ]}}}
+                for custom_id in submitted[-1]
+            ]
+            return "completed", "\n".join(json.dumps(line) for line in lines)
+
+    cache = judge.ResultCache(tmp_path)
+    judge.execute_tests(FIXTURES[:1], parallel=False, workers=1, min_score=8.0, cache=cache)
+    results = judge.execute_tests(
+        FIXTURES, parallel=True, workers=2, min_score=8.0, cache=cache, judge_backend=FakeBackend(),
+    )
+
+    # Only the uncached verdict was batched; the synchronous judge ran once (first run)
+    assert submitted == [["b"]]
+    assert calls == {"pipeline": 2, "judge": 1}
+    assert [r["id"] for r in results] == ["a", "b"]
+    assert all(r["passed"] for r in results)
+    assert results[0]["timing"]["judge_cached"] and results[1]["timing"]["judge_batched"]
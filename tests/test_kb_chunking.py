@@ -0,0 +1,218 @@
+"""
+Offline tests for the KB build step: Markdown -> TXT conversion, local static
+chunking with the vector store's window/overlap semantics, the unit-aware
+syllabus chunker and outline index (what breakdown answers are generated
+from), chunk stats with per-program coverage, and the checked-in database_txt
+being up to date.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+import pytest  # noqa: E402
+
+import src.kb_chunking as kb_chunking  # noqa: E402
+from build_kb_txt import DEFAULT_MD_DIR, DEFAULT_TXT_DIR, convert, preview  # noqa: E402
+from src.config import KB_DOCUMENTS, PROGRAM_SYNONYMS  # noqa: E402
+from src.kb_chunking import (  # noqa: E402
+    chunk_stats, chunk_syllabus, chunk_text, md_to_txt, outline_index, parse_syllabus, syllabus_outline,
+)
+from src.utils import load_full_syllabus_docs, load_syllabus_outline_docs  # noqa: E402
+
+
+class CharEncoder:
+    """One token per character, so windows can be checked exactly."""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+@pytest.fixture
+def char_tokens(monkeypatch):
+    monkeypatch.setattr(kb_chunking, "token_encoder", lambda: CharEncoder())
+
+
+def test_md_to_txt_drops_editor_residue_and_keeps_structure():
+    markdown = "# DevOps  \r\n\r\n\r\n**Duration:** 360 hours  \n### \n<aside>\nKeep it\n</aside>\n\n- Docker\n"
+    assert md_to_txt(markdown) == "# DevOps\n\n**Duration:** 360 hours\nKeep it\n\n- Docker\n"
+    assert md_to_txt(md_to_txt(markdown)) == md_to_txt(markdown)
+
+
+def test_chunks_are_fixed_windows_sharing_the_overlap(char_tokens):
+    text = "".join(chr(ord("a") + i % 26) for i in range(1000))
+    chunks = chunk_text(text, "DevOps_bootcamp_2025_07.txt", max_tokens=400, overlap=100)
+
+    assert [c["tokens"] for c in chunks] == [400, 400, 400]
+    assert [c["index"] for c in chunks] == [0, 1, 2]
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous["text"][-100:] == current["text"][:100]
+    assert chunks[0]["text"] + "".join(c["text"][100:] for c in chunks[1:]) == text
+
+    # A window that reaches the end is the last one (no all-overlap tail chunk)
+    assert len(chunk_text("x" * 700, max_tokens=400, overlap=100)) == 2
+    assert chunk_text("   ") == []
+    with pytest.raises(ValueError):
+        chunk_text(text, max_tokens=100, overlap=100)
+
+
+def test_stats_report_distribution_and_program_coverage(char_tokens):
+    chunks = (
+        chunk_text("d" * 900, "DevOps_bootcamp_2025_07.txt", max_tokens=500, overlap=75)
+        + chunk_text("c" * 60, "Certifications_2025_07.txt", max_tokens=500, overlap=75)
+    )
+    stats = chunk_stats(chunks, max_tokens=500, program_synonyms=PROGRAM_SYNONYMS)
+
+    assert stats["chunks"] == 3 and stats["sources"] == 2
+    assert stats["tokens"]["min"] == 60 and stats["tokens"]["max"] == 500
+    assert stats["short_chunks"] == 1
+    assert stats["per_program"]["devops"] == {
+        "chunks": 2, "tokens": 975, "sources": ["DevOps_bootcamp_2025_07.txt"],
+    }
+    assert "devops" not in stats["uncovered_programs"]
+    assert "data_analytics" in stats["uncovered_programs"]
+
+
+SYLLABUS = """Course contents
+**DevOps and Cloud Computing**
+
+ - [Unit 1: Linux (40 hours)](#unit-1-linux-40-hours)
+
+## **Course Duration** {#course-duration}
+
+Duration: 360 hours \\+ 40 hours of prework
+
+## **Course Details**
+
+### **Unit 0: Prework (40 hours)** {#unit-0}
+
+Git basics.
+
+### **Unit 1: AWS \\- Cloud Computing**
+
+**Duration:** 2 weeks, 80 hours
+
+#### Topics
+
+- IAM
+- EC2
+
+### **Project 1: Infrastructure (1 week)**
+
+Deploy it.
+
+## **Learning Outcomes**
+
+Students can deploy.
+"""
+
+
+def test_syllabus_sections_keep_units_whole_with_hours():
+    overview, sections = parse_syllabus(SYLLABUS)
+
+    assert [(s["title"], s["hours"], s["weeks"]) for s in sections] == [
+        ("Unit 0: Prework (40 hours)", 40, None),
+        ("Unit 1: AWS - Cloud Computing", 80, 2),
+        ("Project 1: Infrastructure (1 week)", None, 1),
+    ]
+    # Sub-headings stay in their unit; a same-level heading ends it
+    assert "- EC2" in sections[1]["text"] and "#### Topics" in sections[1]["text"]
+    assert "Learning Outcomes" not in sections[2]["text"]
+    assert "Students can deploy." in "\n".join(overview)
+
+
+def test_outline_lists_every_unit_and_the_program_duration():
+    assert syllabus_outline(SYLLABUS, "DevOps_bootcamp_2025_07.txt") == "\n".join([
+        "Syllabus outline: DevOps bootcamp",
+        "Duration: 360 hours + 40 hours of prework",
+        "- Unit 0: Prework (40 hours)",
+        "- Unit 1: AWS - Cloud Computing (80 hours, 2 weeks)",
+        "- Project 1: Infrastructure (1 week)",
+    ])
+    assert syllabus_outline("# Certifications\n\nAWS, Azure\n") == ""
+
+
+def test_outline_index_fits_topics_into_the_budget():
+    index = outline_index(SYLLABUS, "DevOps_bootcamp_2025_07.txt")
+    assert index["units"][1]["topics"] == ["IAM", "EC2"]
+
+    full = syllabus_outline(SYLLABUS, "DevOps_bootcamp_2025_07.txt", max_chars=1000)
+    assert "- Unit 1: AWS - Cloud Computing (80 hours, 2 weeks)\n  Topics: IAM; EC2" in full
+
+    many = SYLLABUS + "### **Unit 2: Kubernetes**\n\n" + "".join(f"- Topic number {i}\n" for i in range(10))
+    capped = syllabus_outline(many, "DevOps_bootcamp_2025_07.txt", max_chars=330)
+    assert "- Unit 2: Kubernetes\n  Topics: Topic number 0; Topic number 1; Topic number 2; +7 more" in capped
+    assert len(capped) <= 330
+
+    headings_only = syllabus_outline(SYLLABUS, "DevOps_bootcamp_2025_07.txt")
+    # Every unit is kept even when nothing but the unit list fits
+    assert syllabus_outline(SYLLABUS, "DevOps_bootcamp_2025_07.txt", max_chars=10) == headings_only
+
+
+def test_breakdown_outline_docs_cover_every_unit_in_a_few_kb():
+    for pid in ("devops", "data_analytics", "marketing", "web_development"):
+        full = load_full_syllabus_docs([pid], PROGRAM_SYNONYMS)[0]
+        outline = load_syllabus_outline_docs([pid], PROGRAM_SYNONYMS, max_chars=3000)[0]
+
+        assert outline["source"] == full["source"]
+        assert outline["full_syllabus"] is True and outline["syllabus_outline"] is True
+        assert len(outline["content"]) <= 3000 < len(full["content"])
+        for section in parse_syllabus(full["content"])[1]:
+            assert f"- {section['title']}" in outline["content"]
+
+
+def test_structured_chunks_split_only_oversized_units(char_tokens):
+    long_unit = "### **Unit 2: Kubernetes (40 hours)**\n\n" + "k" * 900 + "\n"
+    chunks = chunk_syllabus(SYLLABUS + long_unit, "DevOps_bootcamp_2025_07.txt", max_tokens=400, overlap=50)
+
+    assert chunks[0]["kind"] == "outline" and chunks[0]["text"].startswith("Syllabus outline: DevOps bootcamp")
+    sections = [c for c in chunks if c["kind"] == "section"]
+    assert [c["section"] for c in sections[:3]] == [
+        "Unit 0: Prework (40 hours)", "Unit 1: AWS - Cloud Computing", "Project 1: Infrastructure (1 week)",
+    ]
+    kubernetes = [c for c in sections if c["section"] == "Unit 2: Kubernetes (40 hours)"]
+    assert len(kubernetes) == 3 and all(c["hours"] == 40 and c["tokens"] <= 400 for c in kubernetes)
+    assert all(c["text"].startswith("Unit 2: Kubernetes (40 hours) (continued)") for c in kubernetes[1:])
+    assert [c["index"] for c in chunks] == list(range(len(chunks)))
+
+    plain = chunk_syllabus("# Certifications\n\nAWS, Azure\n", "Certifications_2025_07.txt")
+    assert [c["kind"] for c in plain] == ["overview"]
+
+
+def test_convert_and_preview(tmp_path, char_tokens):
+    md_dir, txt_dir = tmp_path / "database", tmp_path / "database_txt"
+    md_dir.mkdir()
+    txt_dir.mkdir()
+    (md_dir / "DevOps_bootcamp_2025_07.md").write_text("# DevOps\n\n\n- Docker  \n", encoding="utf-8")
+    (md_dir / "Discontinued_Programs_2026_08.md").write_text("# Gone\n", encoding="utf-8")
+    (txt_dir / "Old_bootcamp_2024_01.txt").write_text("old", encoding="utf-8")
+
+    report = convert(md_dir, txt_dir, local_only=["discontinued_programs"])
+    assert report["written"] == ["DevOps_bootcamp_2025_07.txt"]
+    assert report["skipped"] == ["Discontinued_Programs_2026_08.md"]
+    assert report["orphaned"] == ["Old_bootcamp_2024_01.txt"]
+    assert (txt_dir / "DevOps_bootcamp_2025_07.txt").read_text(encoding="utf-8") == "# DevOps\n\n- Docker\n"
+    assert convert(md_dir, txt_dir, local_only=["discontinued_programs"])["written"] == []
+
+    stats = preview(txt_dir, tmp_path / "preview", max_tokens=10, overlap=2)
+    assert stats["chunking"] == {"chunker": "static", "max_chunk_size_tokens": 10, "chunk_overlap_tokens": 2}
+    assert (tmp_path / "preview" / "DevOps_bootcamp_2025_07.jsonl").exists()
+    assert (tmp_path / "preview" / "stats.json").exists()
+
+    structured = preview(txt_dir, tmp_path / "preview", chunker="structured")
+    assert structured["kinds"] == {"overview": 2}
+
+
+def test_checked_in_txt_matches_its_markdown():
+    report = convert(DEFAULT_MD_DIR, DEFAULT_TXT_DIR, KB_DOCUMENTS.get("local_only", []), write=False)
+    assert report["written"] == [], "run tools/build_kb_txt.py"
@@ -0,0 +1,87 @@
+"""
+Offline tests for the knowledge base manifest: content hashes and version id,
+change detection between starts, and universal-document recognition that
+survives re-dated filenames (driven by assistant_config/KB_DOCUMENTS.json).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.config import PROGRAM_SYNONYMS  # noqa: E402
+from src.kb_manifest import build_manifest, get_kb_manifest, record_manifest  # noqa: E402
+from src.program_matcher import get_program_matcher  # noqa: E402
+from src.utils import humanize_source_citation  # noqa: E402
+
+UNIVERSAL = {
+    "certifications": {"display_name": "Certifications guide", "roles": ["certification_info", "citation"]},
+    "discontinued_programs": {"display_name": "Discontinued programs list", "roles": []},
+}
+
+
+def _kb(tmp_path, files):
+    for rel, text in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return build_manifest(str(tmp_path), universal_documents=UNIVERSAL)
+
+
+def test_version_tracks_content_and_diff_names_the_changes(tmp_path):
+    files = {
+        "database/Certifications_2025_07.md": "AWS",
+        "database/DevOps_bootcamp_2025_07.md": "Docker",
+        "database_txt/DevOps_bootcamp_2025_07.txt": "Docker",
+    }
+    first = _kb(tmp_path, files)
+    assert _kb(tmp_path, files).version == first.version
+    assert first.sources("database") == ["Certifications_2025_07.md", "DevOps_bootcamp_2025_07.md"]
+
+    (tmp_path / "database" / "DevOps_bootcamp_2025_07.md").write_text("Docker, Kubernetes", encoding="utf-8")
+    (tmp_path / "database" / "Certifications_2025_07.md").unlink()
+    second = _kb(tmp_path, {"database/Certifications_2026_01.md": "AWS, Azure"})
+
+    assert second.version != first.version
+    assert second.diff(first) == {
+        "added": ["database/Certifications_2026_01.md"],
+        "removed": ["database/Certifications_2025_07.md"],
+        "modified": ["database/DevOps_bootcamp_2025_07.md"],
+    }
+
+
+def test_record_manifest_reports_changes_since_last_start(tmp_path):
+    saved = str(tmp_path / "manifest.json")
+    kb = tmp_path / "kb"
+    first = _kb(kb, {"database/DevOps_bootcamp_2025_07.md": "Docker"})
+    assert record_manifest(first, saved)["added"] == ["database/DevOps_bootcamp_2025_07.md"]
+    assert record_manifest(first, saved) == {"added": [], "removed": [], "modified": []}
+
+    second = _kb(kb, {"database/DevOps_bootcamp_2025_07.md": "Docker, Kubernetes"})
+    assert record_manifest(second, saved)["modified"] == ["database/DevOps_bootcamp_2025_07.md"]
+
+
+def test_universal_documents_survive_a_new_date_suffix(tmp_path):
+    manifest = _kb(tmp_path, {"database/Certifications_2026_01.md": "AWS"})
+    assert manifest.has_role("Certifications_2026_01.txt", "certification_info")
+    assert manifest.has_role("Certifications_2025_07.md", "citation")
+    assert not manifest.has_role("Discontinued_Programs_2026_08.md", "citation")
+    assert not manifest.has_role("DevOps_bootcamp_2025_07.md", "citation")
+    assert manifest.display_name("Discontinued_Programs_2026_08.md") == "Discontinued programs list"
+
+
+def test_production_registry_drives_matcher_and_citations():
+    manifest = get_kb_manifest()
+    assert manifest.has_role("Certifications_2025_07.md", "certification_info")
+    assert manifest.has_role("Computer_specs_min_requirements_2025_09.md", "citation")
+    assert not manifest.has_role("Computer_specs_min_requirements_2025_09.md", "certification_info")
+
+    matcher = get_program_matcher()
+    assert matcher.resolve_source("Certifications_2026_01.md") == (None, True)
+    assert matcher.resolve_source("DevOps_bootcamp_2025_07.md") == ("devops", False)
+    assert humanize_source_citation("Certifications_2026_01.md", PROGRAM_SYNONYMS) == "Certifications guide (January 2026)"
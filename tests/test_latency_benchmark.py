@@ -0,0 +1,163 @@
+"""
+Offline tests for the record/replay latency benchmark: cassette matching,
+injected latency, the simulated Slack thread store, percentile maths, and one
+replayed workflow run end to end through the fake server. No network.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+import openai  # noqa: E402
+import slack_sdk  # noqa: E402
+
+from fake_api_server import Cassette, FakeAPIServer, LatencyModel  # noqa: E402
+from latency_benchmark import percentile, run_benchmark, run_case, summarize_latencies  # noqa: E402
+
+
+def _chat_body(system, user, model="gpt-4o-mini"):
+    return {"model": model, "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}]}
+
+
+def _chat_response(content, prompt_tokens=100):
+    return {
+        "id": "chatcmpl-replay",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 10, "total_tokens": prompt_tokens + 10},
+    }
+
+
+def _server(cassette, **latency):
+    return FakeAPIServer(cassette, mode="replay", latency=LatencyModel(**latency)).start()
+
+
+def test_cassette_exact_then_similar_match():
+    cassette = Cassette()
+    cassette.record_openai("/v1/chat/completions", _chat_body("S", "Does DA teach Python?"), 200,
+                           _chat_response("python"), 900.0)
+    cassette.record_openai("/v1/chat/completions", _chat_body("S", "When is the next UX cohort?"), 200,
+                           _chat_response("cohort"), 700.0)
+
+    entry, how = cassette.find_openai("/v1/chat/completions", _chat_body("S", "Does DA teach Python?"))
+    assert how == "exact" and entry["response"]["choices"][0]["message"]["content"] == "python"
+
+    # Prompt changed after recording: nearest recording with the same shape
+    entry, how = cassette.find_openai("/v1/chat/completions", _chat_body("S", "Does DA teach Python today?"))
+    assert how == "similar" and entry["response"]["choices"][0]["message"]["content"] == "python"
+
+    assert cassette.find_openai("/v1/responses", {"model": "gpt-4o", "input": "x"}) == (None, "miss")
+
+
+def test_cassette_roundtrip(tmp_path):
+    path = tmp_path / "cassette.json"
+    cassette = Cassette(path)
+    cassette.record_openai("/v1/chat/completions", _chat_body("S", "q"), 200, _chat_response("a"), 12.0)
+    cassette.record_sheets([["Track", "Start"], ["WD", "2026-05-04"]], 300.0)
+    cassette.save()
+
+    loaded = Cassette(path)
+    assert len(loaded.openai) == 1
+    assert loaded.sheets["rows"][1] == ["WD", "2026-05-04"]
+
+
+def test_replay_server_serves_openai_with_injected_latency():
+    cassette = Cassette()
+    cassette.record_openai("/v1/chat/completions", _chat_body("S", "q"), 200, _chat_response("replayed"), 5000.0)
+    server = _server(cassette, mode="fixed", fixed_ms=60)
+    try:
+        client = openai.OpenAI(api_key="sk-replay", base_url=server.openai_base_url, max_retries=0)
+        start = time.perf_counter()
+        response = client.chat.completions.create(**_chat_body("S", "q"))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.stop()
+    assert response.choices[0].message.content == "replayed"
+    assert response.usage.prompt_tokens == 100
+    assert 0.06 <= elapsed < 2.0  # fixed delay, not the recorded 5s
+    assert server.stats["exact"] == 1
+
+
+def test_simulated_slack_thread_history():
+    server = _server(Cassette(), slack_ms=0)
+    try:
+        client = slack_sdk.WebClient(token="xoxb-test", base_url=server.slack_base_url)
+        question = client.chat_postMessage(channel="C1", text="Hi", user="U1")
+        thread_ts = question["ts"]
+        progress = client.chat_postMessage(channel="C1", text="(1/10) Analyzing", thread_ts=thread_ts)
+        client.chat_update(channel="C1", ts=progress["ts"], text="Final answer")
+        replies = client.conversations_replies(channel="C1", ts=thread_ts)["messages"]
+    finally:
+        server.stop()
+    assert [m["text"] for m in replies] == ["Hi", "Final answer"]
+    assert "user" in replies[0] and "bot_id" in replies[1]
+
+
+def test_percentiles_and_summary():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([], 95) == 0.0
+
+    turns = [
+        {"elapsed_ms": 1000.0, "trace": [{"node": "unified_triage", "duration_ms": 300.0}]},
+        {"elapsed_ms": 3000.0, "trace": [{"node": "unified_triage", "duration_ms": 500.0}]},
+    ]
+    summary = summarize_latencies(turns, wall_seconds=2.0)
+    assert summary["throughput_qps"] == 1.0
+    assert summary["end_to_end"]["p95_ms"] == 3000.0
+    assert summary["nodes"]["unified_triage"]["p50_ms"] == 300.0
+
+
+def test_replayed_workflow_run(monkeypatch):
+    """Discontinued-program fixture replayed through the fake server, 2 rounds x 2 concurrent."""
+    import src.config as config
+    import src.slack_helpers as slack_helpers
+    import src.utils as utils
+
+    triage = {
+        "enhanced_query": "Do you offer the 1 year program?",
+        "query_intent": "general_info",
+        "ambiguity_score": 0.1,
+        "detected_programs": [],
+        "is_cohort_calendar_question": False,
+        "cohort_filters": {"track": None, "type": None, "month": None, "year": None, "future_only": False},
+        "is_coverage_question": False,
+        "coverage_topic": None,
+    }
+    cassette = Cassette()
+    cassette.record_openai("/v1/chat/completions", _chat_body("triage", "q"), 200,
+                           _chat_response(json.dumps(triage), 800), 40.0)
+    server = _server(cassette, mode="recorded", slack_ms=1)
+    try:
+        slack = slack_sdk.WebClient(token="xoxb-test", base_url=server.slack_base_url)
+        monkeypatch.setattr(utils, "openai_client",
+                            openai.OpenAI(api_key="sk-replay", base_url=server.openai_base_url, max_retries=0))
+        monkeypatch.setattr(config, "slack_web_client", slack)
+        monkeypatch.setattr(slack_helpers, "slack_web_client", slack)
+
+        result = run_benchmark(
+            [{"id": "discontinued", "query": "Do you offer the 1 year program?"}],
+            concurrency=2, rounds=2, runner=run_case,
+        )
+    finally:
+        server.stop()
+
+    summary = result["summary"]
+    assert summary["questions"] == 2 and summary["failed"] == 0
+    assert summary["end_to_end"]["p50_ms"] >= 40.0
+    assert set(summary["nodes"]) == {"unified_triage", "discontinued_program_response"}
+    # question + answer posts per turn; a new thread's (empty) history comes from the cache
+    assert server.stats["miss"] == 0 and server.stats["slack"] >= 4
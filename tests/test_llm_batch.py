@@ -0,0 +1,126 @@
+"""
+Offline tests for batch execution of JSON LLM calls (src/llm_batch.py): request
+lines match call_openai_json, results are mapped back by custom_id, failures
+come back as {}, and a batch that never finishes is cancelled. Fake clients
+stand in for the OpenAI Files/Batches and Chat Completions APIs.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.llm_batch import BATCH_ENDPOINT, JsonBatch, LocalBatchBackend, OpenAIBatchBackend  # noqa: E402
+from src.utils import json_chat_request  # noqa: E402
+
+
+def _completion(content):
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+class FakeChatClient:
+    """chat.completions.create echoing the user prompt back as JSON; 'boom' raises."""
+
+    def __init__(self):
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **body):
+        self.calls.append(body)
+        prompt = body["messages"][1]["content"]
+        if prompt == "boom":
+            raise RuntimeError("500 server error")
+        if prompt == "garbage":
+            return _completion("not json")
+        return _completion(json.dumps({"echo": prompt}))
+
+
+class FakeBatchClient:
+    """files/batches endpoints; the batch completes after `polls_until_done` retrievals."""
+
+    def __init__(self, polls_until_done=2):
+        self.polls_until_done = polls_until_done
+        self.uploaded = None
+        self.cancelled = []
+        self.retrievals = 0
+        self.files = SimpleNamespace(create=self._file_create, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._batch_create, retrieve=self._retrieve, cancel=self.cancelled.append)
+
+    def _file_create(self, file, purpose):
+        assert purpose == "batch"
+        self.uploaded = file[1].decode("utf-8")
+        return SimpleNamespace(id="file-in")
+
+    def _batch_create(self, input_file_id, endpoint, completion_window):
+        assert (input_file_id, endpoint) == ("file-in", BATCH_ENDPOINT)
+        return SimpleNamespace(id="batch-1")
+
+    def _retrieve(self, batch_id):
+        self.retrievals += 1
+        if self.retrievals < self.polls_until_done:
+            return SimpleNamespace(status="in_progress", output_file_id=None, error_file_id=None)
+        return SimpleNamespace(status="completed", output_file_id="file-out", error_file_id="file-err")
+
+    def _file_content(self, file_id):
+        lines = []
+        for line in self.uploaded.splitlines():
+            request = json.loads(line)
+            custom_id = request["custom_id"]
+            if file_id == "file-out" and custom_id != "b":
+                body = _completion(json.dumps({"id": custom_id}))
+                lines.append({"custom_id": custom_id, "response": {"status_code": 200, "body": body}, "error": None})
+            if file_id == "file-err" and custom_id == "b":
+                lines.append({"custom_id": custom_id, "response": {"status_code": 429, "body": {}}, "error": None})
+        return SimpleNamespace(text="\n".join(json.dumps(line) for line in lines))
+
+
+def _batch(*prompts):
+    batch = JsonBatch()
+    for idx, prompt in enumerate(prompts):
+        batch.add(chr(ord("a") + idx), "system", prompt, model="gpt-4o")
+    return batch
+
+
+def test_jsonl_lines_match_call_openai_json_requests():
+    schema = {"type": "object", "properties": {}, "required": [], "additionalProperties": False}
+    batch = JsonBatch()
+    batch.add("x", "sys", "user", model="gpt-4o", schema=schema, schema_name="verdict")
+    (line,) = [json.loads(raw) for raw in batch.to_jsonl().splitlines()]
+    assert line == {
+        "custom_id": "x", "method": "POST", "url": BATCH_ENDPOINT,
+        "body": json_chat_request("sys", "user", model="gpt-4o", schema=schema, schema_name="verdict"),
+    }
+
+
+def test_local_backend_maps_results_back_and_failures_to_empty():
+    client = FakeChatClient()
+    results = _batch("one", "boom", "garbage", "four").run(LocalBatchBackend(client=client, workers=2))
+    assert results == {"a": {"echo": "one"}, "b": {}, "c": {}, "d": {"echo": "four"}}
+    assert len(client.calls) == 4
+
+
+def test_openai_backend_submits_polls_and_reads_output_and_errors():
+    client = FakeBatchClient(polls_until_done=3)
+    sleeps = []
+    results = _batch("one", "two", "three").run(OpenAIBatchBackend(client=client), poll_interval=5, sleep=sleeps.append)
+    assert results == {"a": {"id": "a"}, "b": {}, "c": {"id": "c"}}
+    assert sleeps == [5, 5]
+    assert len(client.uploaded.splitlines()) == 3
+
+
+def test_unfinished_batch_is_cancelled_after_timeout():
+    client = FakeBatchClient(polls_until_done=10**6)
+    results = _batch("one").run(OpenAIBatchBackend(client=client), timeout=0, sleep=lambda s: None)
+    assert results == {"a": {}}
+    assert client.cancelled == ["batch-1"]
+
+
+def test_empty_batch_submits_nothing():
+    assert JsonBatch().run(OpenAIBatchBackend(client=SimpleNamespace())) == {}
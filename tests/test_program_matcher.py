@@ -0,0 +1,197 @@
+"""
+Offline tests for the precompiled program matcher and the memoized source
+resolver used by document filtering. The matcher must answer exactly like the
+per-call alias/filename loops it replaced (kept in
+tools/program_matcher_benchmark.py as the reference).
+"""
+
+import os
+import re
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from program_matcher_benchmark import (  # noqa: E402
+    legacy_best_program,
+    legacy_discontinued,
+    legacy_program_for_source,
+    run,
+)
+from src.config import PROGRAM_SYNONYMS  # noqa: E402
+from src.nodes.triage_nodes import _detect_discontinued_program  # noqa: E402
+from src.program_matcher import ProgramMatcher, get_program_matcher  # noqa: E402
+from src.triage_rules import match_programs  # noqa: E402
+
+QUERIES = [
+    "Do you offer the 1 year program?",
+    "Is the DF still running in Germany?",
+    "Does the AI Web Development bootcamp teach React?",
+    "Compare UX/UI and data analytics",
+    "Does DE cover Airflow?",
+    "ai ux/ui design vs ai-driven ux/ui",
+    "What does the cybersecurity bootcamp cover?",
+    "Is the one-year germany program available?",
+    "dsai 1 year program hours",
+    "devops_bootcamp_2025_07 content",
+    "Does the course cover data engineering pipelines and dev tools?",
+    "security of the pm bootcamp",
+    "nothing relevant here",
+    "",
+]
+
+SOURCES = [
+    "Cloud_Engineering_bootcamp_2025_12.md",
+    "Cloud_Engineering_bootcamp_2026_04.md",
+    "knowledge_base/database/DevOps_bootcamp_2025_07.txt",
+    "Data_Science_&_Machine_Learning_bootcamp_2026_02.md",
+    "Data_Analytics_Remote_bootcamp_2025_07.md",
+    "Certifications_2025_07.md",
+    "unknown.md",
+    "",
+]
+
+
+def _legacy_triage_pattern():
+    aliases = {}
+    for pid, info in PROGRAM_SYNONYMS.items():
+        if info.get("discontinued"):
+            continue
+        for alias in info.get("aliases", []):
+            aliases.setdefault(alias.lower().strip(), pid)
+    alternation = "|".join(re.escape(a) for a in sorted(aliases, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE), aliases
+
+
+def test_matches_legacy_loops():
+    matcher = get_program_matcher()
+    for query in QUERIES:
+        assert (matcher.first_program(query, "discontinued") or "") == legacy_discontinued(query, PROGRAM_SYNONYMS), query
+        assert matcher.best_program(query) == legacy_best_program(query, PROGRAM_SYNONYMS), query
+    for source in SOURCES:
+        assert matcher.program_for_source(source) == legacy_program_for_source(source, PROGRAM_SYNONYMS), source
+
+
+def test_bounded_aliases_match_legacy_triage_regex():
+    pattern, aliases = _legacy_triage_pattern()
+    matcher = get_program_matcher()
+    for query in QUERIES:
+        expected = [(aliases[m.group(0).lower()], m.group(0).lower(), m.span()) for m in pattern.finditer(query)]
+        assert matcher.match_aliases(query, "active") == expected, query
+
+
+def test_overlapping_mentions_and_longest_pick():
+    matcher = get_program_matcher()
+    hits = matcher.mentions("ai web development")
+    assert ("ai_engineering", "ai", 0) not in hits  # longest alias at a position wins
+    assert ("web_development", "ai web development", 0) in hits
+    assert ("web_development", "web development", 3) in hits
+    assert matcher.best_program("ai web development") == "web_development"
+    # Short codes only count as stand-alone words
+    assert matcher.best_program("we need a decent laptop") is None
+    assert matcher.best_program("Does DE cover Airflow?") == "data_engineering"
+
+
+def test_discontinued_detection_through_triage_helper():
+    assert _detect_discontinued_program("Do you offer the 1 year program?", []) == "data_science_ai_1_year"
+    assert _detect_discontinued_program("Is the Data Analytics bootcamp 1 year long?", ["data_analytics"]) == ""
+    assert _detect_discontinued_program("How long is web dev?", []) == ""
+
+
+def test_discontinued_precedence_follows_program_order():
+    # The later-listed program is mentioned first: program order still decides, as before
+    synonyms = {
+        "old_a": {"aliases": ["night school"], "discontinued": True},
+        "old_b": {"aliases": ["ob", "weekend course"], "discontinued": True},
+        "live": {"aliases": ["live course"]},
+    }
+    matcher = ProgramMatcher(synonyms, universal_documents=[])
+    for query in ("Is the OB or the night school still running?", "weekend course vs night school", "OB only"):
+        assert (matcher.first_program(query, "discontinued") or "") == legacy_discontinued(query, synonyms), query
+    assert matcher.first_program("weekend course vs night school", "discontinued") == "old_a"
+    assert matcher.first_program("the live course", "discontinued") is None
+    assert matcher.first_program("the live course", "active") == "live"
+
+
+def test_short_symbol_aliases_keep_their_legacy_boundaries():
+    # Negative coverage matched short non-alphanumeric aliases as substrings, the
+    # discontinued check required them to stand alone
+    synonyms = {"lang": {"aliases": ["c#"], "discontinued": True}}
+    matcher = ProgramMatcher(synonyms, universal_documents=[])
+    for query in ("learn c# basics", "abc#x"):
+        assert matcher.best_program(query) == legacy_best_program(query, synonyms), query
+        assert (matcher.first_program(query, "discontinued") or "") == legacy_discontinued(query, synonyms), query
+    assert matcher.best_program("abc#x") == "lang"
+    assert matcher.first_program("abc#x", "discontinued") is None
+
+
+def test_sources_map_version_tolerant():
+    matcher = get_program_matcher()
+    assert matcher.programs_for_source("Cloud_Engineering_bootcamp_2026_04.md") == ["cloud_engineering"]
+    assert matcher.programs_for_source("Certifications_2025_07.md") == []
+
+
+def test_triage_short_codes_need_capitals():
+    assert [pid for pid, _, _ in match_programs("Does DE cover Airflow?")] == ["data_engineering"]
+    assert match_programs("is it de facto required at 5 pm?") == []
+
+
+def test_matcher_is_shared_per_mapping():
+    assert get_program_matcher() is get_program_matcher(PROGRAM_SYNONYMS)
+    custom = {"x": {"aliases": ["xx"], "filenames": ["X_bootcamp_2025_07"]}}
+    matcher = get_program_matcher(custom)
+    assert matcher is get_program_matcher(custom) and matcher is not get_program_matcher()
+    assert ProgramMatcher({}).best_program("anything") is None
+
+
+def test_benchmark_reports_no_mismatches():
+    report = run(QUERIES, SOURCES, repeat=1, program_synonyms=PROGRAM_SYNONYMS)
+    assert all(not section.get("mismatches") for section in report.values())
+    assert report["program_for_source"]["compiled_us"] > 0
+
+
+def test_resolve_source_is_precomputed_for_kb_files():
+    matcher = get_program_matcher()
+    assert "DevOps_bootcamp_2025_07.md" in matcher._resolved
+    assert matcher.resolve_source("DevOps_bootcamp_2025_07.md") == ("devops", False)
+    assert matcher.resolve_source("Certifications_2025_07.md") == (None, True)
+    assert matcher.resolve_source("") == (None, False)
+
+
+def _doc(source, n):
+    return {"source": source, "content": f"chunk {n}", "score": 1.0 - n / 100}
+
+
+def test_document_filtering_keeps_program_and_universal_docs():
+    import src.nodes.assessment_nodes as assessment_nodes
+
+    docs = [
+        _doc("DevOps_bootcamp_2025_07.md", 1),
+        _doc("Cybersecurity_bootcamp_2025_07.md", 2),
+        _doc("Certifications_2025_07.md", 3),
+        _doc("DevOps_bootcamp_2026_03.md", 4),  # re-uploaded version
+    ]
+    state = assessment_nodes.document_filtering_node(
+        {"retrieved_docs": docs, "detected_programs": ["devops"], "query_intent": "general_info"}
+    )
+    assert [d["content"] for d in state["filtered_docs"]] == ["chunk 1", "chunk 3", "chunk 4"]
+
+
+def test_comparison_backfill_picks_top_doc_per_missing_program(monkeypatch):
+    import src.nodes.assessment_nodes as assessment_nodes
+
+    docs = [_doc("DevOps_bootcamp_2025_07.md", i) for i in range(4)]
+    docs += [_doc("Cloud_Engineering_bootcamp_2025_12.md", i) for i in range(4, 7)]
+    # The filter LLM keeps DevOps chunks only
+    monkeypatch.setattr(assessment_nodes, "call_openai_json", lambda *a, **k: {"kept_chunk_ids": [1, 2]})
+    state = assessment_nodes.document_filtering_node({
+        "retrieved_docs": docs,
+        "detected_programs": ["devops", "cloud_engineering"],
+        "query_intent": "comparison",
+    })
+    assert [d["content"] for d in state["filtered_docs"]] == ["chunk 0", "chunk 1", "chunk 4"]
@@ -0,0 +1,88 @@
+"""
+Offline tests for early-exit refinement: deterministic failure modes pick their
+strategy without the strategy LLM call, the request time budget stops the loop,
+and ambiguous failures still go to the LLM.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest  # noqa: E402
+
+import src.nodes.fallback_nodes as fallback_nodes  # noqa: E402
+from src.nodes.fallback_nodes import iterative_refinement_node  # noqa: E402
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    def fake_call_openai_json(system_prompt, user_prompt, **kwargs):
+        calls.append(user_prompt)
+        return {"selected_strategy": "ENHANCE_QUERY_KEYWORDS", "parameters": {"top_k": 10}}
+
+    monkeypatch.setattr(fallback_nodes, "call_openai_json", fake_call_openai_json)
+    monkeypatch.setattr(fallback_nodes, "REQUEST_TIME_BUDGET_SECONDS", 90.0)
+    return calls
+
+
+def _state(elapsed_ms=10000.0, **overrides):
+    state = {
+        "query": "What does DevOps cover?",
+        "query_intent": "general_info",
+        "iteration_count": 0,
+        "filtered_docs": [{"source": "DevOps_bootcamp_2025_07.md", "chunk_id": "a"}],
+        "relevance_scores": [0.5],
+        "faithfulness_score": 0.4,
+        "metadata": {"trace": [{"node": "generate_response", "duration_ms": elapsed_ms}]},
+    }
+    state.update(overrides)
+    return state
+
+
+def test_zero_docs_expands_then_falls_back_without_llm(llm_calls):
+    first = iterative_refinement_node(_state(filtered_docs=[], relevance_scores=[]))
+    assert first["refinement_strategy"] == "EXPAND_CHUNKS"
+    assert first["metadata"]["refinement_rule"] == "no_docs"
+    assert first["iteration_count"] == 1
+
+    second = iterative_refinement_node({**first, "filtered_docs": []})
+    assert second["refinement_strategy"] == "FUN_FALLBACK"
+    assert second["metadata"]["refinement_rule"] == "no_docs_after_expansion"
+    assert llm_calls == []
+
+
+def test_critical_violations_on_last_round_fall_back(llm_calls):
+    result = iterative_refinement_node(_state(iteration_count=1, has_critical_violations=True))
+    assert result["refinement_strategy"] == "FUN_FALLBACK"
+    assert result["metadata"]["refinement_rule"] == "critical_on_last_round"
+    assert llm_calls == []
+
+
+def test_max_iterations_fall_back(llm_calls):
+    result = iterative_refinement_node(_state(iteration_count=2))
+    assert result["refinement_strategy"] == "FUN_FALLBACK"
+    assert result["metadata"]["refinement_rule"] == "max_iterations"
+
+
+def test_time_budget_stops_refinement(llm_calls):
+    # 50s spent on the first pass: another ~50s round would overrun the 90s budget
+    result = iterative_refinement_node(_state(elapsed_ms=50000.0))
+    assert result["refinement_strategy"] == "FUN_FALLBACK"
+    assert result["metadata"]["refinement_rule"] == "time_budget"
+    assert llm_calls == []
+
+
+def test_ambiguous_failures_still_ask_the_llm(llm_calls):
+    result = iterative_refinement_node(_state(has_critical_violations=True))
+    assert result["refinement_strategy"] == "ENHANCE_QUERY_KEYWORDS"
+    assert result["metadata"]["refinement_rule"] == "llm"
+    assert result["metadata"]["refinement_params"] == {"top_k": 10}
+    assert len(llm_calls) == 1 and '"num_docs_retrieved": 1' in llm_calls[0]
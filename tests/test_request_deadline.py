@@ -0,0 +1,79 @@
+"""
+Offline tests for end-to-end request deadlines: the state's request_deadline
+caps every LLM/retrieval timeout while a node runs, calls are skipped once it
+has passed, and routes take the cheapest finishing path near it.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import src.nodes.retrieval_nodes as retrieval_nodes  # noqa: E402
+import src.utils as utils  # noqa: E402
+from src.deadline import MIN_CALL_SECONDS, deadline_scope, remaining_timeout  # noqa: E402
+from src.instrumentation import instrument_node, propagate_context  # noqa: E402
+from src.routes import route_after_document_filtering, route_after_faithfulness_verification  # noqa: E402
+
+
+class ExplodingClient:
+    """Any attribute access means an API call was attempted."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"unexpected API call ({name})")
+
+
+def test_timeouts_are_capped_by_the_current_deadline():
+    assert remaining_timeout(30) == 30
+    with deadline_scope(time.time() + 12):
+        assert 11 < remaining_timeout(30) <= 12
+        assert remaining_timeout(5) == 5
+    with deadline_scope(time.time() + MIN_CALL_SECONDS / 2):
+        assert remaining_timeout(30) is None
+
+
+def test_nodes_and_their_worker_threads_see_the_state_deadline():
+    def node(state):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            worker_timeout = executor.submit(propagate_context(lambda: remaining_timeout(60))).result()
+        return {**state, "node_timeout": remaining_timeout(60), "worker_timeout": worker_timeout}
+
+    result = instrument_node("probe", node)({"request_deadline": time.time() + 20})
+    assert 19 < result["node_timeout"] <= 20 and 19 < result["worker_timeout"] <= 20
+    assert instrument_node("probe", node)({})["node_timeout"] == 60
+
+
+def test_llm_and_retrieval_calls_skipped_past_the_deadline(monkeypatch):
+    monkeypatch.setattr(utils, "openai_client", ExplodingClient())
+    monkeypatch.setattr(retrieval_nodes, "openai_client", ExplodingClient())
+    monkeypatch.setattr(retrieval_nodes, "VECTOR_STORE_ID", "vs_test")
+    with deadline_scope(time.time() - 1):
+        assert utils.call_openai_json("system", "user") == {}
+        assert utils.call_openai_text("system", "user") == ""
+    state = {"query": "What does DevOps cover?", "request_deadline": time.time() - 1}
+    result = instrument_node("hybrid_retrieval", retrieval_nodes.hybrid_retrieval_node)(state)
+    assert result["retrieved_docs"] == []
+    assert result["retrieval_stats"] == {"error": "Request deadline reached"}
+
+
+def test_routes_take_the_cheapest_finishing_path_near_the_deadline():
+    refetch = {"metadata": {"needs_refetch": True}}
+    assert route_after_document_filtering({**refetch, "request_deadline": time.time() + 100}) == "hybrid_retrieval"
+    assert route_after_document_filtering({**refetch, "request_deadline": time.time() + 5}) == "coverage_classification"
+
+    weak = {"query_intent": "general_info", "faithfulness_score": 0.3, "iteration_count": 0,
+            "generated_response": "DevOps covers Linux."}
+    assert route_after_faithfulness_verification({**weak, "request_deadline": time.time() + 100}) == "iterative_refinement"
+    assert route_after_faithfulness_verification({**weak, "request_deadline": time.time() + 5}) == "generate_fun_fallback"
+    critical = {**weak, "has_critical_violations": True, "request_deadline": time.time() + 5}
+    assert route_after_faithfulness_verification(critical) == "generate_fun_fallback"
+    # Passing answers still finalize, deadline or not
+    good = {**weak, "faithfulness_score": 0.9, "request_deadline": time.time() + 5}
+    assert route_after_faithfulness_verification(good) == "finalize_response"
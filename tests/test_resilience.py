@@ -0,0 +1,179 @@
+"""
+Offline tests for OpenAI resilience: the circuit breaker opens on a window of
+failed/slow calls, fails fast while open, probes once and recovers; the AIMD
+limiter adapts concurrency; LLM helpers and triage take their deterministic
+paths while a circuit is open, and portfolio-wide questions are answered
+from the local term index.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest  # noqa: E402
+
+import src.nodes.generation_nodes as generation_nodes  # noqa: E402
+import src.nodes.triage_nodes as triage_nodes  # noqa: E402
+import src.utils as utils  # noqa: E402
+from src.config import MODEL_FAST, MODEL_QUALITY  # noqa: E402
+from src.doc_store import release_doc_store  # noqa: E402
+from src.nodes.verification_nodes import faithfulness_verification_node  # noqa: E402
+from src.routes import route_after_faithfulness_verification  # noqa: E402
+from src.resilience import (  # noqa: E402
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AIMDLimiter,
+    CircuitBreaker,
+    breaker_for,
+    reset_breakers,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ExplodingClient:
+    """Any attribute access means an API call was attempted."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"unexpected API call ({name})")
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+def _trip(breaker):
+    while breaker.state == CLOSED:
+        assert breaker.allow()
+        breaker.record(False, 0.1)
+
+
+def test_breaker_opens_fails_fast_then_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", window=10, min_calls=4, failure_ratio=0.5, open_seconds=30, clock=clock)
+    breaker.record(True, 0.1)
+    breaker.record(True, 0.1)
+    breaker.record(False, 0.1)
+    assert breaker.state == CLOSED
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    # One probe at a time
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_slow_calls_count_against_the_window():
+    breaker = CircuitBreaker("slow", min_calls=3, slow_call_seconds=5, clock=FakeClock())
+    for _ in range(3):
+        breaker.record(True, 8.0)
+    assert breaker.state == OPEN
+
+
+def test_aimd_limiter_backs_off_and_recovers():
+    limiter = AIMDLimiter("test", initial=4, min_limit=1, max_limit=6, slow_seconds=10)
+    limiter.acquire()
+    limiter.release(False, 1.0)
+    assert limiter.limit == 2
+    limiter.acquire()
+    limiter.release(True, 20.0)  # slow counts as congestion
+    assert limiter.limit == 1
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(True, 1.0)
+    assert limiter.limit == 6
+
+
+def test_llm_helpers_fail_fast_when_circuit_open(monkeypatch):
+    _trip(breaker_for("chat.completions", MODEL_FAST))
+    monkeypatch.setattr(utils, "openai_client", ExplodingClient())
+    assert utils.call_openai_json("sys", "user") == {}
+    assert utils.call_openai_text("sys", "user") == ""
+
+
+def test_client_errors_do_not_trip_the_breaker(monkeypatch):
+    class BadRequestClient:
+        class chat:
+            class completions:
+                @staticmethod
+                def create(**kwargs):
+                    raise ValueError("400 invalid schema")
+
+    monkeypatch.setattr(utils, "openai_client", BadRequestClient())
+    for _ in range(10):
+        assert utils.call_openai_json("sys", "user") == {}
+    assert breaker_for("chat.completions", MODEL_FAST).state == CLOSED
+
+
+def test_triage_uses_rules_while_circuit_open(monkeypatch):
+    _trip(breaker_for("chat.completions", MODEL_FAST))
+    monkeypatch.setattr(utils, "openai_client", ExplodingClient())
+    monkeypatch.setattr(triage_nodes, "TRIAGE_RULES_MIN_CONFIDENCE", 1.1)
+    state = {"query": "How long is the Data Analytics bootcamp?", "conversation_history": []}
+    result = triage_nodes.unified_triage_node(state)
+    assert result["triage_used"] is True
+    assert result["metadata"]["triage_path"] == "rules_degraded"
+    assert result["detected_programs"] == ["data_analytics"]
+    assert result["query_intent"] == "duration"
+
+
+def test_portfolio_question_answered_from_local_index_while_circuit_open(monkeypatch):
+    _trip(breaker_for("chat.completions", MODEL_QUALITY))
+    monkeypatch.setattr(utils, "openai_client", ExplodingClient())
+    state = {
+        "query": "which course have linux in?",
+        "enhanced_query": "which course have linux in?",
+        "is_portfolio_wide": True,
+        "filtered_docs": [],  # vector search failed fast too
+    }
+    result = generation_nodes.generate_response_node(state)
+    release_doc_store(result.get("doc_store_id"))
+    assert result["local_index_answer"] is True
+    for program in ("DevOps & Cloud Computing", "Cybersecurity", "Cloud Engineering"):
+        assert program in result["generated_response"]
+    assert result["source_citations"]
+
+    verified = faithfulness_verification_node(result)
+    assert verified["faithfulness_score"] == 1.0 and verified["is_grounded"]
+    assert route_after_faithfulness_verification(verified) == "finalize_response"
+
+
+def test_portfolio_question_uses_llm_while_circuit_closed(monkeypatch):
+    monkeypatch.setattr(
+        generation_nodes, "call_openai_text", lambda *a, **k: "Linux appears in DevOps, Cybersecurity and Cloud Engineering."
+    )
+    result = generation_nodes.generate_response_node({
+        "query": "which course have linux in?",
+        "is_portfolio_wide": True,
+        "local_index_answer": True,  # left over from an earlier turn
+    })
+    release_doc_store(result.get("doc_store_id"))
+    assert result["local_index_answer"] is False
+    assert result["generated_response"].startswith("Linux appears")
@@ -0,0 +1,107 @@
+"""
+Offline tests for single-flight coalescing of identical in-flight questions:
+one pipeline run per key, every waiter gets its result (or its error), and the
+coalesced count reaches /metrics. No OpenAI calls.
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+import src.single_flight as single_flight  # noqa: E402
+import src.slack_integration as slack_integration  # noqa: E402
+from src.instrumentation import METRICS  # noqa: E402
+from src.single_flight import SingleFlight, question_key  # noqa: E402
+
+
+def _concurrently(n, fn):
+    results, errors = [None] * n, [None] * n
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = fn(i)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_question_key_normalizes_query_and_includes_history():
+    assert question_key("<@U123> What's the DevOps price?") == question_key("whats the  devops PRICE")
+    history = [HumanMessage(content="Tell me about DevOps"), AIMessage(content="It is 9 weeks.")]
+    assert question_key("and the price?", history) != question_key("and the price?")
+    assert question_key("and the price?", history) == question_key("And the price", list(history))
+
+
+def test_identical_concurrent_calls_share_one_run():
+    flight = SingleFlight()
+    runs = []
+
+    def fn():
+        runs.append(1)
+        time.sleep(0.2)
+        return {"final_response": "answer"}
+
+    results, errors = _concurrently(4, lambda i: flight.do("k", fn))
+    assert errors == [None] * 4 and len(runs) == 1
+    assert [r[0]["final_response"] for r in results] == ["answer"] * 4
+    assert sorted(r[1] for r in results) == [False, True, True, True]
+    assert flight.stats == {"executions": 1, "coalesced": 3}
+    assert flight.in_flight() == 0
+    # Finished runs are not cached
+    assert flight.do("k", lambda: "again") == ("again", False)
+
+
+def test_waiters_receive_the_leaders_error():
+    flight = SingleFlight()
+
+    def fn():
+        time.sleep(0.2)
+        raise RuntimeError("openai down")
+
+    _, errors = _concurrently(3, lambda i: flight.do("k", fn))
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert flight.stats["executions"] == 1
+
+
+def test_handlers_coalesce_identical_mentions(monkeypatch):
+    invocations = []
+
+    class FakeWorkflow:
+        def invoke(self, state, config):
+            invocations.append(config["configurable"]["thread_id"])
+            time.sleep(0.2)
+            return {"final_response": f"answer to {state['query']}", "metadata": {"trace": []}}
+
+    METRICS.reset()
+    monkeypatch.setattr(slack_integration, "rag_workflow", FakeWorkflow())
+    monkeypatch.setattr(single_flight, "INFLIGHT_QUESTIONS", SingleFlight())
+    monkeypatch.setattr(slack_integration, "INFLIGHT_QUESTIONS", single_flight.INFLIGHT_QUESTIONS)
+
+    def ask(i):
+        query = "What is the price of DevOps?" if i < 3 else "Who teaches DevOps?"
+        state = {"query": query, "conversation_history": []}
+        return slack_integration._run_workflow(state, {"configurable": {"thread_id": f"t{i}"}})
+
+    results, errors = _concurrently(4, ask)
+    assert errors == [None] * 4
+    assert len(invocations) == 2
+    assert [r["final_response"] for r in results[:3]] == ["answer to What is the price of DevOps?"] * 3
+    assert "product_wizard_coalesced_requests_total 2" in METRICS.render()
@@ -0,0 +1,133 @@
+"""
+Offline tests for the Slack thread history cache: threads are read from Slack
+once and kept current from events and our own replies; gaps, the TTL and 429s
+behave as documented. Uses a fake Slack client, no network.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from slack_sdk.errors import SlackApiError  # noqa: E402
+from slack_sdk.web.slack_response import SlackResponse  # noqa: E402
+
+import src.slack_helpers as slack_helpers  # noqa: E402
+from src.slack_helpers import (  # noqa: E402
+    ThreadHistoryCache,
+    get_conversation_history,
+    observe_message_event,
+    record_bot_reply,
+    record_thread_message,
+)
+
+
+class FakeSlack:
+    def __init__(self, threads):
+        self.threads = threads
+        self.calls = 0
+        self.rate_limited = False
+
+    def conversations_replies(self, channel, ts, limit):
+        self.calls += 1
+        if self.rate_limited:
+            raise SlackApiError("ratelimited", SlackResponse(
+                client=None, http_verb="POST", api_url="", req_args={},
+                data={"ok": False, "error": "ratelimited"}, headers={"Retry-After": "7"}, status_code=429,
+            ))
+        return {"ok": True, "messages": list(self.threads.get((channel, ts), [])), "has_more": False}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def slack(monkeypatch):
+    clock = Clock()
+    fake = FakeSlack({
+        ("C1", "100.0"): [
+            {"ts": "100.0", "text": "<@UBOT> what is in the DevOps bootcamp?", "user": "U1"},
+            {"ts": "101.0", "text": "Linux, Docker, Kubernetes.", "bot_id": "B1"},
+        ],
+    })
+    monkeypatch.setattr(slack_helpers, "slack_web_client", fake)
+    monkeypatch.setattr(slack_helpers, "THREAD_HISTORY", ThreadHistoryCache(max_threads=10, ttl_seconds=600, clock=clock))
+    monkeypatch.setattr(slack_helpers, "_history_backoff_until", 0.0)
+    fake.clock = clock
+    return fake
+
+
+def test_thread_read_once_then_served_from_cache(slack):
+    slack_helpers.THREAD_HISTORY.observe_channel("C1")
+    first = get_conversation_history("C1", "100.0")
+    assert [type(m) for m in first] == [HumanMessage, AIMessage]
+    assert first[0].content == "what is in the DevOps bootcamp?"
+
+    record_thread_message("C1", "100.0", {"ts": "102.0", "text": "and how long is it?", "user": "U1"})
+    second = get_conversation_history("C1", "100.0", latest_ts="102.0")
+    assert [m.content for m in second] == [m.content for m in first]
+    record_bot_reply("C1", "100.0", "103.0", "It runs 9 weeks.")
+    third = get_conversation_history("C1", "100.0")
+    assert third[-1] == AIMessage(content="It runs 9 weeks.")
+    assert slack.calls == 1
+
+
+def test_new_thread_root_needs_no_fetch(slack):
+    record_thread_message("D1", "200.0", {"ts": "200.0", "text": "hi", "user": "U2"})
+    assert get_conversation_history("D1", "200.0", latest_ts="200.0") == []
+    assert slack.calls == 0
+
+
+def test_unobserved_channel_reply_and_unknown_edit_refetch(slack):
+    get_conversation_history("C1", "100.0")
+    # Without plain message events for C1, other replies may have been missed
+    record_thread_message("C1", "100.0", {"ts": "102.0", "text": "<@UBOT> more?", "user": "U1"})
+    get_conversation_history("C1", "100.0", latest_ts="102.0")
+    assert slack.calls == 2
+
+    slack_helpers.THREAD_HISTORY.observe_channel("C1")
+    observe_message_event({"channel": "C1", "subtype": "message_changed",
+                           "message": {"ts": "101.0", "thread_ts": "100.0", "text": "Linux and Docker."}})
+    assert get_conversation_history("C1", "100.0")[1].content == "Linux and Docker."
+    assert slack.calls == 2
+    observe_message_event({"channel": "C1", "subtype": "message_deleted", "deleted_ts": "999.0",
+                           "previous_message": {"ts": "999.0", "thread_ts": "100.0"}})
+    get_conversation_history("C1", "100.0")
+    assert slack.calls == 3
+
+
+def test_ttl_expiry_refetches(slack):
+    get_conversation_history("C1", "100.0")
+    slack.clock.now += 601
+    get_conversation_history("C1", "100.0")
+    assert slack.calls == 2
+
+
+def test_rate_limit_serves_stale_copy_and_backs_off(slack):
+    get_conversation_history("C1", "100.0")
+    slack.clock.now += 601
+    slack.rate_limited = True
+    stale = get_conversation_history("C1", "100.0")
+    assert len(stale) == 2 and slack.calls == 2
+    # Within Retry-After, Slack is not asked again; unknown threads get no history
+    assert get_conversation_history("C1", "555.0") == []
+    assert slack.calls == 2
+    assert slack_helpers._history_backoff_until > 0
+
+
+def test_history_returns_last_messages_up_to_limit(slack):
+    slack.threads[("C2", "1.0")] = [{"ts": f"{i}.0", "text": f"m{i}", "user": "U1"} for i in range(1, 16)]
+    history = get_conversation_history("C2", "1.0", limit=10)
+    assert [m.content for m in history] == [f"m{i}" for i in range(6, 16)]
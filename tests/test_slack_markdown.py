@@ -0,0 +1,153 @@
+"""
+Offline tests for the Markdown -> Slack renderer: golden outputs, parity with
+the original multi-pass regex implementation (kept below as the reference)
+over the knowledge base and randomized Markdown, and the streaming renderer
+matching a full render at every prefix.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.slack_markdown import SlackMarkdownStream, convert_markdown_to_slack  # noqa: E402
+
+
+def reference_convert(text: str, same_line: bool = False) -> str:
+    """
+    The original implementation, verbatim. same_line=True keeps bold, links and
+    inline code within a line, the one intended difference of the new renderer.
+    """
+    span = (lambda cls: cls[:-1] + "\\n]") if same_line else (lambda cls: cls)
+
+    code_blocks = []
+    def protect_code(match):
+        code_blocks.append(match.group(0))
+        return f"__CODE_BLOCK_{len(code_blocks)-1}__"
+
+    inline_code = []
+    def protect_inline_code(match):
+        inline_code.append(match.group(0))
+        return f"__INLINE_CODE_{len(inline_code)-1}__"
+
+    text = re.sub(r'```[\s\S]*?```', protect_code, text)
+    text = re.sub(r'`(' + span(r'[^`]') + r'+)`', protect_inline_code, text)
+    text = re.sub(r'^##+\s+(.+)$', r'*\1*', text, flags=re.MULTILINE)
+    text = re.sub(r'\*\*(' + span(r'[^*]') + r'+)\*\*', r'*\1*', text)
+    text = re.sub(r'\[(' + span(r'[^\]]') + r'+)\]\((' + span(r'[^)]') + r'+)\)', r'<\2|\1>', text)
+    text = re.sub(r'^[\s]*[-]\s+', '• ', text, flags=re.MULTILINE)
+    text = re.sub(r'^[\s]+\*\s+', '• ', text, flags=re.MULTILINE)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    for i, code in enumerate(inline_code):
+        text = text.replace(f"__INLINE_CODE_{i}__", code)
+    for i, code in enumerate(code_blocks):
+        text = text.replace(f"__CODE_BLOCK_{i}__", code)
+    return text.strip()
+
+
+ANSWER = """## **Data Analytics Bootcamp**
+
+The program covers **SQL**, **Python** and [Tableau](https://www.tableau.com).
+
+
+- **Unit 1:** Data fundamentals
+- **Unit 2:** `pandas` and *NumPy*
+  * Cleaning
+  * Visualization
+
+### Schedule
+
+1. Prework (40 hours)
+2. Bootcamp (360 hours)
+
+```python
+df = pd.read_csv("**raw**.csv")  # - not a bullet
+```
+
+Ask an admissions advisor for dates.
+"""
+
+ANSWER_SLACK = """**Data Analytics Bootcamp**
+
+The program covers *SQL*, *Python* and <https://www.tableau.com|Tableau>.
+• *Unit 1:* Data fundamentals
+• *Unit 2:* `pandas` and *NumPy*
+• Cleaning
+• Visualization
+
+*Schedule*
+
+1. Prework (40 hours)
+2. Bootcamp (360 hours)
+
+```python
+df = pd.read_csv("**raw**.csv")  # - not a bullet
+```
+
+Ask an admissions advisor for dates."""
+
+
+def test_golden_answer():
+    # "## **Title**" has always come out as "**Title**": header and bold each add a star
+    assert convert_markdown_to_slack(ANSWER) == ANSWER_SLACK
+    assert reference_convert(ANSWER) == ANSWER_SLACK
+
+
+def test_matches_the_original_on_the_knowledge_base_and_fixtures():
+    texts = [p.read_text(encoding="utf-8") for p in sorted((ROOT / "knowledge_base" / "database").glob("*.md"))]
+    texts += [p.read_text(encoding="utf-8") for p in sorted((ROOT / "assistant_config").glob("*.md"))]
+    fixtures = json.loads((ROOT / "tests" / "fixtures" / "rag_judge_fixtures.json").read_text(encoding="utf-8"))
+    texts += [case["expected_answer"] for case in fixtures if case.get("expected_answer")]
+    assert len(texts) > 30
+    for text in texts:
+        assert convert_markdown_to_slack(text) == reference_convert(text)
+
+
+def test_matches_the_original_on_random_markdown():
+    rng = random.Random(7)
+    vocab = ["-", "*", "##", "###", " ", "  ", "\t", "x", "**b**", "**", "[t](u)", "[", "](", "`c`", "`",
+             "```", "1.", "- a", "  * b", "## H", "#"]
+    for _ in range(3000):
+        lines = ["".join(rng.choice(vocab) for _ in range(rng.randint(0, 3))) for _ in range(rng.randint(1, 8))]
+        text = "\n".join(lines)
+        assert convert_markdown_to_slack(text) == reference_convert(text, same_line=True), text
+
+
+def test_empty_markers_take_the_next_line_like_the_original():
+    # Editor residue in the KB: an empty heading / list marker ran on into the next line
+    for text in ("### \n\n## **Course Details**\nx", "Tools:\n\n- \n  Slides automation\n- Docs", "-\n-\nx"):
+        assert convert_markdown_to_slack(text) == reference_convert(text)
+    assert convert_markdown_to_slack("- \n  Slides automation") == "• Slides automation"
+
+
+def test_inline_spans_stay_on_their_line():
+    text = "Price: 10**\n**Duration:** 9 weeks"
+    assert convert_markdown_to_slack(text) == "Price: 10**\n*Duration:* 9 weeks"
+    assert reference_convert(text) == "Price: 10*\n*Duration:** 9 weeks"
+
+
+def test_repeated_conversions_are_memoized():
+    convert_markdown_to_slack.cache_clear()
+    convert_markdown_to_slack(ANSWER)
+    convert_markdown_to_slack(ANSWER)
+    assert convert_markdown_to_slack.cache_info().hits == 1
+
+
+def test_stream_matches_a_full_render_at_every_prefix():
+    text = ANSWER + "\n```\nunclosed **fence**\n- item\n"
+    stream = SlackMarkdownStream()
+    for end in range(1, len(text) + 1):
+        assert stream.update(text[:end]) == convert_markdown_to_slack(text[:end]), text[:end]
+    # Lines before the open fence were rendered once and kept
+    assert stream._consumed == text[:text.rindex("```")]
+
+    # Not a continuation of the previous text: starts over
+    assert stream.update("## New answer\n- one") == "*New answer*\n• one"
@@ -0,0 +1,130 @@
+"""
+Offline tests for the background Slack progress sender: updates never block the
+caller, rapid steps coalesce, pending steps are dropped when the answer is ready,
+and a 429 pauses the channel. Uses fake say/chat_update callables, no network.
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pytest  # noqa: E402
+from slack_sdk.errors import SlackApiError  # noqa: E402
+from slack_sdk.web.slack_response import SlackResponse  # noqa: E402
+
+import src.slack_helpers as slack_helpers  # noqa: E402
+from src.slack_helpers import (  # noqa: E402
+    ProgressSender,
+    clear_slack_say_function,
+    finish_slack_progress,
+    send_slack_update,
+    set_slack_say_function,
+)
+
+STATE = {"slack_channel": "C1", "slack_thread_ts": "100.0"}
+STEPS = ["Analyzing your question", "Detecting program focus", "Searching curriculum documents",
+         "Assessing document relevance", "Generating response", "Verifying answer accuracy"]
+
+
+class FakeSlack:
+    """say() and chat_update() that take `latency` seconds each, like the real API."""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.posts = []
+        self.updates = []
+        self.rate_limit_next = False
+        self._lock = threading.Lock()
+
+    def say(self, text, thread_ts=None, channel=None):
+        time.sleep(self.latency)
+        with self._lock:
+            self.posts.append(text)
+        return {"ok": True, "ts": "101.0"}
+
+    def chat_update(self, channel, ts, text):
+        time.sleep(self.latency)
+        with self._lock:
+            if self.rate_limit_next:
+                self.rate_limit_next = False
+                raise SlackApiError("ratelimited", SlackResponse(
+                    client=None, http_verb="POST", api_url="", req_args={},
+                    data={"ok": False, "error": "ratelimited"}, headers={"Retry-After": "0.5"}, status_code=429,
+                ))
+            self.updates.append(text)
+        return {"ok": True}
+
+    def texts(self):
+        with self._lock:
+            return self.posts + self.updates
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def slack(monkeypatch):
+    fake = FakeSlack()
+    monkeypatch.setattr(slack_helpers, "slack_web_client", fake)
+    monkeypatch.setattr(slack_helpers, "PROGRESS_SENDER", ProgressSender(min_interval=0.2))
+    set_slack_say_function(fake.say)
+    yield fake
+    clear_slack_say_function()
+
+
+def test_updates_do_not_block_and_coalesce(slack):
+    start = time.perf_counter()
+    for step in STEPS:
+        send_slack_update(STATE, step)
+    # Six steps at 50ms per Slack call would have cost 300ms inline
+    assert time.perf_counter() - start < 0.04
+
+    assert _wait_for(lambda: slack.texts() and slack.texts()[-1].startswith("(9/10)"))
+    sender = slack_helpers.PROGRESS_SENDER
+    assert len(slack.posts) == 1
+    assert len(slack.texts()) < len(STEPS)
+    assert sender.stats["coalesced"] >= 1
+    assert finish_slack_progress("C1", "100.0") == "101.0"
+
+
+def test_finish_drops_pending_steps(slack):
+    send_slack_update(STATE, STEPS[0])
+    assert _wait_for(lambda: slack.posts)
+    for step in STEPS[1:]:
+        send_slack_update(STATE, step)
+    assert finish_slack_progress("C1", "100.0") == "101.0"
+    sent = len(slack.texts())
+    time.sleep(0.4)
+    assert len(slack.texts()) == sent
+    # Nothing left to finish; a thread that never posted progress has no ts
+    assert finish_slack_progress("C1", "100.0") is None
+    assert finish_slack_progress("C1", "999.0") is None
+
+
+def test_rate_limit_pauses_the_channel(slack):
+    send_slack_update(STATE, STEPS[0])
+    assert _wait_for(lambda: slack.posts)
+    slack.rate_limit_next = True
+    send_slack_update(STATE, STEPS[1])
+    assert _wait_for(lambda: slack_helpers.PROGRESS_SENDER.stats["failed"] == 1)
+    failed_at = time.monotonic()
+    send_slack_update(STATE, STEPS[2])
+    assert _wait_for(lambda: slack.updates)
+    # The failed update is not re-posted as a new message, and Retry-After is honoured
+    assert time.monotonic() - failed_at >= 0.4
+    assert len(slack.posts) == 1 and slack.updates == ["(3/10) 📚 Searching curriculum documents..."]
+    finish_slack_progress("C1", "100.0")
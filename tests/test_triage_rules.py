@@ -0,0 +1,106 @@
+"""
+Offline tests for the rule-based triage fast path: confident answers for
+unambiguous questions, LLM fallback for everything else. No OpenAI calls.
+"""
+
+import os
+import sys
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import src.nodes.triage_nodes as triage_nodes  # noqa: E402
+from src.config import TRIAGE_RULES_MIN_CONFIDENCE  # noqa: E402
+from src.triage_rules import match_programs, rule_based_triage  # noqa: E402
+
+
+def _confident(query, **kwargs):
+    result = rule_based_triage(query, **kwargs)
+    return result if result["confidence"] >= TRIAGE_RULES_MIN_CONFIDENCE else None
+
+
+def test_duration_with_program_code():
+    result = _confident("DA duration")
+    assert result["query_intent"] == "duration"
+    assert result["detected_programs"] == ["data_analytics"]
+    assert result["enhanced_query"] == "Data Analytics duration"
+
+
+def test_next_cohort_in_may():
+    result = _confident("When is the next UX cohort in May?")
+    assert result["is_cohort_calendar_question"]
+    assert result["cohort_filters"] == {
+        "track": "UX", "type": None, "month": "may", "year": None, "future_only": True,
+    }
+
+
+def test_single_topic_coverage():
+    result = _confident("does DevOps cover Kubernetes?")
+    assert result["query_intent"] == "coverage"
+    assert result["is_coverage_question"] and result["coverage_topic"] == "Kubernetes"
+    assert result["detected_programs"] == ["devops"]
+
+
+def test_coverage_topic_drops_trailing_qualifiers():
+    assert _confident("Does DA cover python in the prework?")["coverage_topic"] == "python"
+    assert _confident("Does the web dev bootcamp teach react during week 3?")["coverage_topic"] == "react"
+    # Still more than a short noun phrase: the LLM extracts the topic
+    assert _confident("Does DevOps cover infrastructure as code pipelines?") is None
+
+
+def test_comparison_needs_two_programs():
+    assert _confident("What is the difference between DA and DSML?")["query_intent"] == "comparison"
+    assert _confident("What is the difference between the formats?") is None
+
+
+def test_unclear_questions_go_to_llm():
+    for query in (
+        "tell me about AI",                                          # ambiguous alias
+        "which courses have linux in?",                              # portfolio-wide
+        "Is IHK certification included in the web dev bootcamp?",   # two intents
+        "Does web dev cover security?",                              # topic is also an alias
+        "Do you offer the 1 year program?",                          # no rule
+    ):
+        assert _confident(query) is None, query
+
+
+def test_follow_ups_go_to_llm():
+    assert _confident("does it teach Python?", is_follow_up=True) is None
+    assert _confident("DA duration", is_follow_up=True) is None
+
+
+def test_short_codes_must_be_capitalized():
+    assert [m[0] for m in match_programs("Is DE offered in Berlin?")] == ["data_engineering"]
+    assert match_programs("curso de python") == []
+
+
+def test_node_skips_llm_when_confident(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("LLM triage must be skipped")
+
+    monkeypatch.setattr(triage_nodes, "call_openai_json", fail)
+    result = triage_nodes.unified_triage_node({"query": "How long is the Data Analytics bootcamp?", "metadata": {}})
+    assert result["metadata"]["triage_path"] == "rules"
+    assert result["query_intent"] == "duration"
+    assert result["detected_programs"] == ["data_analytics"]
+    assert result["triage_used"] is True
+
+
+def test_node_uses_llm_when_unsure(monkeypatch):
+    llm_result = {
+        "enhanced_query": "Which programs include Linux?",
+        "query_intent": "coverage",
+        "ambiguity_score": 0.2,
+        "detected_programs": [],
+        "is_cohort_calendar_question": False,
+        "cohort_filters": {"track": None, "type": None, "month": None, "year": None, "future_only": False},
+        "is_coverage_question": False,
+        "coverage_topic": None,
+    }
+    calls = []
+    monkeypatch.setattr(triage_nodes, "call_openai_json", lambda *a, **k: calls.append(a) or llm_result)
+    result = triage_nodes.unified_triage_node({"query": "which courses have linux in?"})
+    assert len(calls) == 1
+    assert result["metadata"]["triage_path"] == "llm"
@@ -0,0 +1,169 @@
+"""
+Offline tests for the incremental vector store sync (tools/sync_vector_store.py)
+against an in-memory fake of the OpenAI Files / Vector Store Files API: only
+new or changed files are uploaded, old versions are removed only after their
+replacement is indexed, and a failed upload keeps the old version serving.
+"""
+
+import itertools
+import os
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from sync_vector_store import local_files, plan_sync, sync, sync_to_new_store  # noqa: E402
+
+
+class FakeVectorStoreAPI:
+    """files.* and vector_stores.* with just enough behaviour for the sync tool."""
+
+    def __init__(self, fail_indexing=()):
+        self.fail_indexing = set(fail_indexing)
+        self.uploads = {}  # file_id -> filename
+        self.stores = {"vs_live": {}}  # store id -> {file_id: vector store file}
+        self.calls = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.files = SimpleNamespace(create=self._file_create, retrieve=self._file_retrieve, delete=self._file_delete)
+        self.vector_stores = SimpleNamespace(
+            create=self._store_create,
+            files=SimpleNamespace(
+                list=self._vs_list, create=self._vs_create, retrieve=self._vs_retrieve, delete=self._vs_delete,
+            ),
+        )
+
+    def _file_create(self, file, purpose):
+        with self._lock:
+            file_id = f"file-{next(self._ids)}"
+            self.uploads[file_id] = Path(file.name).name
+            self.calls.append(("upload", Path(file.name).name))
+        return SimpleNamespace(id=file_id)
+
+    def _file_retrieve(self, file_id):
+        return SimpleNamespace(id=file_id, filename=self.uploads[file_id])
+
+    def _file_delete(self, file_id):
+        with self._lock:
+            self.uploads.pop(file_id)
+
+    def _store_create(self, name, chunking_strategy):
+        self.stores["vs_new"] = {}
+        return SimpleNamespace(id="vs_new")
+
+    def _vs_list(self, vector_store_id, limit):
+        return list(self.stores[vector_store_id].values())
+
+    def _vs_create(self, vector_store_id, file_id, attributes, chunking_strategy):
+        assert chunking_strategy["static"] == {"max_chunk_size_tokens": 500, "chunk_overlap_tokens": 75}
+        with self._lock:
+            status = "failed" if attributes["filename"] in self.fail_indexing else "in_progress"
+            self.stores[vector_store_id][file_id] = SimpleNamespace(id=file_id, attributes=attributes, status=status)
+
+    def _vs_retrieve(self, file_id, vector_store_id):
+        vs_file = self.stores[vector_store_id][file_id]
+        if vs_file.status == "in_progress":
+            vs_file.status = "completed"
+            return SimpleNamespace(status="in_progress")
+        return vs_file
+
+    def _vs_delete(self, file_id, vector_store_id):
+        with self._lock:
+            del self.stores[vector_store_id][file_id]
+            self.calls.append(("remove", file_id))
+
+    def add_legacy(self, filename):
+        """A file uploaded by the old rebuild tool: no attributes."""
+        file_id = f"file-{next(self._ids)}"
+        self.uploads[file_id] = filename
+        self.stores["vs_live"][file_id] = SimpleNamespace(id=file_id, attributes=None, status="completed")
+        return file_id
+
+    def live(self, store="vs_live"):
+        return sorted((f.attributes or {}).get("filename") or self.uploads[f.id] for f in self.stores[store].values())
+
+
+def _write(txt_dir, files):
+    txt_dir.mkdir(parents=True, exist_ok=True)
+    for name, text in files.items():
+        (txt_dir / name).write_text(text, encoding="utf-8")
+
+
+def _sync(api, txt_dir, store="vs_live"):
+    return sync(api, store, txt_dir, workers=3, poll_interval=0, sleep=lambda s: None)
+
+
+def test_second_sync_uploads_only_what_changed(tmp_path):
+    txt_dir = tmp_path / "database_txt"
+    _write(txt_dir, {"a.txt": "A", "b.txt": "B", "c.txt": "C"})
+    api = FakeVectorStoreAPI()
+    legacy_a = api.add_legacy("a.txt")
+
+    first = _sync(api, txt_dir)
+    assert sorted(first["uploaded"]) == ["a.txt", "b.txt", "c.txt"]
+    assert legacy_a not in api.stores["vs_live"]
+    assert api.live() == ["a.txt", "b.txt", "c.txt"]
+
+    _write(txt_dir, {"b.txt": "B v2", "d.txt": "D"})
+    (txt_dir / "c.txt").unlink()
+    api.calls.clear()
+    second = _sync(api, txt_dir)
+
+    assert second["unchanged"] == ["a.txt"]
+    assert sorted(second["uploaded"]) == ["b.txt", "d.txt"]
+    assert sorted(second["removed"]) == ["b.txt", "c.txt"]
+    assert api.live() == ["a.txt", "b.txt", "d.txt"]
+    # Add-then-remove: every upload happens before the first removal
+    kinds = [kind for kind, _ in api.calls]
+    assert kinds.index("remove") > max(i for i, kind in enumerate(kinds) if kind == "upload")
+
+    assert _sync(api, txt_dir)["upload"] == []
+
+
+def test_failed_upload_keeps_the_old_version(tmp_path):
+    txt_dir = tmp_path / "database_txt"
+    _write(txt_dir, {"a.txt": "A"})
+    api = FakeVectorStoreAPI()
+    _sync(api, txt_dir)
+    old_sha = local_files(txt_dir)["a.txt"]
+
+    _write(txt_dir, {"a.txt": "A v2"})
+    api.fail_indexing.add("a.txt")
+    report = _sync(api, txt_dir)
+
+    assert report["failed"] == {"a.txt": "indexing failed"}
+    assert report["removed"] == []
+    assert [f.attributes["sha256"] for f in api.stores["vs_live"].values()] == [old_sha]
+
+
+def test_plan_removes_duplicates_and_keeps_unnamed_files():
+    local = {"a.txt": "h1"}
+    remote = [
+        {"id": "f1", "filename": "a.txt", "sha256": "h1"},
+        {"id": "f2", "filename": "a.txt", "sha256": "h1"},
+        {"id": "f3", "filename": "a.txt", "sha256": "old"},
+        {"id": "f4", "filename": None, "sha256": None},
+    ]
+    plan = plan_sync(local, remote)
+    assert plan["upload"] == [] and plan["unchanged"] == ["a.txt"]
+    assert [e["id"] for e in plan["remove"]] == ["f2", "f3"]
+
+
+def test_new_store_mode_leaves_the_live_store_alone(tmp_path):
+    txt_dir = tmp_path / "database_txt"
+    _write(txt_dir, {"a.txt": "A", "b.txt": "B"})
+    api = FakeVectorStoreAPI()
+    api.add_legacy("old.txt")
+
+    store_id, report = sync_to_new_store(api, "next", txt_dir, workers=2, poll_interval=0, sleep=lambda s: None)
+    assert store_id == "vs_new"
+    assert sorted(report["uploaded"]) == ["a.txt", "b.txt"]
+    assert api.live("vs_new") == ["a.txt", "b.txt"]
+    assert api.live() == ["old.txt"]
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Build knowledge_base/database_txt from knowledge_base/database and preview its chunks.
+
+1. Convert every Markdown source to the TXT uploaded to the vector store
+   (src/kb_chunking.md_to_txt). Sources listed under "local_only" in
+   assistant_config/KB_DOCUMENTS.json are skipped; TXT files without a
+   Markdown source are reported, never deleted.
+2. Chunk the TXT files locally exactly as the vector store does (static,
+   500 tokens / 75 overlap by default) and write the chunks plus stats -
+   count, token distribution, per-program coverage - to the preview directory.
+   --chunker structured previews the unit-aware chunking instead
+   (src/kb_chunking.chunk_syllabus), for comparing the two.
+
+Try a chunking before uploading it (the store itself is only changed by
+tools/sync_vector_store.py):
+    python tools/build_kb_txt.py
+    python tools/build_kb_txt.py --max-tokens 400 --overlap 60
+    python tools/build_kb_txt.py --chunker structured
+    python tools/build_kb_txt.py --check     # exit 1 if database_txt is out of date
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+WORKSPACE_ROOT = Path(__file__).resolve().parents[1]
+if str(WORKSPACE_ROOT) not in sys.path:
+    sys.path.append(str(WORKSPACE_ROOT))
+
+from src.kb_chunking import (  # noqa: E402
+    DEFAULT_CHUNK_SIZE, DEFAULT_OVERLAP, chunk_stats, chunk_syllabus, chunk_text, md_to_txt,
+)
+from src.utils import strip_doc_version  # noqa: E402
+
+KB_ROOT = WORKSPACE_ROOT / "knowledge_base"
+DEFAULT_MD_DIR = KB_ROOT / "database"
+DEFAULT_TXT_DIR = KB_ROOT / "database_txt"
+DEFAULT_PREVIEW_DIR = KB_ROOT / "chunk_preview"
+CHUNKERS = {"static": chunk_text, "structured": chunk_syllabus}
+
+
+def convert(md_dir: Path, txt_dir: Path, local_only: Iterable[str] = (), write: bool = True) -> Dict[str, List[str]]:
+    """Regenerate the TXT of every Markdown source; {"written", "unchanged", "skipped", "orphaned"}."""
+    skip = {base.lower() for base in local_only}
+    report: Dict[str, List[str]] = {"written": [], "unchanged": [], "skipped": [], "orphaned": []}
+    expected = set()
+    for md_path in sorted(md_dir.glob("*.md")):
+        if strip_doc_version(md_path.name) in skip:
+            report["skipped"].append(md_path.name)
+            continue
+        txt_path = txt_dir / f"{md_path.stem}.txt"
+        expected.add(txt_path.name)
+        text = md_to_txt(md_path.read_text(encoding="utf-8"))
+        if txt_path.exists() and txt_path.read_text(encoding="utf-8") == text:
+            report["unchanged"].append(txt_path.name)
+            continue
+        if write:
+            txt_dir.mkdir(parents=True, exist_ok=True)
+            txt_path.write_text(text, encoding="utf-8")
+        report["written"].append(txt_path.name)
+    report["orphaned"] = sorted(p.name for p in txt_dir.glob("*.txt") if p.name not in expected)
+    return report
+
+
+def preview(
+    txt_dir: Path,
+    preview_dir: Path,
+    max_tokens: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    program_synonyms: Dict = None,
+    chunker: str = "static",
+) -> Dict[str, Any]:
+    """Chunk every TXT file, write <name>.jsonl per file plus stats.json; returns the stats."""
+    preview_dir.mkdir(parents=True, exist_ok=True)
+    for stale in preview_dir.glob("*.jsonl"):
+        stale.unlink()
+    chunks = []
+    for txt_path in sorted(txt_dir.glob("*.txt")):
+        file_chunks = CHUNKERS[chunker](txt_path.read_text(encoding="utf-8"), txt_path.name, max_tokens, overlap)
+        with open(preview_dir / f"{txt_path.stem}.jsonl", "w", encoding="utf-8") as handle:
+            for chunk in file_chunks:
+                handle.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+        chunks.extend(file_chunks)
+    stats = chunk_stats(chunks, max_tokens, program_synonyms)
+    stats["chunking"] = {"chunker": chunker, "max_chunk_size_tokens": max_tokens, "chunk_overlap_tokens": overlap}
+    with open(preview_dir / "stats.json", "w", encoding="utf-8") as handle:
+        json.dump(stats, handle, indent=2, sort_keys=True)
+    return stats
+
+
+def print_stats(stats: Dict[str, Any]) -> None:
+    tokens = stats["tokens"]
+    print(f"   {stats['chunks']} chunks from {stats['sources']} files | {tokens['total']} tokens")
+    print(f"   tokens/chunk: min {tokens['min']} | p50 {tokens['p50']} | mean {tokens['mean']} "
+          f"| p95 {tokens['p95']} | max {tokens['max']} | short chunks {stats['short_chunks']}")
+    print(f"   kinds: {', '.join(f'{kind} {count}' for kind, count in sorted(stats['kinds'].items()))}")
+    for pid, entry in sorted(stats["per_program"].items()):
+        print(f"   {pid:<40} {entry['chunks']:>4} chunks {entry['tokens']:>7} tokens")
+    if stats["uncovered_programs"]:
+        print(f"⚠️  Programs without any chunk: {', '.join(stats['uncovered_programs'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert the KB Markdown to TXT and preview its vector store chunks.")
+    parser.add_argument("--md-dir", type=Path, default=DEFAULT_MD_DIR)
+    parser.add_argument("--txt-dir", type=Path, default=DEFAULT_TXT_DIR)
+    parser.add_argument("--preview-dir", type=Path, default=DEFAULT_PREVIEW_DIR)
+    parser.add_argument("--max-tokens", type=int, default=DEFAULT_CHUNK_SIZE, help="Max tokens per chunk.")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP, help="Overlapping tokens between chunks.")
+    parser.add_argument("--chunker", choices=sorted(CHUNKERS), default="static",
+                        help="static = what the vector store does; structured = one chunk per unit + outline.")
+    parser.add_argument("--no-preview", action="store_true", help="Only convert.")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any TXT differs from its Markdown source.")
+    args = parser.parse_args()
+
+    from src.config import KB_DOCUMENTS
+
+    report = convert(args.md_dir, args.txt_dir, KB_DOCUMENTS.get("local_only", []), write=not args.check)
+    verb = "Out of date" if args.check else "Written"
+    print(f"📝 {verb}: {len(report['written'])} | unchanged {len(report['unchanged'])} "
+          f"| local only {len(report['skipped'])}")
+    for name in report["written"]:
+        print(f"      {name}")
+    for name in report["orphaned"]:
+        print(f"⚠️  {name} has no Markdown source (still uploaded by sync_vector_store.py)")
+    if args.check:
+        raise SystemExit(1 if report["written"] else 0)
+
+    if not args.no_preview:
+        stats = preview(args.txt_dir, args.preview_dir, args.max_tokens, args.overlap, chunker=args.chunker)
+        print(f"🧩 {args.chunker.capitalize()} chunk preview ({args.max_tokens} tokens, {args.overlap} overlap) "
+              f"-> {args.preview_dir}")
+        print_stats(stats)
+
+
+if __name__ == "__main__":
+    main()
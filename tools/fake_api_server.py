@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the external APIs the RAG pipeline calls, for offline
+latency benchmarking (see tools/latency_benchmark.py).
+
+- OpenAI (chat completions + Responses API file_search, i.e. the vector store):
+  in "record" mode requests are proxied to the real API and stored in a cassette;
+  in "replay" mode the recorded responses are served back. Requests that don't
+  match byte-for-byte (prompts changed since recording) are answered with the
+  most similar recorded request for the same endpoint/model/system prompt.
+- Slack Web API: chat.postMessage / chat.update / conversations.replies are
+  simulated against an in-memory thread store (never forwarded - benchmarking
+  must not post to real channels).
+- Google Sheets: the cohort calendar rows captured at record time are served on
+  /sheets/values.
+
+Every replayed response is delayed to simulate the network: either the latency
+observed while recording (scaled) or a fixed delay, plus optional jitter.
+
+Usage (standalone, point the app at it with OPENAI_BASE_URL/SLACK_API_BASE_URL):
+    python tools/fake_api_server.py --cassette tests/fixtures/latency_cassette.json --port 8765
+"""
+
+import argparse
+import difflib
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_UPSTREAM = "https://api.openai.com"
+CASSETTE_VERSION = 1
+
+# Similarity matching only looks at this much of the variable prompt text
+_MATCH_TEXT_CHARS = 4000
+
+
+# ---------------- Request fingerprints ----------------
+
+def _canonical(body: Dict[str, Any]) -> str:
+    return json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def request_key(path: str, body: Dict[str, Any]) -> str:
+    """Exact fingerprint of an API request."""
+    return hashlib.sha256(f"{path}\n{_canonical(body)}".encode("utf-8")).hexdigest()
+
+
+def _split_prompt(body: Dict[str, Any]) -> Tuple[str, str]:
+    """(static part, variable part) of a chat/responses request body."""
+    messages = body.get("messages")
+    if isinstance(messages, list):
+        system = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+        rest = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") != "system")
+        return system, rest
+    instructions = str(body.get("instructions") or "")
+    payload = body.get("input", "")
+    return instructions, payload if isinstance(payload, str) else _canonical({"input": payload})
+
+
+def request_shape(path: str, body: Dict[str, Any]) -> str:
+    """Endpoint + model + system prompt: requests from the same prompt builder share a shape."""
+    system, _ = _split_prompt(body)
+    digest = hashlib.sha256(system.encode("utf-8")).hexdigest()[:16]
+    return f"{path}|{body.get('model', '')}|{digest}"
+
+
+def match_text(body: Dict[str, Any]) -> str:
+    return _split_prompt(body)[1][:_MATCH_TEXT_CHARS]
+
+
+# ---------------- Cassette ----------------
+
+class Cassette:
+    """Recorded API interactions (JSON file), safe to use from server threads."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self.openai: List[Dict[str, Any]] = []
+        self.sheets: Optional[Dict[str, Any]] = None
+        self._by_key: Dict[str, List[int]] = {}
+        self._by_shape: Dict[str, List[int]] = {}
+        self._by_path: Dict[str, List[int]] = {}
+        self._cursor: Dict[str, itertools.count] = {}
+        if self.path and self.path.exists():
+            self.load()
+
+    def load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        with self._lock:
+            self.openai = []
+            self._by_key.clear()
+            self._by_shape.clear()
+            self._by_path.clear()
+            self.sheets = data.get("sheets")
+        for entry in data.get("openai", []):
+            self.add_openai(entry)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "openai": self.openai, "sheets": self.sheets}
+        with open(self.path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, ensure_ascii=False, indent=1)
+
+    def add_openai(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            idx = len(self.openai)
+            self.openai.append(entry)
+            self._by_key.setdefault(entry["key"], []).append(idx)
+            self._by_shape.setdefault(entry["shape"], []).append(idx)
+            self._by_path.setdefault(entry["path"], []).append(idx)
+
+    def record_openai(self, path: str, body: Dict[str, Any], status: int, response: Any, duration_ms: float) -> None:
+        self.add_openai({
+            "path": path,
+            "key": request_key(path, body),
+            "shape": request_shape(path, body),
+            "match_text": match_text(body),
+            "status": status,
+            "response": response,
+            "duration_ms": round(duration_ms, 1),
+        })
+
+    def record_sheets(self, rows: List[List[Any]], duration_ms: float) -> None:
+        with self._lock:
+            self.sheets = {"rows": rows, "duration_ms": round(duration_ms, 1)}
+
+    def find_openai(self, path: str, body: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Recorded entry for a request and how it matched ("exact", "similar",
+        or "miss"). Repeated identical requests cycle through their recordings.
+        """
+        key = request_key(path, body)
+        with self._lock:
+            exact = self._by_key.get(key)
+            if exact:
+                cursor = self._cursor.setdefault(key, itertools.count())
+                return self.openai[exact[next(cursor) % len(exact)]], "exact"
+            candidates = self._by_shape.get(request_shape(path, body)) or self._by_path.get(path) or []
+            entries = [self.openai[i] for i in candidates]
+        if not entries:
+            return None, "miss"
+        text = match_text(body)
+        best = max(
+            entries,
+            key=lambda e: difflib.SequenceMatcher(None, text, e.get("match_text", ""), autojunk=False).quick_ratio(),
+        )
+        return best, "similar"
+
+
+# ---------------- Latency model ----------------
+
+class LatencyModel:
+    """
+    Injected delay per replayed call: recorded upstream latency * scale
+    (mode "recorded") or a fixed delay (mode "fixed"), plus uniform jitter.
+    """
+
+    def __init__(self, mode: str = "recorded", scale: float = 1.0, fixed_ms: float = 0.0,
+                 jitter_ms: float = 0.0, slack_ms: float = 0.0, seed: Optional[int] = None):
+        self.mode = mode
+        self.scale = scale
+        self.fixed_ms = fixed_ms
+        self.jitter_ms = jitter_ms
+        self.slack_ms = slack_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _jitter(self) -> float:
+        if not self.jitter_ms:
+            return 0.0
+        with self._lock:
+            return self._random.uniform(0, self.jitter_ms)
+
+    def delay_ms(self, recorded_ms: Optional[float]) -> float:
+        base = (recorded_ms or 0.0) * self.scale if self.mode == "recorded" else self.fixed_ms
+        return base + self._jitter()
+
+    def slack_delay_ms(self) -> float:
+        return self.slack_ms + self._jitter()
+
+
+# ---------------- Simulated Slack ----------------
+
+class SlackThreads:
+    """In-memory Slack threads: enough of the Web API for history + progress updates."""
+
+    BOT_ID = "BFAKEBOT"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._threads: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._clock = itertools.count(1)
+
+    def _ts(self) -> str:
+        return f"{int(time.time())}.{next(self._clock):06d}"
+
+    def post(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        channel = params.get("channel", "")
+        ts = self._ts()
+        thread_ts = params.get("thread_ts") or ts
+        message = {"ts": ts, "thread_ts": thread_ts, "text": params.get("text", "")}
+        # Fake-only extension: a "user" param posts as that user (seeds a question)
+        if params.get("user"):
+            message["user"] = params["user"]
+        else:
+            message["bot_id"] = self.BOT_ID
+        with self._lock:
+            self._threads.setdefault((channel, thread_ts), []).append(message)
+        return {"ok": True, "channel": channel, "ts": ts, "message": message}
+
+    def update(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        channel, ts = params.get("channel", ""), params.get("ts", "")
+        with self._lock:
+            for (ch, _), messages in self._threads.items():
+                if ch != channel:
+                    continue
+                for message in messages:
+                    if message["ts"] == ts:
+                        message["text"] = params.get("text", message["text"])
+                        return {"ok": True, "channel": channel, "ts": ts, "text": message["text"]}
+        return {"ok": False, "error": "message_not_found"}
+
+    def replies(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        key = (params.get("channel", ""), params.get("ts", ""))
+        limit = int(params.get("limit") or 100)
+        with self._lock:
+            messages = list(self._threads.get(key, []))[:limit]
+        return {"ok": True, "messages": messages, "has_more": False}
+
+
+# ---------------- HTTP server ----------------
+
+class FakeAPIServer:
+    """
+    Record/replay server running in a background thread.
+
+        server = FakeAPIServer(Cassette(path), mode="replay", latency=LatencyModel(...)).start()
+        os.environ["OPENAI_BASE_URL"] = server.openai_base_url
+        ...
+        server.stop()
+    """
+
+    def __init__(self, cassette: Cassette, mode: str = "replay", latency: Optional[LatencyModel] = None,
+                 upstream: str = DEFAULT_UPSTREAM, host: str = "127.0.0.1", port: int = 0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"mode must be 'record' or 'replay', got {mode!r}")
+        self.cassette = cassette
+        self.mode = mode
+        self.latency = latency or LatencyModel()
+        self.upstream = upstream.rstrip("/")
+        self.slack = SlackThreads()
+        self.stats = {"exact": 0, "similar": 0, "miss": 0, "recorded": 0, "slack": 0, "sheets": 0}
+        self._stats_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    @property
+    def slack_base_url(self) -> str:
+        return f"{self.url}/slack/api/"
+
+    def count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def start(self) -> "FakeAPIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-api-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self.mode == "record":
+            self.cassette.save()
+
+    # ---- handlers (called from request threads) ----
+
+    def handle_openai(self, path: str, body: Dict[str, Any], headers: Dict[str, str]) -> Tuple[int, Any]:
+        if self.mode == "record":
+            start = time.perf_counter()
+            status, response = _forward(self.upstream + path, body, headers)
+            self.cassette.record_openai(path, body, status, response, (time.perf_counter() - start) * 1000)
+            self.count("recorded")
+            return status, response
+
+        entry, how = self.cassette.find_openai(path, body)
+        self.count(how)
+        if entry is None:
+            return 404, {"error": {"message": f"No recording for {path}", "type": "replay_miss"}}
+        _sleep_ms(self.latency.delay_ms(entry.get("duration_ms")))
+        return entry.get("status", 200), entry["response"]
+
+    def handle_slack(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.count("slack")
+        _sleep_ms(self.latency.slack_delay_ms())
+        if method == "chat.postMessage":
+            return self.slack.post(params)
+        if method == "chat.update":
+            return self.slack.update(params)
+        if method == "conversations.replies":
+            return self.slack.replies(params)
+        if method == "auth.test":
+            return {"ok": True, "user_id": "UFAKEBOT", "bot_id": SlackThreads.BOT_ID}
+        return {"ok": False, "error": "unknown_method"}
+
+    def handle_sheets(self) -> Tuple[int, Any]:
+        self.count("sheets")
+        recorded = self.cassette.sheets
+        if not recorded:
+            return 404, {"error": "no recorded sheet values"}
+        _sleep_ms(self.latency.delay_ms(recorded.get("duration_ms")))
+        return 200, {"values": recorded.get("rows", [])}
+
+
+def _sleep_ms(ms: float) -> None:
+    if ms > 0:
+        time.sleep(ms / 1000.0)
+
+
+def _forward(url: str, body: Dict[str, Any], headers: Dict[str, str]) -> Tuple[int, Any]:
+    forwarded = {k: v for k, v in headers.items() if k.lower() in ("authorization", "openai-organization", "openai-project")}
+    forwarded["Content-Type"] = "application/json"
+    request = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"), headers=forwarded, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            return response.status, json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        try:
+            return e.code, json.loads(e.read().decode("utf-8"))
+        except ValueError:
+            return e.code, {"error": {"message": str(e)}}
+
+
+def _make_handler(server: FakeAPIServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # noqa: A002 - keep benchmark output clean
+            pass
+
+        def _params(self) -> Dict[str, Any]:
+            parsed = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length).decode("utf-8") if length else ""
+            if raw:
+                if "json" in (self.headers.get("Content-Type") or ""):
+                    params.update(json.loads(raw))
+                else:
+                    params.update({k: v[-1] for k, v in parse_qs(raw).items()})
+            return params
+
+        def _send(self, status: int, payload: Any) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _dispatch(self) -> None:
+            path = urlparse(self.path).path
+            try:
+                params = self._params()
+                if path.startswith("/v1/"):
+                    status, payload = server.handle_openai(path, params, dict(self.headers))
+                elif path.startswith("/slack/api/"):
+                    status, payload = 200, server.handle_slack(path[len("/slack/api/"):], params)
+                elif path == "/sheets/values":
+                    status, payload = server.handle_sheets()
+                else:
+                    status, payload = 404, {"error": f"unknown path {path}"}
+            except Exception as e:  # keep the server alive for the rest of the run
+                status, payload = 500, {"error": {"message": str(e), "type": "fake_server_error"}}
+            self._send(status, payload)
+
+        do_GET = _dispatch
+        do_POST = _dispatch
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record/replay stand-in for OpenAI, Slack and Sheets.")
+    parser.add_argument("--cassette", type=Path, required=True, help="Cassette JSON file.")
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--upstream", default=DEFAULT_UPSTREAM, help="Real OpenAI base URL (record mode).")
+    parser.add_argument("--latency", choices=["recorded", "fixed"], default="recorded")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay per call (--latency fixed).")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--slack-latency-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    server = FakeAPIServer(
+        Cassette(args.cassette),
+        mode=args.mode,
+        latency=LatencyModel(args.latency, args.latency_scale, args.latency_ms, args.jitter_ms, args.slack_latency_ms),
+        upstream=args.upstream,
+        port=args.port,
+    ).start()
+    print(f"Fake API server ({args.mode}) on {server.url}")
+    print(f"  OPENAI_BASE_URL={server.openai_base_url}")
+    print(f"  SLACK_API_BASE_URL={server.slack_base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"Stopped. Stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
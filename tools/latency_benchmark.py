@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Offline latency benchmark for the RAG pipeline (record/replay).
+
+1. Record once against the real APIs (needs OPENAI_API_KEY, and Sheets
+   credentials for the cohort calendar cases):
+       python tools/latency_benchmark.py record
+   Every OpenAI call (chat + vector store file_search) and the cohort calendar
+   rows are captured in tests/fixtures/latency_cassette.json.
+
+2. Replay fully offline, as often as needed:
+       python tools/latency_benchmark.py replay --concurrency 4 --rounds 3
+   The workflow runs against tools/fake_api_server.py with injected latency and
+   reports p50/p95 end-to-end and per-node latency plus throughput. Use
+   --max-p95 to fail (exit 1) when end-to-end p95 regresses past a threshold.
+
+Each question goes through the same Slack edges as handle_mention: the question
+is posted to a (simulated) thread, history is read with conversations.replies,
+progress updates are posted/updated, and the answer is posted back.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+WORKSPACE_ROOT = Path(__file__).resolve().parents[1]
+if str(WORKSPACE_ROOT) not in sys.path:
+    sys.path.append(str(WORKSPACE_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_api_server import Cassette, FakeAPIServer, LatencyModel  # noqa: E402
+
+DEFAULT_FIXTURE_PATH = WORKSPACE_ROOT / "tests" / "fixtures" / "rag_judge_fixtures.json"
+DEFAULT_CASSETTE_PATH = WORKSPACE_ROOT / "tests" / "fixtures" / "latency_cassette.json"
+RESULTS_DIR = WORKSPACE_ROOT / "tests" / "results"
+
+BENCH_CHANNEL = "CBENCHMARK"
+BENCH_USER = "UBENCHUSER"
+
+
+# ---------------- Statistics ----------------
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0-100); 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(-(-pct * len(ordered) // 100))))
+    return ordered[rank - 1]
+
+
+def summarize_latencies(turns: List[Dict[str, Any]], wall_seconds: float) -> Dict[str, Any]:
+    """
+    turns: one record per answered question, {"elapsed_ms": float, "trace": [...]}.
+    Returns end-to-end and per-node p50/p95/mean plus throughput.
+    """
+    e2e = [t["elapsed_ms"] for t in turns]
+    per_node: Dict[str, List[float]] = {}
+    for turn in turns:
+        for entry in turn.get("trace") or []:
+            per_node.setdefault(entry.get("node", "?"), []).append(entry.get("duration_ms", 0.0))
+
+    def _stats(values: List[float]) -> Dict[str, float]:
+        return {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "mean_ms": round(sum(values) / len(values), 1) if values else 0.0,
+        }
+
+    return {
+        "questions": len(turns),
+        "failed": sum(1 for t in turns if t.get("error")),
+        "wall_seconds": round(wall_seconds, 2),
+        "throughput_qps": round(len(turns) / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+        "end_to_end": _stats(e2e),
+        "nodes": {
+            name: _stats(values)
+            for name, values in sorted(per_node.items(), key=lambda kv: -percentile(kv[1], 95))
+        },
+    }
+
+
+# ---------------- Question driver ----------------
+
+def _turns(case: Dict[str, Any]) -> List[str]:
+    turns = case.get("conversation_turns")
+    return [t["user_query"] for t in turns] if turns else [case["query"]]
+
+
+def run_case(case: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run one fixture (all its turns) through the Slack edges + workflow; one record per turn."""
+    from src.config import REQUEST_TIME_BUDGET_SECONDS, slack_web_client
+    from src.deadline import new_deadline
+    from src.doc_store import release_doc_store
+    from src.slack_helpers import (
+        finish_slack_progress,
+        get_conversation_history,
+        record_bot_reply,
+        record_thread_message,
+    )
+    from src.workflow import rag_workflow
+
+    records = []
+    thread_ts = None
+    for turn_idx, query in enumerate(_turns(case)):
+        start = time.perf_counter()
+        error = None
+        trace: List[Dict[str, Any]] = []
+        try:
+            # Fake-server extension: "user" posts the question as a human message
+            posted = slack_web_client.chat_postMessage(
+                channel=BENCH_CHANNEL, text=query, thread_ts=thread_ts, user=BENCH_USER
+            )
+            event_ts = posted["ts"]
+            thread_ts = thread_ts or event_ts
+            record_thread_message(BENCH_CHANNEL, thread_ts, {"ts": event_ts, "text": query, "user": BENCH_USER})
+            history = get_conversation_history(BENCH_CHANNEL, thread_ts, limit=10, latest_ts=event_ts)
+            state = {
+                "query": query,
+                "conversation_history": history,
+                "is_follow_up": bool(history),
+                "conversation_stage": "follow_up" if history else "initial",
+                "iteration_count": 0,
+                "request_deadline": new_deadline(REQUEST_TIME_BUDGET_SECONDS),
+                "metadata": {"benchmark_case": case.get("id"), "turn": turn_idx + 1},
+                "slack_channel": BENCH_CHANNEL,
+                "slack_thread_ts": thread_ts,
+            }
+            config = {"configurable": {"thread_id": f"bench_{uuid.uuid4()}"}, "recursion_limit": 50}
+            result = rag_workflow.invoke(state, config)
+            release_doc_store(result.get("doc_store_id"))
+            trace = (result.get("metadata") or {}).get("trace") or []
+            finish_slack_progress(BENCH_CHANNEL, thread_ts)
+            answer = result.get("final_response", "")
+            reply = slack_web_client.chat_postMessage(channel=BENCH_CHANNEL, thread_ts=thread_ts, text=answer)
+            record_bot_reply(BENCH_CHANNEL, thread_ts, reply.get("ts"), answer)
+        except Exception as e:
+            error = str(e)
+        records.append({
+            "id": case.get("id"),
+            "turn": turn_idx + 1,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+            "trace": trace,
+            "error": error,
+        })
+    return records
+
+
+def run_benchmark(
+    cases: List[Dict[str, Any]],
+    concurrency: int = 1,
+    rounds: int = 1,
+    runner: Callable[[Dict[str, Any]], List[Dict[str, Any]]] = run_case,
+) -> Dict[str, Any]:
+    """Run every case `rounds` times with up to `concurrency` questions in flight."""
+    jobs = [case for _ in range(max(1, rounds)) for case in cases]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        batches = list(executor.map(runner, jobs))
+    wall = time.perf_counter() - start
+    turns = [record for batch in batches for record in batch]
+    summary = summarize_latencies(turns, wall)
+    summary["concurrency"] = concurrency
+    summary["rounds"] = rounds
+    return {"summary": summary, "turns": turns}
+
+
+# ---------------- Environment wiring ----------------
+
+def _install_progress_updates() -> None:
+    """Progress updates go to the simulated Slack, as they do in handle_mention."""
+    from src.config import slack_web_client
+    from src.slack_helpers import set_slack_say_function
+
+    def say(text, thread_ts=None, channel=None):
+        return slack_web_client.chat_postMessage(channel=channel or BENCH_CHANNEL, thread_ts=thread_ts, text=text)
+
+    set_slack_say_function(say)
+
+
+def _record_sheets(cassette: Cassette) -> None:
+    """Capture the live cohort calendar rows (and fetch time) into the cassette."""
+    import src.cohort_calendar.sheets_client as sheets_client
+
+    live_fetch = sheets_client.fetch_cohort_calendar_data
+
+    def recording_fetch():
+        start = time.perf_counter()
+        rows = live_fetch()
+        cassette.record_sheets(rows, (time.perf_counter() - start) * 1000)
+        return rows
+
+    sheets_client.fetch_cohort_calendar_data = recording_fetch
+
+
+def _configure_environment(server: FakeAPIServer) -> None:
+    """Must run before any src import: clients read these at import time."""
+    os.environ["OPENAI_BASE_URL"] = server.openai_base_url
+    os.environ["SLACK_API_BASE_URL"] = server.slack_base_url
+    os.environ["SLACK_BOT_TOKEN"] = "xoxb-benchmark"
+    os.environ.setdefault("SLACK_SIGNING_SECRET", "benchmark-signing-secret")
+    if server.mode == "replay":
+        os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY") or "sk-replay"
+        os.environ["COHORT_CALENDAR_VALUES_URL"] = f"{server.url}/sheets/values"
+
+
+# ---------------- Reporting ----------------
+
+def print_report(result: Dict[str, Any], server_stats: Dict[str, int]) -> None:
+    summary = result["summary"]
+    e2e = summary["end_to_end"]
+    print("\n" + "=" * 80)
+    print(
+        f"Latency benchmark | {summary['questions']} questions | concurrency {summary['concurrency']} "
+        f"| rounds {summary['rounds']}"
+    )
+    print("=" * 80)
+    print(
+        f"End-to-end: p50 {e2e['p50_ms']:.0f}ms | p95 {e2e['p95_ms']:.0f}ms | mean {e2e['mean_ms']:.0f}ms "
+        f"| throughput {summary['throughput_qps']:.2f} q/s | failed {summary['failed']}"
+    )
+    print("-" * 80)
+    print(f"{'node':<32} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'mean ms':>10}")
+    for name, stats in summary["nodes"].items():
+        print(f"{name:<32} {stats['count']:>6} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['mean_ms']:>10.1f}")
+    print("-" * 80)
+    print(
+        f"Replay matches: exact {server_stats['exact']} | similar {server_stats['similar']} "
+        f"| miss {server_stats['miss']} | slack calls {server_stats['slack']} | sheets {server_stats['sheets']}"
+    )
+    if server_stats["miss"]:
+        print("⚠️  Some requests had no recording - re-record the cassette after prompt/flow changes.")
+    print("=" * 80 + "\n")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record/replay latency benchmark for RAG v2.")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURE_PATH)
+    parser.add_argument("--cassette", type=Path, default=DEFAULT_CASSETTE_PATH)
+    parser.add_argument("--test-id", type=str, help="Only run the fixture with this ID.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Questions in flight (replay).")
+    parser.add_argument("--rounds", type=int, default=1, help="Passes over the fixtures (replay).")
+    parser.add_argument("--latency", choices=["recorded", "fixed"], default="recorded",
+                        help="Replay delay: recorded upstream latency (scaled) or a fixed delay.")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--slack-latency-ms", type=float, default=80.0)
+    parser.add_argument("--seed", type=int, default=7, help="Jitter seed (reproducible runs).")
+    parser.add_argument("--max-p95", type=float, help="Fail if end-to-end p95 exceeds this many seconds.")
+    parser.add_argument("--report", type=Path, help="Where to save the JSON report.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with open(args.fixtures, "r", encoding="utf-8") as handle:
+        cases = json.load(handle)
+    if args.test_id:
+        cases = [c for c in cases if c.get("id") == args.test_id]
+        if not cases:
+            raise SystemExit(f"❌ No fixture with ID: {args.test_id}")
+
+    if args.mode == "replay" and not args.cassette.exists():
+        raise SystemExit(f"❌ No cassette at {args.cassette} - run `record` first.")
+
+    cassette = Cassette(args.cassette if args.mode == "replay" else None)
+    cassette.path = args.cassette
+    server = FakeAPIServer(
+        cassette,
+        mode=args.mode,
+        latency=LatencyModel(args.latency, args.latency_scale, args.latency_ms, args.jitter_ms,
+                             args.slack_latency_ms, seed=args.seed),
+    ).start()
+    _configure_environment(server)
+    _install_progress_updates()
+    if args.mode == "record":
+        _record_sheets(cassette)
+
+    try:
+        if args.mode == "record":
+            # Sequential, one pass: a clean recording per fixture
+            result = run_benchmark(cases, concurrency=1, rounds=1)
+        else:
+            result = run_benchmark(cases, concurrency=args.concurrency, rounds=args.rounds)
+    finally:
+        server.stop()
+
+    print_report(result, server.stats)
+    if args.mode == "record":
+        print(f"Recorded {server.stats['recorded']} OpenAI calls to {args.cassette}")
+
+    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    report_path = args.report or RESULTS_DIR / f"latency_benchmark_{args.mode}_{timestamp}.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as handle:
+        json.dump({"generated_at": datetime.utcnow().isoformat() + "Z", "server": server.stats, **result},
+                  handle, ensure_ascii=False, indent=2)
+    print(f"Saved report to {report_path}")
+
+    p95_seconds = result["summary"]["end_to_end"]["p95_ms"] / 1000
+    if args.max_p95 is not None and p95_seconds > args.max_p95:
+        print(f"❌ End-to-end p95 {p95_seconds:.2f}s exceeds --max-p95 {args.max_p95:.2f}s")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
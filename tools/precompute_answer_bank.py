@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Precompute the answer bank (src/answer_bank.py).
+
+Runs the canonical question of every (active program x template) through the
+full workflow, keeps the answers that passed verification and stores them
+keyed by the current knowledge base version. Entries already built from this
+KB version are skipped unless --force is given, so re-running after a KB edit
+only regenerates what the edit invalidated.
+
+Usage:
+    python tools/precompute_answer_bank.py
+    python tools/precompute_answer_bank.py --programs data_analytics devops --templates duration breakdown
+    python tools/precompute_answer_bank.py --coverage-topics Python SQL Docker
+    python tools/precompute_answer_bank.py --dry-run
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+WORKSPACE_ROOT = Path(__file__).resolve().parents[1]
+if str(WORKSPACE_ROOT) not in sys.path:
+    sys.path.append(str(WORKSPACE_ROOT))
+
+from src.answer_bank import TEMPLATES, AnswerBank, template_key, template_question  # noqa: E402
+from src.config import ANSWER_BANK_PATH, PROGRAM_SYNONYMS  # noqa: E402
+from src.utils import program_display_name  # noqa: E402
+
+# Stricter than the production finalize gate: a banked answer is served to everyone
+DEFAULT_MIN_FAITHFULNESS = 0.8
+
+
+def verified_answer(result: Dict[str, Any], min_faithfulness: float = DEFAULT_MIN_FAITHFULNESS) -> bool:
+    """Whether a workflow result may be banked: a finalized answer that passed verification."""
+    if not result.get("final_response") or result.get("is_fallback"):
+        return False
+    nodes = [entry.get("node") for entry in (result.get("metadata") or {}).get("trace") or []]
+    if "generate_fun_fallback" in nodes:
+        return False
+    # Negative coverage answers come from a deterministic document scan, not generation
+    if nodes and nodes[-1] == "generate_negative_coverage":
+        return True
+    return (
+        "finalize_response" in nodes
+        and not result.get("has_critical_violations", False)
+        and result.get("faithfulness_score", 0.0) >= min_faithfulness
+    )
+
+
+def run_workflow(question: str) -> Dict[str, Any]:
+    from src.workflow import rag_workflow
+
+    config = {"configurable": {"thread_id": f"answer_bank_{uuid.uuid4()}"}, "recursion_limit": 50}
+    return rag_workflow.invoke({
+        "query": question,
+        "conversation_history": [],
+        "iteration_count": 0,
+        "skip_answer_bank": True,
+        "metadata": {},
+    }, config)
+
+
+def plan(programs: List[str], keys: List[str], bank: AnswerBank, force: bool) -> List[Tuple[str, str]]:
+    """(program, template key) pairs that need (re)computing."""
+    return [
+        (program, key)
+        for program in programs
+        for key in keys
+        if force or bank.get(program, key) is None
+    ]
+
+
+def precompute(
+    jobs: List[Tuple[str, str]],
+    bank: AnswerBank,
+    run: Callable[[str], Dict[str, Any]] = run_workflow,
+    workers: int = 2,
+    min_faithfulness: float = DEFAULT_MIN_FAITHFULNESS,
+) -> Dict[str, List[str]]:
+    """Run each job's canonical question and bank the verified answers; returns stored/rejected keys."""
+    def _one(job):
+        program, key = job
+        question = template_question(program_display_name(program, PROGRAM_SYNONYMS), key)
+        start = time.time()
+        try:
+            result = run(question)
+        except Exception as e:
+            print(f"❌ {program} | {key}: {e}")
+            return job, None, question
+        print(f"   {program} | {key}: {time.time() - start:.1f}s")
+        return job, result, question
+
+    report: Dict[str, List[str]] = {"stored": [], "rejected": []}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for (program, key), result, question in executor.map(_one, jobs):
+            label = f"{program}|{key}"
+            if result is None or not verified_answer(result, min_faithfulness):
+                report["rejected"].append(label)
+                continue
+            bank.put(
+                program, key, result["final_response"], result.get("source_citations") or [],
+                question=question, faithfulness_score=result.get("faithfulness_score"),
+            )
+            report["stored"].append(label)
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    active = [pid for pid, info in PROGRAM_SYNONYMS.items() if not (info or {}).get("discontinued")]
+    parser = argparse.ArgumentParser(description="Precompute verified answers for template questions.")
+    parser.add_argument("--programs", nargs="+", default=active, help="Program ids (default: all active).")
+    parser.add_argument(
+        "--templates", nargs="+", default=[t for t in TEMPLATES if t != "coverage"],
+        choices=[t for t in TEMPLATES if t != "coverage"], help="Templates to compute.",
+    )
+    parser.add_argument(
+        "--coverage-topics", nargs="*", default=[],
+        help="Topics for 'does <program> cover <topic>?' answers (one entry per program and topic).",
+    )
+    parser.add_argument("--bank", default=ANSWER_BANK_PATH, help="Answer bank file.")
+    parser.add_argument("--workers", type=int, default=2, help="Questions run concurrently.")
+    parser.add_argument("--min-faithfulness", type=float, default=DEFAULT_MIN_FAITHFULNESS)
+    parser.add_argument("--force", action="store_true", help="Recompute entries that are already current.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be computed.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    unknown = [p for p in args.programs if p not in PROGRAM_SYNONYMS]
+    if unknown:
+        print(f"❌ Unknown program id(s): {', '.join(unknown)}")
+        raise SystemExit(1)
+
+    bank = AnswerBank(args.bank)
+    keys = list(args.templates) + [template_key("coverage", topic) for topic in args.coverage_topics]
+    jobs = plan(args.programs, keys, bank, args.force)
+    print(f"KB version {bank.version} | bank {args.bank}: {bank.stats()} | {len(jobs)} answer(s) to compute")
+    if args.dry_run or not jobs:
+        for program, key in jobs:
+            print(f"   {program} | {key}")
+        return
+
+    report = precompute(jobs, bank, workers=args.workers, min_faithfulness=args.min_faithfulness)
+    bank.save()
+    print(f"✅ Stored {len(report['stored'])} | rejected (not verified) {len(report['rejected'])}")
+    for label in report["rejected"]:
+        print(f"   rejected: {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: precompiled program matcher (src/program_matcher.py) vs the
+per-call alias/filename loops it replaced.
+
+    python tools/program_matcher_benchmark.py --repeat 200
+
+Runs every judge fixture query through alias detection (discontinued-program
+check, longest-alias pick for negative coverage) and every knowledge base
+filename through source -> program mapping, both ways, checks the answers agree,
+and prints per-call timings. The legacy_* functions are verbatim copies of the
+old loops and also serve as the reference in tests/test_program_matcher.py.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+WORKSPACE_ROOT = Path(__file__).resolve().parents[1]
+if str(WORKSPACE_ROOT) not in sys.path:
+    sys.path.append(str(WORKSPACE_ROOT))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+from src.config import PROGRAM_SYNONYMS  # noqa: E402
+from src.program_matcher import ProgramMatcher  # noqa: E402
+from src.utils import strip_doc_version  # noqa: E402
+
+DEFAULT_FIXTURE_PATH = WORKSPACE_ROOT / "tests" / "fixtures" / "rag_judge_fixtures.json"
+KB_DIR = WORKSPACE_ROOT / "knowledge_base" / "database"
+
+
+# ---------------- Legacy loops ----------------
+
+def legacy_discontinued(text: str, program_synonyms: Dict) -> str:
+    text_lower = (text or "").lower()
+    for pid, info in program_synonyms.items():
+        if not info.get("discontinued"):
+            continue
+        for alias in info.get("aliases", []):
+            a = alias.lower().strip()
+            if not a:
+                continue
+            if len(a) <= 3:
+                if re.search(rf"(?<!\w){re.escape(a)}(?!\w)", text_lower):
+                    return pid
+            elif a in text_lower:
+                return pid
+    return ""
+
+
+def legacy_best_program(text: str, program_synonyms: Dict) -> Optional[str]:
+    query_lower = text.lower()
+
+    def _alias_matches(alias: str) -> bool:
+        a = alias.lower().strip()
+        if not a:
+            return False
+        if len(a) <= 3 and re.match(r"^[a-z0-9]+$", a):
+            return bool(re.search(rf"(?<!\w){re.escape(a)}(?!\w)", query_lower))
+        return a in query_lower
+
+    alias_candidates = []
+    for prog_id, prog_info in program_synonyms.items():
+        for alias in prog_info.get("aliases", []):
+            alias_candidates.append((prog_id, alias))
+    alias_candidates.sort(key=lambda x: -len(x[1]))
+    for prog_id, alias in alias_candidates:
+        if _alias_matches(alias):
+            return prog_id
+    return None
+
+
+def legacy_program_for_source(source: str, program_synonyms: Dict) -> Optional[str]:
+    src_base = strip_doc_version(source or "")
+    if not src_base:
+        return None
+    for pid, info in (program_synonyms or {}).items():
+        for fn in (info or {}).get("filenames", []):
+            base = strip_doc_version(fn)
+            if base and base in src_base:
+                return pid
+    return None
+
+
+# ---------------- Benchmark ----------------
+
+def _time_per_call(fn: Callable[[str], object], inputs: List[str], repeat: int) -> float:
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in inputs:
+            fn(item)
+    return (time.perf_counter() - start) / (repeat * len(inputs)) * 1e6
+
+
+def run(queries: List[str], sources: List[str], repeat: int, program_synonyms: Dict) -> Dict[str, Dict]:
+    build_start = time.perf_counter()
+    matcher = ProgramMatcher(program_synonyms)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    pairs = {
+        "discontinued": (
+            queries,
+            lambda q: legacy_discontinued(q, program_synonyms),
+            lambda q: matcher.first_program(q, "discontinued") or "",
+        ),
+        "best_program": (
+            queries,
+            lambda q: legacy_best_program(q, program_synonyms),
+            matcher.best_program,
+        ),
+        "program_for_source": (
+            sources,
+            lambda s: legacy_program_for_source(s, program_synonyms),
+            matcher.program_for_source,
+        ),
+    }
+    report: Dict[str, Dict] = {"build_ms": {"matcher": round(build_ms, 2)}}
+    for name, (inputs, legacy, compiled) in pairs.items():
+        mismatches = [item for item in inputs if legacy(item) != compiled(item)]
+        legacy_us = _time_per_call(legacy, inputs, repeat)
+        compiled_us = _time_per_call(compiled, inputs, repeat)
+        report[name] = {
+            "inputs": len(inputs),
+            "legacy_us": round(legacy_us, 2),
+            "compiled_us": round(compiled_us, 2),
+            "speedup": round(legacy_us / compiled_us, 2) if compiled_us else 0.0,
+            "mismatches": mismatches,
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the precompiled program matcher.")
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURE_PATH)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    with open(args.fixtures, "r", encoding="utf-8") as handle:
+        queries = [case["query"] for case in json.load(handle) if case.get("query")]
+    sources = sorted(os.listdir(KB_DIR)) if KB_DIR.is_dir() else []
+
+    report = run(queries, sources, args.repeat, PROGRAM_SYNONYMS)
+    print(json.dumps(report, indent=2))
+    if any(section.get("mismatches") for section in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: doc text inline in RAGState vs references into the per-request
+doc store (src/doc_store.py).
+
+    python tools/state_memory_benchmark.py --requests 8 --chunks 50
+
+Runs a LangGraph pipeline shaped like the real one (retrieval -> 9 more nodes,
+each returning {**state, ...}) under a plain InMemorySaver, so every super-step
+is checkpointed. Retrieval returns realistic chunks plus two full syllabi from
+the local knowledge base. Reports, per mode: checkpoint bytes serialized per
+request, checkpoint bytes retained, tracemalloc peak for the concurrent batch,
+and wall time.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, TypedDict
+
+WORKSPACE_ROOT = Path(__file__).resolve().parents[1]
+if str(WORKSPACE_ROOT) not in sys.path:
+    sys.path.append(str(WORKSPACE_ROOT))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from langgraph.graph import END, StateGraph  # noqa: E402
+
+from src.doc_store import hydrate_docs, release_doc_store, store_docs  # noqa: E402
+
+KB_DIR = WORKSPACE_ROOT / "knowledge_base" / "database"
+DOWNSTREAM_NODES = 9
+
+
+class _BenchState(TypedDict, total=False):
+    query: str
+    retrieved_docs: List[Dict]
+    filtered_docs: List[Dict]
+    doc_store_id: str
+    context_chars: int
+    metadata: Dict
+
+
+def _sample_docs(chunks: int) -> List[Dict[str, Any]]:
+    """`chunks` ~1.2 KB chunks cut from the KB, plus two full syllabi (as for breakdown requests)."""
+    files = sorted(KB_DIR.glob("*bootcamp*.md"))
+    texts = [f.read_text(encoding="utf-8") for f in files[:2]] or ["x" * 30000, "y" * 30000]
+    docs = [
+        {"source": f.name if files else f"syllabus_{i}.md", "content": text, "score": 1.0, "full_syllabus": True}
+        for i, (f, text) in enumerate(zip(files or [None, None], texts))
+    ]
+    corpus = "\n".join(texts)
+    for i in range(chunks):
+        start = (i * 1200) % max(1, len(corpus) - 1200)
+        docs.append({
+            "source": files[i % len(files)].name if files else "chunk.md",
+            "content": f"[{i}] " + corpus[start:start + 1200],
+            "score": round(1.0 - i / (chunks * 2), 3),
+        })
+    return docs
+
+
+class _CountingSaver(InMemorySaver):
+    """InMemorySaver that counts the bytes it serializes."""
+
+    def __init__(self):
+        super().__init__()
+        self.bytes_written = 0
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        values = checkpoint.get("channel_values") or {}
+        for k in new_versions:
+            if k in values:
+                self.bytes_written += len(self.serde.dumps_typed(values[k])[1])
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def retained_bytes(self) -> int:
+        return sum(len(blob[1]) for blob in self.blobs.values())
+
+
+def _build_graph(mode: str, chunks: int, saver):
+    def retrieval(state):
+        docs = _sample_docs(chunks)
+        if mode == "refs":
+            store_id, docs = store_docs(state, docs)
+            return {**state, "retrieved_docs": docs, "doc_store_id": store_id}
+        return {**state, "retrieved_docs": docs}
+
+    def filtering(state):
+        return {**state, "filtered_docs": state["retrieved_docs"][:20]}
+
+    def generation(state):
+        docs = hydrate_docs(state, state["filtered_docs"])
+        return {**state, "context_chars": sum(len(d["content"]) for d in docs)}
+
+    def passthrough(i):
+        def node(state):
+            return {**state, "metadata": {**(state.get("metadata") or {}), f"step_{i}": True}}
+        return node
+
+    graph = StateGraph(_BenchState)
+    names = ["retrieval", "filtering", "generation"] + [f"node_{i}" for i in range(DOWNSTREAM_NODES - 2)]
+    fns = [retrieval, filtering, generation] + [passthrough(i) for i in range(DOWNSTREAM_NODES - 2)]
+    for name, fn in zip(names, fns):
+        graph.add_node(name, fn)
+    graph.set_entry_point(names[0])
+    for a, b in zip(names, names[1:]):
+        graph.add_edge(a, b)
+    graph.add_edge(names[-1], END)
+    return graph.compile(checkpointer=saver)
+
+
+def run_mode(mode: str, requests: int, chunks: int) -> Dict[str, Any]:
+    saver = _CountingSaver()
+    graph = _build_graph(mode, chunks, saver)
+
+    def one(i: int) -> int:
+        result = graph.invoke({"query": f"q{i}"}, {"configurable": {"thread_id": f"{mode}-{i}"}})
+        return result["context_chars"]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=requests) as executor:
+        context_chars = list(executor.map(one, range(requests)))
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    retained = saver.retained_bytes()
+    for thread_id in list(saver.storage):
+        saved = saver.get_tuple({"configurable": {"thread_id": thread_id}})
+        if saved:
+            release_doc_store(saved.checkpoint["channel_values"].get("doc_store_id"))
+    return {
+        "requests": requests,
+        "context_chars_per_request": context_chars[0] if context_chars else 0,
+        "checkpoint_bytes_per_request": saver.bytes_written // max(1, requests),
+        "checkpoint_bytes_retained": retained,
+        "peak_traced_bytes": peak,
+        "wall_seconds": round(wall, 3),
+    }
+
+
+def run(requests: int = 8, chunks: int = 50) -> Dict[str, Any]:
+    inline = run_mode("inline", requests, chunks)
+    refs = run_mode("refs", requests, chunks)
+    return {
+        "inline": inline,
+        "refs": refs,
+        "checkpoint_reduction": round(
+            inline["checkpoint_bytes_per_request"] / max(1, refs["checkpoint_bytes_per_request"]), 1
+        ),
+        "peak_reduction": round(inline["peak_traced_bytes"] / max(1, refs["peak_traced_bytes"]), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inline docs vs doc-store references: memory benchmark.")
+    parser.add_argument("--requests", type=int, default=8, help="Concurrent requests")
+    parser.add_argument("--chunks", type=int, default=50, help="Retrieved chunks per request")
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests, args.chunks), indent=2))
+
+
+if __name__ == "__main__":
+    main()
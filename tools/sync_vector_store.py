@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Incremental vector store sync.
+
+rebuild_vector_store.py empties the store and re-uploads every file one at a
+time, so retrieval is broken for minutes. This tool only touches what changed:
+
+1. Hash every knowledge_base/database_txt/*.txt (src/kb_manifest.py).
+2. List the vector store's files; each file uploaded by this tool carries
+   attributes {"filename", "sha256"} (files uploaded without them are
+   treated as changed, once).
+3. Upload new/changed files in parallel (upload, attach with the 500/75
+   static chunking, wait until indexed).
+4. Only then remove what they replace and files deleted locally
+   (add-then-remove: the old version keeps serving until the new one is
+   searchable; if an upload fails, the old version stays).
+
+With --new-store the files go into a fresh vector store instead, and the
+command prints its id: flip OPENAI_VECTOR_STORE_ID to it (the old store is
+left untouched for rollback).
+
+Usage:
+    python tools/sync_vector_store.py --dry-run
+    python tools/sync_vector_store.py --workers 8
+    python tools/sync_vector_store.py --new-store --name "product-wizard 2026-02"
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+WORKSPACE_ROOT = Path(__file__).resolve().parents[1]
+if str(WORKSPACE_ROOT) not in sys.path:
+    sys.path.append(str(WORKSPACE_ROOT))
+
+from src.kb_chunking import DEFAULT_CHUNK_SIZE, DEFAULT_OVERLAP  # noqa: E402
+from src.kb_manifest import build_manifest  # noqa: E402
+
+DEFAULT_TXT_DIR = WORKSPACE_ROOT / "knowledge_base" / "database_txt"
+
+_INDEXING_DONE = ("completed", "failed", "cancelled")
+
+
+def chunking_strategy(chunk_size: int, overlap: int) -> Dict[str, Any]:
+    return {"type": "static", "static": {"max_chunk_size_tokens": chunk_size, "chunk_overlap_tokens": overlap}}
+
+
+def local_files(txt_dir: Path) -> Dict[str, str]:
+    """{filename: sha256} for the .txt files to sync."""
+    manifest = build_manifest(str(txt_dir.parent), subdirs=(txt_dir.name,), universal_documents={})
+    return {
+        name: manifest.files[f"{txt_dir.name}/{name}"]["sha256"]
+        for name in manifest.sources(txt_dir.name)
+        if name.endswith(".txt")
+    }
+
+
+def remote_files(client, vector_store_id: str) -> List[Dict[str, Any]]:
+    """[{"id", "filename", "sha256" (None when unknown)}] for every file in the store."""
+    entries = []
+    for vs_file in client.vector_stores.files.list(vector_store_id=vector_store_id, limit=100):
+        attributes = getattr(vs_file, "attributes", None) or {}
+        filename = attributes.get("filename")
+        if not filename:
+            # Uploaded by another tool: no attributes, look the name up once
+            try:
+                filename = client.files.retrieve(vs_file.id).filename
+            except Exception:
+                filename = None
+        entries.append({"id": vs_file.id, "filename": filename, "sha256": attributes.get("sha256")})
+    return entries
+
+
+def plan_sync(local: Dict[str, str], remote: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    {"upload": [filename], "unchanged": [filename],
+     "replace": [remote entry] (removed once its new version is indexed),
+     "remove": [remote entry] (no local file, or a duplicate)}
+    """
+    current: Dict[str, Dict[str, Any]] = {}
+    replace, remove = [], []
+    for entry in remote:
+        name = entry["filename"]
+        if name is None:
+            # Name lookup failed: leave it alone rather than risk deleting a live file
+            continue
+        if name not in local:
+            remove.append(entry)
+        elif entry["sha256"] == local[name] and name not in current:
+            current[name] = entry
+        elif entry["sha256"] == local[name]:
+            remove.append(entry)
+        else:
+            replace.append(entry)
+    upload = sorted(name for name in local if name not in current)
+    return {
+        "upload": upload,
+        "unchanged": sorted(current),
+        # A stale copy next to an up-to-date one is just a duplicate
+        "replace": [e for e in replace if e["filename"] in upload],
+        "remove": remove + [e for e in replace if e["filename"] not in upload],
+    }
+
+
+def upload_file(
+    client,
+    vector_store_id: str,
+    path: Path,
+    sha256: str,
+    strategy: Dict[str, Any],
+    poll_interval: float = 1.0,
+    timeout: float = 300.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Tuple[bool, str]:
+    """Upload one file, attach it with its hash attributes, wait until indexed. (ok, detail)"""
+    try:
+        with open(path, "rb") as handle:
+            uploaded = client.files.create(file=handle, purpose="assistants")
+        client.vector_stores.files.create(
+            vector_store_id=vector_store_id,
+            file_id=uploaded.id,
+            attributes={"filename": path.name, "sha256": sha256},
+            chunking_strategy=strategy,
+        )
+        waited = 0.0
+        while True:
+            status = client.vector_stores.files.retrieve(file_id=uploaded.id, vector_store_id=vector_store_id).status
+            if status in _INDEXING_DONE:
+                break
+            if waited >= timeout:
+                status = "timeout"
+                break
+            sleep(poll_interval)
+            waited += poll_interval
+        if status != "completed":
+            _delete(client, vector_store_id, uploaded.id)
+            return False, f"indexing {status}"
+        return True, uploaded.id
+    except Exception as e:
+        return False, str(e)
+
+
+def _delete(client, vector_store_id: str, file_id: str) -> Optional[str]:
+    """Detach and delete a file; returns an error message or None."""
+    try:
+        client.vector_stores.files.delete(file_id=file_id, vector_store_id=vector_store_id)
+        client.files.delete(file_id)
+        return None
+    except Exception as e:
+        return str(e)
+
+
+def sync(
+    client,
+    vector_store_id: str,
+    txt_dir: Path = DEFAULT_TXT_DIR,
+    workers: int = 4,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    dry_run: bool = False,
+    poll_interval: float = 1.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, Any]:
+    """Bring the store in line with txt_dir (add-then-remove). Returns the plan plus outcomes."""
+    local = local_files(txt_dir)
+    plan = plan_sync(local, remote_files(client, vector_store_id))
+    report: Dict[str, Any] = {**plan, "uploaded": [], "failed": {}, "removed": [], "remove_failed": {}}
+    if dry_run:
+        return report
+
+    strategy = chunking_strategy(chunk_size, overlap)
+
+    def _upload(name):
+        return name, upload_file(
+            client, vector_store_id, txt_dir / name, local[name], strategy,
+            poll_interval=poll_interval, sleep=sleep,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for name, (ok, detail) in executor.map(_upload, plan["upload"]):
+            if ok:
+                report["uploaded"].append(name)
+            else:
+                report["failed"][name] = detail
+
+        # Old versions go only once their replacement is searchable
+        obsolete = plan["remove"] + [e for e in plan["replace"] if e["filename"] in report["uploaded"]]
+        for entry, error in zip(obsolete, executor.map(lambda e: _delete(client, vector_store_id, e["id"]), obsolete)):
+            if error:
+                report["remove_failed"][entry["id"]] = error
+            else:
+                report["removed"].append(entry["filename"] or entry["id"])
+    return report
+
+
+def sync_to_new_store(
+    client,
+    name: str,
+    txt_dir: Path = DEFAULT_TXT_DIR,
+    **kwargs: Any,
+) -> Tuple[str, Dict[str, Any]]:
+    """Create an empty store and fill it; the caller flips OPENAI_VECTOR_STORE_ID when it succeeded."""
+    chunk_size = kwargs.get("chunk_size", DEFAULT_CHUNK_SIZE)
+    overlap = kwargs.get("overlap", DEFAULT_OVERLAP)
+    store = client.vector_stores.create(name=name, chunking_strategy=chunking_strategy(chunk_size, overlap))
+    return store.id, sync(client, store.id, txt_dir, **kwargs)
+
+
+def print_report(report: Dict[str, Any], dry_run: bool) -> None:
+    print(f"   Unchanged: {len(report['unchanged'])}")
+    print(f"   {'To upload' if dry_run else 'Uploaded'}: "
+          f"{len(report['upload']) if dry_run else len(report['uploaded'])}")
+    for name in report["upload"] if dry_run else report["uploaded"]:
+        print(f"      + {name}")
+    removals = report["remove"] + report["replace"] if dry_run else report["removed"]
+    print(f"   {'To remove' if dry_run else 'Removed'}: {len(removals)}")
+    for item in removals:
+        print(f"      - {item['filename'] or item['id'] if isinstance(item, dict) else item}")
+    for name, detail in report["failed"].items():
+        print(f"   ❌ Upload failed: {name} ({detail}) - previous version kept")
+    for file_id, detail in report["remove_failed"].items():
+        print(f"   ⚠️  Could not remove {file_id}: {detail}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incrementally sync knowledge_base/database_txt to the vector store.")
+    parser.add_argument("--txt-dir", type=Path, default=DEFAULT_TXT_DIR, help="Directory of .txt files to sync.")
+    parser.add_argument("--vector-store-id", default=os.getenv("OPENAI_VECTOR_STORE_ID"), help="Target store.")
+    parser.add_argument("--workers", type=int, default=4, help="Files uploaded/indexed in parallel.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Max tokens per chunk.")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP, help="Overlapping tokens between chunks.")
+    parser.add_argument("--new-store", action="store_true", help="Fill a new store instead; print its id to flip to.")
+    parser.add_argument("--name", default=f"product-wizard {time.strftime('%Y-%m-%d %H:%M')}", help="New store name.")
+    parser.add_argument("--dry-run", action="store_true", help="Show the plan without changing anything.")
+    args = parser.parse_args()
+
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ Error: OPENAI_API_KEY environment variable is required")
+        raise SystemExit(1)
+    from openai import OpenAI
+    client = OpenAI()
+
+    options = dict(workers=args.workers, chunk_size=args.chunk_size, overlap=args.overlap, dry_run=args.dry_run)
+    start = time.time()
+    if args.new_store:
+        if args.dry_run:
+            print(f"🔍 DRY RUN - would create '{args.name}' and upload {len(local_files(args.txt_dir))} files")
+            return
+        store_id, report = sync_to_new_store(client, args.name, args.txt_dir, **options)
+        print(f"📦 New vector store {store_id} ({time.time() - start:.1f}s)")
+        print_report(report, dry_run=False)
+        if report["failed"]:
+            print("❌ Some files failed; keep the current OPENAI_VECTOR_STORE_ID")
+            raise SystemExit(1)
+        print(f"✅ Set OPENAI_VECTOR_STORE_ID={store_id} to switch over (the old store is untouched)")
+        return
+
+    if not args.vector_store_id or args.vector_store_id == "vs_xxx":
+        print("❌ Error: OPENAI_VECTOR_STORE_ID (or --vector-store-id) is required")
+        raise SystemExit(1)
+    print(f"🔄 Syncing {args.txt_dir} -> {args.vector_store_id}{' (dry run)' if args.dry_run else ''}")
+    report = sync(client, args.vector_store_id, args.txt_dir, **options)
+    print_report(report, dry_run=args.dry_run)
+    print(f"⏱️  {time.time() - start:.1f}s")
+    if report["failed"] or report["remove_failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()